@@ -0,0 +1,484 @@
+import argparse
+import re
+import sys
+import time
+import glob
+import os
+import statistics
+import subprocess
+import http.server
+import threading
+import random
+import tempfile
+import shutil
+import zipfile
+import io
+import json
+import math
+from collections import Counter
+
+from chrome_webstore_crawler import DETAIL_PAGE_FIELDS, extract_detail_page_fields
+
+
+
+# The patterns that ChromeExtension.download_info_from_url() used to re.search() the *entire* page for, one after another
+#   (before DETAIL_PAGE_FIELDS), kept here as the baseline to compare against:
+LEGACY_PATTERNS = {
+	"title": '<h1 class="\\w+">(.+?)</h1>',
+	"description": '<h2 class="\\w+"><div>Overview</div></h2></div><div class="\\w+" jscontroller="\\w+" jsaction=".+"><div jsname="\\w+" class=".+"><p>([\\s\\S]+?)</p>',
+	"no_of_users": '>([\\d,]+?) users?</div></div><div class="\\w+" jscontroller="\\w+" jsaction="',
+	"no_of_ratings": '<span class="\\w+">([\\d,]+|No) ratings?</span>',
+	"avg_rating": '<div class="\\w+"><h2 class=".+"><span class="\\w+">(\\d(\\.\\d)?) out of 5<div class=',
+	"version_no": '<div class="\\w+">Version</div><div class="\\w+">(.+?)</div>',
+	"size": '<div class="\\w+">Size</div><div>(.+?)</div>',
+	"last_updated": '<div class="\\w+">Updated</div><div>(.+?)</div>',
+}
+
+
+
+def benchmark_extraction(html_files, repetitions):
+	pages = []
+	for html_file in html_files:
+		with open(html_file, "r") as f:
+			pages.append(f.read())
+	print(f"Benchmarking the extraction of {len(DETAIL_PAGE_FIELDS)} fields from {len(pages)} pages (avg. size: {sum(len(page) for page in pages)//len(pages):,} chars), {repetitions} repetition(s) each ...")
+
+	legacy_times = {name: 0.0 for name in LEGACY_PATTERNS} # field name -> total time in seconds
+	new_times = {field.name: 0.0 for field in DETAIL_PAGE_FIELDS} # field name -> total time in seconds
+	mismatches = 0
+	for page in pages:
+		for _ in range(repetitions):
+			legacy_values = {}
+			for name, pattern in LEGACY_PATTERNS.items():
+				start_time = time.perf_counter()
+				m = re.search(pattern, page) # (exactly like the old code: no precompiled pattern, whole page)
+				legacy_times[name] += time.perf_counter() - start_time
+				legacy_values[name] = m.group(1) if m else None
+			matches, extraction_times = extract_detail_page_fields(page)
+			for name, seconds in extraction_times.items():
+				new_times[name] += seconds
+			for name, m in matches.items():
+				if (m.group(1) if m else None) != legacy_values[name]:
+					mismatches += 1
+					print(f"Mismatch for field '{name}': {legacy_values[name]!r} (legacy) != {m.group(1) if m else None!r} (new)", file=sys.stderr)
+
+	n = len(pages) * repetitions
+	print(f"{'Field':<15} | {'legacy (ms/page)':>16} | {'new (ms/page)':>13} | {'speedup':>8}")
+	print(f"{'-'*15}-|-{'-'*16}-|-{'-'*13}-|-{'-'*8}")
+	for name in LEGACY_PATTERNS:
+		legacy_ms, new_ms = 1000*legacy_times[name]/n, 1000*new_times[name]/n
+		print(f"{name:<15} | {legacy_ms:>16.3f} | {new_ms:>13.3f} | {legacy_ms/max(new_ms, 1e-9):>7.1f}x")
+	legacy_ms, new_ms = 1000*sum(legacy_times.values())/n, 1000*sum(new_times.values())/n
+	print(f"{'TOTAL':<15} | {legacy_ms:>16.3f} | {new_ms:>13.3f} | {legacy_ms/max(new_ms, 1e-9):>7.1f}x")
+	print(f"{mismatches} mismatch(es) between the legacy and the new extraction.")
+
+
+
+# The modules that importing chrome_webstore_crawler must *not* import (they're imported lazily, only by the modes that need them):
+LAZY_MODULES = ["numpy", "matplotlib"]
+
+
+
+def benchmark_import_time(repetitions, max_milliseconds):
+	# Each repetition imports chrome_webstore_crawler in a fresh interpreter, using "python -X importtime",
+	#   which prints one line for each imported module to stderr, e.g.: "import time:       922 |       2086 | encodings"
+	print(f"Importing chrome_webstore_crawler {repetitions} time(s), each time in a new Python process ...")
+	script_folder = os.path.dirname(os.path.abspath(__file__))
+	total_times = [] # in microseconds, one per repetition
+	module_times = {} # top-level module imported by chrome_webstore_crawler -> list of cumulative import times in microseconds
+	imported_lazy_modules = set()
+	for _ in range(repetitions):
+		process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import chrome_webstore_crawler"], cwd=script_folder, capture_output=True, text=True, check=True)
+		for line in process.stderr.splitlines():
+			if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+				continue
+			_, cumulative, module = line.split("|")
+			if module.strip().split(".")[0] in LAZY_MODULES:
+				imported_lazy_modules.add(module.strip())
+			if module.strip() == "chrome_webstore_crawler":
+				total_times.append(int(cumulative))
+			elif module.startswith("   ") and not module.startswith("    "): # (= imported directly by chrome_webstore_crawler)
+				module_times.setdefault(module.strip(), []).append(int(cumulative))
+
+	print(f"{'Module (imported by chrome_webstore_crawler)':<45} | {'median (ms)':>11}")
+	print(f"{'-'*45}-|-{'-'*11}")
+	for module, times in sorted(module_times.items(), key=lambda item: -statistics.median(item[1]))[:10]:
+		print(f"{module:<45} | {statistics.median(times)/1000:>11.1f}")
+	median_milliseconds = statistics.median(total_times)/1000
+	print(f"{'TOTAL (chrome_webstore_crawler)':<45} | {median_milliseconds:>11.1f}   (min: {min(total_times)/1000:.1f} ms, max: {max(total_times)/1000:.1f} ms)")
+
+	# Fail (with exit code 1), s.t. this can be used to catch regressions:
+	failed = False
+	if len(imported_lazy_modules) > 0:
+		print(f"Error: importing chrome_webstore_crawler imported {', '.join(sorted(imported_lazy_modules)[:5])}{', ...' if len(imported_lazy_modules) > 5 else ''} (which should only be imported lazily)!", file=sys.stderr)
+		failed = True
+	if max_milliseconds is not None and median_milliseconds > max_milliseconds:
+		print(f"Error: importing chrome_webstore_crawler took {median_milliseconds:.1f} ms > {max_milliseconds} ms!", file=sys.stderr)
+		failed = True
+	if failed:
+		sys.exit(1)
+
+
+
+# ##### ##### ##### ##### Offline crawl benchmark: ##### ##### ##### #####
+# A local "replay" HTTP server serves the fixtures of a fake Chrome Web Store (with a configurable latency, error rate and rate of 429s),
+#   the crawler is pointed at it (cf. CHROME_WEBSTORE_URL and CRX_DOWNLOAD_URL) and each mode is run in a separate process:
+#   --crawl, then --download-crxs and --stats on the .CSV file that the crawl produced.
+# A fixtures folder contains:
+#   shards/<n>.xml       (e.g. saved using KEEP_TEMP_XML_FILES = True; its links to https://chrome.google.com/webstore/... are rewritten to the local server)
+#   detail/<id>.html     (e.g. saved using KEEP_TEMP_HTML_FILES = True)
+#   crx/<id>.crx         (optional; without it, the .CRX downloads fail with a 404)
+# Without a fixtures folder, synthetic fixtures are generated (cf. generate_fixtures()).
+
+# A minimal detail page, matching DETAIL_PAGE_FIELDS; padded to the size of a real page (500 KB+) with {filler}:
+DETAIL_PAGE_TEMPLATE = """<!doctype html><html><head><title>{title} - Chrome Web Store</title></head><body>
+{filler}
+<h1 class="Pa2dE">{title}</h1><div class="F9iKBc">{users} users</div></div><div class="F9iKBc" jscontroller="ZwTfq" jsaction="click:cOuCgd"></div>
+<div class="eTD1t"><h2 class="wpJH0b Yemige"><span class="GlMWqe">{avg_rating} out of 5<div class="B1UG8d"></div></span></h2></div><span class="PmmSTd">{ratings} ratings</span>
+<h2 class="wpJH0b"><div>Overview</div></h2></div><div class="RNnO5e" jscontroller="qv5bsb" jsaction="click:i7GaQb(rs1XOd);rcuQ6b:npT2md"><div jsname="ij8cu" class="JJ3H1e JpY6Fd"><p>{description}</p></div></div>
+<li><div class="nws2nb">Version</div><div class="N3EXSc">{version_no}</div></li><li><div class="nws2nb">Updated</div><div>{last_updated}</div></li><li><div class="nws2nb">Size</div><div>{size}</div></li>
+</body></html>
+"""
+
+
+
+def generate_fixtures(fixtures_folder, no_of_extensions, no_of_shards, page_size, rng):
+	print(f"Generating synthetic fixtures in '{fixtures_folder}': {no_of_extensions} extensions in {no_of_shards} shards, detail pages of ~{page_size:,} bytes ...")
+	for subfolder in ["shards", "detail", "crx"]:
+		os.makedirs(os.path.join(fixtures_folder, subfolder), exist_ok=True)
+	filler_line = '<div class="a-b-c" data-x="0"><span class="s">Lorem ipsum dolor sit amet</span></div>\n'
+	filler = filler_line * max(0, page_size // len(filler_line))
+	shard_urls = [[] for _ in range(no_of_shards)]
+	for i in range(no_of_extensions):
+		extension_id = "".join(rng.choice("abcdefghijklmnop") for _ in range(32)) # (extension IDs only consist of the letters a-p)
+		languages = rng.sample(["en", "en-US", "de", "fr", "ja", "ru", "es", "pt-BR"], rng.randint(1, 4))
+		url = f"https://chrome.google.com/webstore/detail/extension-{i}/{extension_id}"
+		shard_urls[i % no_of_shards].append(f"<url><loc>{url}</loc>" + "".join(f'<xhtml:link href="{url}" hreflang="{language}" rel="alternate"/>' for language in languages) + "</url>")
+		with open(os.path.join(fixtures_folder, "detail", extension_id + ".html"), "w") as f:
+			f.write(DETAIL_PAGE_TEMPLATE.format(
+				filler=filler,
+				title=f"Extension {i}",
+				users=f"{int(10 ** rng.uniform(0, 7)):,}", # (log-uniform, i.e., most extensions have few users)
+				avg_rating=rng.choice(["0", "3.9", "4.5", "5"]),
+				ratings=rng.choice(["No", "1", "24", "1,234"]),
+				description="A synthetic extension for benchmarking",
+				version_no=f"1.{rng.randint(0, 20)}.{rng.randint(0, 99)}",
+				last_updated=f"{rng.choice(['January', 'May', 'August', 'December'])} {rng.randint(1, 28)}, {rng.randint(2012, 2024)}",
+				size=f"{rng.randint(10, 999)}KiB",
+			))
+		with open(os.path.join(fixtures_folder, "crx", extension_id + ".crx"), "wb") as f:
+			f.write(generate_crx(extension_id, rng.randint(1, 256) * 1024, rng))
+	for shard_no, urls in enumerate(shard_urls):
+		with open(os.path.join(fixtures_folder, "shards", f"{shard_no}.xml"), "w") as f:
+			f.write('<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:xhtml="http://www.w3.org/1999/xhtml">' + "".join(urls) + "</urlset>")
+
+
+
+def generate_crx(extension_id, payload_size, rng): # returns a (syntactically) valid CRX3 file (cf. validate_crx_file()) containing a ZIP archive of about {payload_size} bytes
+	zip_buffer = io.BytesIO()
+	with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED) as zip_file:
+		zip_file.writestr("manifest.json", json.dumps({"name": extension_id, "version": "1.0", "manifest_version": 3}))
+		zip_file.writestr("payload.bin", rng.randbytes(payload_size))
+	header = b"\x00" * 64 # (a real CRX3 header contains the signatures, as a protobuf)
+	return b"Cr24" + (3).to_bytes(4, "little") + len(header).to_bytes(4, "little") + header + zip_buffer.getvalue()
+
+
+
+class ReplayServer:
+	# Serves the fixtures under the same paths as the Chrome Web Store, on http://127.0.0.1:{port}, from a background thread:
+	#   /webstore/sitemap?shard=<n>  ->  shards/<n>.xml
+	#   /webstore/detail/.../<id>    ->  detail/<id>.html
+	#   /service/update2/crx?...x=id%3D<id>%26...  ->  crx/<id>.crx
+	# Each response is delayed by {latency} seconds (+/- 50%); {error_rate} of all requests fail with a 503 and {rate_429} with a 429 ("Retry-After: {retry_after}").
+
+	def __init__(self, fixtures_folder, latency=0.0, error_rate=0.0, rate_429=0.0, retry_after=1, seed=None):
+		self.fixtures_folder = fixtures_folder
+		self.latency = latency
+		self.error_rate = error_rate
+		self.rate_429 = rate_429
+		self.retry_after = retry_after
+		self.status_counts = Counter() # HTTP status code -> no. of responses
+		self._rng = random.Random(seed)
+		self._lock = threading.Lock()
+		replay_server = self
+		class RequestHandler(http.server.BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1" # (keep-alive)
+			def do_GET(self):
+				replay_server._handle(self)
+			def log_message(self, format, *args):
+				pass
+		self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+		self._server.daemon_threads = True
+		self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+		self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+	def start(self):
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._server.shutdown()
+		self._server.server_close()
+
+	def _file_for_path(self, path): # returns (file path, is shard)
+		if path.startswith("/webstore/sitemap?shard="):
+			return os.path.join(self.fixtures_folder, "shards", path.split("=", 1)[1].split("&")[0] + ".xml"), True
+		if path.startswith("/webstore/detail/"):
+			return os.path.join(self.fixtures_folder, "detail", path.split("?")[0].rstrip("/").split("/")[-1] + ".html"), False
+		m = re.search("x=id%3D([a-p]{32})", path)
+		if path.startswith("/service/update2/crx") and m:
+			return os.path.join(self.fixtures_folder, "crx", m.group(1) + ".crx"), False
+		return None, False
+
+	def _handle(self, request):
+		with self._lock:
+			delay = self.latency * self._rng.uniform(0.5, 1.5)
+			dice = self._rng.random()
+		time.sleep(delay)
+		headers = {}
+		if dice < self.error_rate:
+			status, body = 503, b""
+		elif dice < self.error_rate + self.rate_429:
+			status, body = 429, b""
+			headers["Retry-After"] = str(self.retry_after)
+		else:
+			file_path, is_shard = self._file_for_path(request.path)
+			if file_path is None or not os.path.isfile(file_path):
+				status, body = 404, b""
+			else:
+				status = 200
+				with open(file_path, "rb") as f:
+					body = f.read()
+				if is_shard: # (point the links to the detail pages at this server)
+					body = body.replace(b"https://chrome.google.com/webstore/", self.base_url.encode() + b"/webstore/")
+				range_header = request.headers.get("Range", "") # e.g. "bytes=1000-" (cf. download_file_resumable())
+				if range_header.startswith("bytes=") and range_header.endswith("-") and range_header[6:-1].isdigit() and 0 < int(range_header[6:-1]) < len(body):
+					status = 206
+					headers["Content-Range"] = f"bytes {int(range_header[6:-1])}-{len(body)-1}/{len(body)}"
+					body = body[int(range_header[6:-1]):]
+		with self._lock:
+			self.status_counts[status] += 1
+		request.send_response(status)
+		for header, value in headers.items():
+			request.send_header(header, value)
+		request.send_header("Content-Length", str(len(body)))
+		request.end_headers()
+		request.wfile.write(body)
+
+
+
+# Runs chrome_webstore_crawler.main() with the given arguments (in a new process), pointed at the replay server,
+#   recording the latency of each download (in seconds) into a JSON file:
+BOOTSTRAP_SCRIPT = """
+import atexit, json, sys, time
+sys.path.insert(0, {script_folder!r})
+import chrome_webstore_crawler as crawler
+crawler.CHROME_WEBSTORE_URL = {base_url!r} + "/webstore"
+crawler.CRX_DOWNLOAD_URL = {base_url!r} + "/service/update2/crx?response=redirect&acceptformat=crx3&x=id%3D{{extension_id}}%26installsource%3Dondemand%26uc"
+latencies = []
+def timed(function):
+	def timed_function(*args, **kwargs):
+		start_time = time.perf_counter()
+		try:
+			return function(*args, **kwargs)
+		finally:
+			latencies.append(time.perf_counter() - start_time)
+	return timed_function
+crawler.download = timed(crawler.download) # (detail pages and shards)
+crawler.download_file_resumable = timed(crawler.download_file_resumable) # (.CRX files)
+atexit.register(lambda: json.dump(latencies, open({latency_file!r}, "w")))
+sys.argv = ["chrome_webstore_crawler.py"] + {arguments!r}
+crawler.main()
+"""
+
+
+
+def run_crawler_mode(base_url, arguments, work_folder, name): # returns {"wall": s, "cpu": s, "peak_rss": bytes, "latencies": [s, ...], "exit_code": int}
+	latency_file = os.path.join(work_folder, f"{name}.latencies.json")
+	script = BOOTSTRAP_SCRIPT.format(script_folder=os.path.dirname(os.path.abspath(__file__)), base_url=base_url, latency_file=latency_file, arguments=arguments)
+	with open(os.path.join(work_folder, f"{name}.log"), "w") as log_file:
+		start_time = time.perf_counter()
+		process = subprocess.Popen([sys.executable, "-c", script], cwd=work_folder, stdout=log_file, stderr=subprocess.STDOUT,
+			env=os.environ | {"MPLBACKEND": "Agg"}) # (--stats: plt.show() does nothing instead of opening windows)
+		_, status, rusage = os.wait4(process.pid, 0) # (the resource usage of this one process, unlike resource.getrusage(RUSAGE_CHILDREN))
+		wall = time.perf_counter() - start_time
+	process.returncode = os.waitstatus_to_exitcode(status)
+	latencies = []
+	if os.path.isfile(latency_file):
+		with open(latency_file, "r") as f:
+			latencies = json.load(f)
+	return {"wall": wall, "cpu": rusage.ru_utime + rusage.ru_stime, "peak_rss": rusage.ru_maxrss * 1024, "latencies": latencies, "exit_code": process.returncode}
+
+
+
+def percentile(values, p): # (nearest-rank method) e.g. percentile([...], 99)
+	values = sorted(values)
+	return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+
+def benchmark_crawl(args):
+	rng = random.Random(args.seed)
+	work_folder = tempfile.mkdtemp(prefix="chrome_webstore_crawler_benchmark_")
+	fixtures_folder = args.fixtures
+	if fixtures_folder == "":
+		fixtures_folder = os.path.join(work_folder, "fixtures")
+		generate_fixtures(fixtures_folder, args.extensions, args.shards, args.page_size, rng)
+	server = ReplayServer(fixtures_folder, latency=args.latency / 1000, error_rate=args.error_rate, rate_429=args.rate_429, retry_after=args.retry_after, seed=args.seed).start()
+	try:
+		# sitemap.xml, listing every shard of the fixtures (without an "&hl=..." duplicate), pointed at the replay server:
+		shard_nos = sorted(file_name.removesuffix(".xml") for file_name in os.listdir(os.path.join(fixtures_folder, "shards")) if file_name.endswith(".xml"))
+		with open(os.path.join(work_folder, "sitemap.xml"), "w") as f:
+			f.write('<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + "".join(f"<sitemap><loc>{server.base_url}/webstore/sitemap?shard={shard_no}</loc></sitemap>" for shard_no in shard_nos) + "</sitemapindex>")
+		print(f"Replay server: {server.base_url} (latency: {args.latency} ms +/- 50%, error rate: {args.error_rate:.1%}, 429 rate: {args.rate_429:.1%}) | work folder: '{work_folder}'")
+
+		common_arguments = ["--csv-file", "extensions.csv", "--sleep", "0", "--workers", str(args.workers), "--rate-limit", str(args.rate_limit), "--max-rate-limit", str(args.rate_limit)]
+		modes = { # mode -> (arguments, what is counted)
+			"crawl": (["--crawl", "--sitemap-xml", "sitemap.xml", "--parse-workers", str(args.parse_workers)] + common_arguments, "pages"),
+			"download-crxs": (["--download-crxs", "--crx-download", "crxs"] + common_arguments, ".CRXs"),
+			"stats": (["--stats", "--csv-file", "extensions.csv"], "rows"),
+		}
+		os.makedirs(os.path.join(work_folder, "crxs"), exist_ok=True)
+		results = {}
+		for mode in args.modes:
+			arguments, unit = modes[mode]
+			print(f"Running {mode} ...")
+			result = run_crawler_mode(server.base_url, arguments, work_folder, mode)
+			if mode == "stats":
+				with open(os.path.join(work_folder, "extensions.csv"), "rb") as f:
+					result["count"] = sum(1 for _ in f)
+			else:
+				result["count"] = len(result["latencies"])
+			if result["exit_code"] != 0:
+				print(f"Error: {mode} exited with code {result['exit_code']}, see '{os.path.join(work_folder, mode + '.log')}'", file=sys.stderr)
+			results[mode] = (result, unit)
+
+		print(f"{'Mode':<14} | {'count':>12} | {'wall (s)':>8} | {'per second':>10} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'CPU (ms) per':>12} | {'peak RSS (MiB)':>14}")
+		print(f"{'-'*14}-|-{'-'*12}-|-{'-'*8}-|-{'-'*10}-|-{'-'*8}-|-{'-'*8}-|-{'-'*12}-|-{'-'*14}")
+		for mode, (result, unit) in results.items():
+			count = max(result["count"], 1)
+			p50, p99 = [f"{1000*percentile(result['latencies'], p):>8.1f}" if len(result["latencies"]) > 0 else f"{'-':>8}" for p in [50, 99]] # (--stats doesn't download anything)
+			print(f"{mode:<14} | {result['count']:>6} {unit:<5} | {result['wall']:>8.2f} | {result['count']/result['wall']:>10.1f} | {p50} | {p99} | {1000*result['cpu']/count:>12.2f} | {result['peak_rss']/2**20:>14.1f}")
+		print(f"Responses of the replay server: {', '.join(f'{count} x {status}' for status, count in sorted(server.status_counts.items()))}")
+	finally:
+		server.stop()
+		if args.keep:
+			print(f"Kept the work folder: '{work_folder}'")
+		else:
+			shutil.rmtree(work_folder)
+	if any(result["exit_code"] != 0 for result, _ in results.values()):
+		sys.exit(1)
+
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="""Benchmarks for the Chrome Webstore Crawler.
+		""")
+	subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+	parser_extraction = subparsers.add_parser("extraction",
+		help="""
+		Compare the extraction of the fields of saved detail pages (e.g. kept using KEEP_TEMP_HTML_FILES = True)
+		against the old approach of running one uncompiled re.search() per field over the entire page.
+		""")
+	parser_extraction.add_argument("html_files", nargs="+", metavar="HTML_FILE",
+		help="""
+		The saved detail pages, e.g.: ./.*.html
+		""")
+	parser_extraction.add_argument("--repetitions", type=int, default=10,
+		help="""
+		How often each page is processed. Default: 10
+		""")
+
+	parser_import_time = subparsers.add_parser("import-time",
+		help=f"""
+		Measure how long it takes to import chrome_webstore_crawler (i.e., the startup time of every mode)
+		and fail if that imports any of {", ".join(LAZY_MODULES)} (which only some modes need) or takes too long.
+		""")
+	parser_import_time.add_argument("--repetitions", type=int, default=10,
+		help="""
+		How often chrome_webstore_crawler is imported (each time in a new Python process). Default: 10
+		""")
+	parser_import_time.add_argument("--max-ms", type=float, default=None,
+		help="""
+		Fail if the median import time exceeds this many milliseconds. Default: no limit
+		""")
+
+	parser_crawl = subparsers.add_parser("crawl",
+		help="""
+		Measure the throughput of --crawl, --download-crxs and --stats (pages/sec, p50/p99 latency, CPU time per page and peak RSS)
+		against a local replay server (with a configurable latency, error rate and rate of 429s) instead of the live Chrome Web Store.
+		""")
+	parser_crawl.add_argument("--fixtures", type=str, default="",
+		help="""
+		A folder with recorded fixtures: shards/<n>.xml, detail/<id>.html and (optionally) crx/<id>.crx.
+		Default: synthetic fixtures (cf. --extensions, --shards and --page-size)
+		""")
+	parser_crawl.add_argument("--extensions", type=int, default=1000,
+		help="""
+		The no. of extensions of the synthetic fixtures. Default: 1000
+		""")
+	parser_crawl.add_argument("--shards", type=int, default=10,
+		help="""
+		The no. of shards of the synthetic fixtures. Default: 10
+		""")
+	parser_crawl.add_argument("--page-size", type=int, default=500_000,
+		help="""
+		The size of each synthetic detail page in bytes (real pages are 500 KB+). Default: 500000
+		""")
+	parser_crawl.add_argument("--latency", type=float, default=50,
+		help="""
+		The latency of the replay server in milliseconds (+/- 50%%). Default: 50
+		""")
+	parser_crawl.add_argument("--error-rate", type=float, default=0.0,
+		help="""
+		The fraction of requests failing with a 503, e.g. 0.01. Default: 0
+		""")
+	parser_crawl.add_argument("--rate-429", type=float, default=0.0,
+		help="""
+		The fraction of requests failing with a 429 (Too Many Requests), e.g. 0.01. Default: 0
+		""")
+	parser_crawl.add_argument("--retry-after", type=int, default=1,
+		help="""
+		The "Retry-After" (in seconds) sent with each 429. Default: 1
+		""")
+	parser_crawl.add_argument("--workers", type=int, default=8,
+		help="""
+		Passed on to --crawl and --download-crxs. Default: 8
+		""")
+	parser_crawl.add_argument("--parse-workers", type=int, default=0,
+		help="""
+		Passed on to --crawl. Default: 0
+		""")
+	parser_crawl.add_argument("--rate-limit", type=float, default=1000,
+		help="""
+		Passed on to --crawl and --download-crxs (as --rate-limit and --max-rate-limit). Default: 1000
+		""")
+	parser_crawl.add_argument("--modes", nargs="+", choices=["crawl", "download-crxs", "stats"], default=["crawl", "download-crxs", "stats"],
+		help="""
+		The modes to benchmark, in this order (--download-crxs and --stats use the .CSV file produced by the crawl). Default: crawl download-crxs stats
+		""")
+	parser_crawl.add_argument("--seed", type=int, default=42,
+		help="""
+		The seed for the synthetic fixtures and the latencies/errors of the replay server. Default: 42
+		""")
+	parser_crawl.add_argument("--keep", action="store_true",
+		help="""
+		Keep the work folder (fixtures, .CSV file, logs of each mode) instead of deleting it afterwards.
+		""")
+
+	args = parser.parse_args()
+
+	if args.benchmark == "extraction":
+		html_files = [html_file for pattern in args.html_files for html_file in glob.glob(pattern)] # (glob() in case the shell didn't expand the pattern)
+		benchmark_extraction(html_files, args.repetitions)
+	elif args.benchmark == "import-time":
+		benchmark_import_time(args.repetitions, args.max_ms)
+	elif args.benchmark == "crawl":
+		benchmark_crawl(args)
+
+
+
+if __name__ == "__main__":
+	main()
@@ -1,7 +1,10 @@
 import argparse
 from pathlib import Path
-import urllib.request
-import shutil
+import urllib.parse
+import urllib.error
+import http.client
+import zlib
+import io
 import xml.etree.ElementTree as ET
 import random
 import tempfile
@@ -9,24 +12,129 @@ import time
 from typing import List
 import re
 import sys
-from collections import defaultdict
+from collections import defaultdict, deque, Counter
+import threading
+import sqlite3
+import email.utils
+import hashlib
+import json
+import shutil
+import array
+import functools
+import itertools
+import atexit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+import signal
 import time
 import os
 
-import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime
-import statistics
-from math import log10, floor
+try:
+	import brotli # optional, only used to decode "Content-Encoding: br" responses
+except ImportError:
+	brotli = None
+import importlib
+from datetime import datetime, date, timezone
+from math import exp, log1p, floor, inf
+import math
+
+
+
+class LazyModule: # a module that is only imported when it's used for the first time
+	def __init__(self, name):
+		self._name = name # e.g. "matplotlib.pyplot"
+		self._module = None
+
+	def __getattr__(self, attribute): # (only called for attributes other than _name and _module)
+		if self._module is None:
+			self._module = importlib.import_module(self._name) # (thread-safe)
+		return getattr(self._module, attribute)
+
+# numpy and matplotlib are only needed for the statistics, the column store and --query, i.e., not for --crawl or --download-crxs,
+#   which therefore shouldn't have to wait for them to be imported (importing matplotlib.pyplot alone takes about half a second):
+np = LazyModule("numpy")
+plt = LazyModule("matplotlib.pyplot")
 
 
 
+CHROME_WEBSTORE_URL = "https://chrome.google.com/webstore" # (the sitemap, the shards and the detail pages are all below this URL; cf. benchmark.py crawl, which points it at a local server)
+CRX_DOWNLOAD_URL = "https://clients2.google.com/service/update2/crx?response=redirect&os=win&arch=x64&os_arch=x86_64&nacl_arch=x86-64&prod=chromiumcrx&prodchannel=beta&prodversion=79.0.3945.53&lang=ru&acceptformat=crx3&x=id%3D{extension_id}%26installsource%3Dondemand%26uc"
+# => see: https://superuser.com/questions/290280/how-to-download-chrome-extensions-for-installing-on-another-computer (comment by https://superuser.com/users/552011/geograph)
+
 KEEP_TEMP_XML_FILES = False
 KEEP_TEMP_HTML_FILES = False
 
+MAX_CONNECTIONS_PER_HOST = 8 # default for --max-connections-per-host
+DEFAULT_TIMEOUT_IN_SECONDS = 30 # default for --timeout
+DEFAULT_USER_AGENT = f"Python-urllib/{sys.version_info.major}.{sys.version_info.minor}" # (the user agent that urllib.request would use; used when no --user-agent is given)
+DEFAULT_RATE_LIMIT = 1.0 # default for --rate-limit (requests per second to each host)
+DEFAULT_MAX_RATE_LIMIT = 10.0 # default for --max-rate-limit
+MIN_RATE_LIMIT = 0.05 # the rate limit is never decreased below this (i.e., at least one request every 20 seconds)
+DEFAULT_MAX_RETRIES = 5 # default for --max-retries
+NO_OF_SHARDS_TO_PREFETCH = 2 # only has an effect with --workers > 1
+SHUFFLE_BUFFER_SIZE = 64 # the extensions of each shard are crawled in random order, shuffled within a buffer of this size (cf. iterate_extensions_in_shard())
+FRONTIER_BATCH_SIZE = 64 # the extensions of a shard are added to the crawl state (and crawled right away) in batches of this many extensions, while the rest of the shard is still being parsed
+CSV_FLUSH_EVERY = 100 # lines added to an ExtensionsCSV are written in batches of (at most) this many lines...
+CSV_FLUSH_INTERVAL_IN_SECONDS = 5.0 # ...or after (at most) this many seconds
+CSV_REWRITE_EVERY = 10000 # lines updated in an ExtensionsCSV (--refresh) are applied in batches of (at most) this many lines (each batch rewrites the entire file)
+
+
+
+class DetailPageField:
+	# One data point scraped from an extension's detail page (e.g. the no. of users).
+	# Instead of running the (compiled) regex over the entire page (which is 500 KB+), the page is first searched for a literal *anchor*
+	#   that every match has to contain (e.g. ">Version</div>"); str.find() does that much faster than the regex engine.
+	# The regex is then only run on a narrow window around each occurrence of the anchor, until it matches.
+	# The regex must not match more than {lookbehind} characters before the anchor and must not extend more than {lookahead} characters past it
+	#   (lookahead=None means no limit).
+
+	def __init__(self, name, anchor, pattern, lookbehind=200, lookahead=1000):
+		self.name = name # e.g. "version_no"
+		self.anchor = anchor # e.g. ">Version</div>"
+		self.pattern = re.compile(pattern) # (compiled only once, at import)
+		self.lookbehind = lookbehind
+		self.lookahead = lookahead
+
+	def extract(self, html): # returns the re.Match (or None if the field couldn't be found)
+		pos = html.find(self.anchor)
+		while pos != -1:
+			end = len(html) if self.lookahead is None else min(len(html), pos + len(self.anchor) + self.lookahead)
+			m = self.pattern.search(html, max(0, pos - self.lookbehind), end)
+			if m:
+				return m
+			pos = html.find(self.anchor, pos + 1)
+		return None
+
+
+
+# The fields of an extension's detail page, see ChromeExtension.download_info_from_url() for examples of what the HTML looks like:
+DETAIL_PAGE_FIELDS = [
+	DetailPageField("title", '<h1 class="', '<h1 class="\\w+">(.+?)</h1>', lookbehind=0),
+	DetailPageField("description", '<div>Overview</div></h2>', '<h2 class="\\w+"><div>Overview</div></h2></div><div class="\\w+" jscontroller="\\w+" jsaction="[^"]+"><div jsname="\\w+" class="[^"]+"><p>([\\s\\S]+?)</p>', lookahead=None), # [\s\S] being a trick for saying "ALL characters, INCLUDING linebreaks"!
+	DetailPageField("no_of_users", ' user', '>([\\d,]+?) users?</div></div><div class="\\w+" jscontroller="\\w+" jsaction="', lookbehind=20),
+	DetailPageField("no_of_ratings", ' rating', '<span class="\\w+">([\\d,]+|No) ratings?</span>', lookbehind=50),
+	DetailPageField("avg_rating", ' out of 5<div class=', '<div class="\\w+"><h2 class="[^"]+"><span class="\\w+">(\\d(\\.\\d)?) out of 5<div class=', lookahead=0),
+	DetailPageField("version_no", '>Version</div>', '<div class="\\w+">Version</div><div class="\\w+">(.+?)</div>', lookbehind=50),
+	DetailPageField("size", '>Size</div>', '<div class="\\w+">Size</div><div>(.+?)</div>', lookbehind=50),
+	DetailPageField("last_updated", '>Updated</div>', '<div class="\\w+">Updated</div><div>(.+?)</div>', lookbehind=50),
+]
+
+
+
+def extract_detail_page_fields(html): # returns ({field name: re.Match or None}, {field name: extraction time in seconds})
+	matches = {}
+	extraction_times = {}
+	for field in DETAIL_PAGE_FIELDS:
+		start_time = time.perf_counter()
+		matches[field.name] = field.extract(html)
+		extraction_times[field.name] = time.perf_counter() - start_time
+	return matches, extraction_times
+
 
 
 class ChromeExtension:
+	# No per-instance __dict__ (read() creates one ChromeExtension for each line of the .CSV file, i.e., hundreds of thousands of them):
+	__slots__ = ("extension_id", "title", "description", "no_of_users", "no_of_ratings", "avg_rating", "version_no", "size", "last_updated", "no_of_languages", "languages")
+
 	def __init__(self, extension_id, title="", description="", no_of_users=0, no_of_ratings=0, avg_rating=0.0, version_no="", size="", last_updated="", no_of_languages=0, languages=""):
 		self.extension_id = extension_id
 		self.title = title
@@ -58,54 +166,74 @@ class ChromeExtension:
 	def __str__(self):
 		return self.as_cvs_line()
 
-	def from_csv_line(csv_line):
+	def from_csv_line(csv_line): # returns None for a torn line (i.e., a line that the crawler was killed in the middle of writing)
 		vals = csv_line.rstrip('\r\n').split(",")
-		return ChromeExtension(vals[0], vals[1], vals[2], int(vals[3]), int(vals[4]), float(vals[5]), vals[6], vals[7], vals[8], int(vals[9]), vals[10])
+		try:
+			# The values that repeat a lot (version no., size, date, languages and avg. rating) are shared between all extensions instead of being stored once per extension:
+			return ChromeExtension(vals[0], vals[1], vals[2], int(vals[3]), int(vals[4]), parse_avg_rating(vals[5]), sys.intern(vals[6]), sys.intern(vals[7]), sys.intern(vals[8]), int(vals[9]), sys.intern(vals[10]))
+		except (IndexError, ValueError): # (too few values, or a number that has been cut off)
+			return None
 
 	def langs(self):
-		return self.languages.split("|")
+		return list(split_languages(self.languages)) # (the string is only split once for each distinct combination of languages)
 
-	def download_info_from_url(self, extension_url=None, user_agent=""):
+	def download_info_from_url(self, extension_url=None, user_agent="", validators=None, parse_pool=None): # returns the time it took to extract each field from the HTML, cf. extract_detail_page_fields()
+		# validators = cf. download(); if the page hasn't changed since the validators were obtained, None is returned (and nothing is changed)
+		# parse_pool = a ProcessPoolExecutor to parse the page in (--parse-workers), or None to parse it in the calling thread
 		if extension_url is None:
-			extension_url = "https://chrome.google.com/webstore/detail/" + self.extension_id
-		print(f"Getting info about extension with ID {self.extension_id} from URL: {extension_url}")
-
-		# (1.) Retrieve HTML source code of https://chrome.google.com/webstore/detail/xxx...xxx
-		temp_dest_file = "./." + self.extension_id + ".html" # e.g. "./.abcdefghijklmnopqrstuvwxyzabcdef.html"
-		download_file(file_url=extension_url, destination_file=temp_dest_file, user_agent=user_agent)
-		html = ""
-		with open(temp_dest_file, "r") as html_file:
-			html = html_file.read()
-		print(f"Downloaded '{extension_url}' to '{temp_dest_file}': {html[:10]} ... {html[-10:]}")
-		# Delete downloaded .HTML file again after it has been read in:
-		if not KEEP_TEMP_HTML_FILES:
-			os.remove(temp_dest_file)
-
-
-		# (2.) Retrieve each relevant data point:
+			extension_url = CHROME_WEBSTORE_URL + "/detail/" + self.extension_id
+		log("debug", f"Getting info about extension with ID {self.extension_id} from URL: {extension_url}")
+
+		# (1.) Retrieve HTML source code of https://chrome.google.com/webstore/detail/xxx...xxx (in memory, without a round-trip through a temporary file)
+		html = download(file_url=extension_url, user_agent=user_agent, validators=validators, kind="detail_page")
+		if html is None:
+			log("debug", f"Not modified: '{extension_url}'")
+			return None
+		log("debug", f"Downloaded '{extension_url}' ({len(html)} bytes)")
+
+		# (2.) Parse it, i.e., fill in the fields of this ChromeExtension:
+		if parse_pool is not None: # (the regex work then doesn't hold the GIL of the process doing all the network I/O)
+			parsed_extension, field_extraction_times, failed_fields = parse_pool.submit(parse_detail_page, self, html).result()
+			for attribute in ChromeExtension.__slots__:
+				setattr(self, attribute, getattr(parsed_extension, attribute))
+		else:
+			field_extraction_times, failed_fields = self.parse_info(html)
+		metrics.observe("parse_seconds", sum(field_extraction_times.values()))
+		for name in failed_fields:
+			metrics.inc("field_extraction_failures_total", field=name)
+		return field_extraction_times # = {field name: extraction time in seconds}
+
+	def parse_info(self, html): # html = the (undecoded) detail page of this extension; returns ({field name: extraction time in seconds}, [names of the fields that couldn't be extracted])
+		html = html.decode("utf-8")
+		if KEEP_TEMP_HTML_FILES: # (for debugging only)
+			keep_temp_file("./." + self.extension_id + ".html", html) # e.g. "./.abcdefghijklmnopqrstuvwxyzabcdef.html"
+
+		# Retrieve each relevant data point (the patterns can be found in DETAIL_PAGE_FIELDS):
 		# => cf. https://stackoverflow.com/questions/4666973/how-to-extract-the-substring-between-two-markers
+		fields, field_extraction_times = extract_detail_page_fields(html)
+		failed_fields = [name for name, m in fields.items() if not m]
 
 		# (2a) Retrieve title:
-		m = re.search('<h1 class="\\w+">(.+?)</h1>', html)
+		m = fields["title"]
 		if m:
 			self.title = m.group(1).replace(",", "")
 		else:
-			print(f"Error: failed to extract title for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract title for extension with ID {self.extension_id}")
 
 		# (2b) Retrieve description (or rather the first paragraph of the description):
 		# e.g.: <h2 class="wpJH0b"><div>Overview</div></h2></div><div class="RNnO5e" jscontroller="qv5bsb" jsaction="click:i7GaQb(rs1XOd);rcuQ6b:npT2md"><div jsname="ij8cu" class="JJ3H1e JpY6Fd"><p>Display equations in ChatGPT using Latex notation</p>
-		m = re.search('<h2 class="\\w+"><div>Overview</div></h2></div><div class="\\w+" jscontroller="\\w+" jsaction=".+"><div jsname="\\w+" class=".+"><p>([\\s\\S]+?)</p>', html) # [\s\S] being a trick for saying "ALL characters, INCLUDING linebreaks"!
+		m = fields["description"]
 		if m:
 			self.description = m.group(1).replace(",", "").replace("\n", "\\n")
 		else:
-			print(f"Error: failed to extract description for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract description for extension with ID {self.extension_id}")
 
 		# (2c) Retrieve no. of users:
-		m = re.search('>([\\d,]+?) users?</div></div><div class="\\w+" jscontroller="\\w+" jsaction="', html)
+		m = fields["no_of_users"]
 		if m:
 			self.no_of_users = int(m.group(1).replace(",", "")) # Removing commas is important here as int("10,000") throws a ValueError, for example!
 		else:
-			print(f"Error: failed to extract number of users for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract number of users for extension with ID {self.extension_id}")
 
 		# (2d) Retrieve no. of ratings:
 		# e.g.: <span class="PmmSTd">24 ratings</span>
@@ -115,11 +243,11 @@ class ChromeExtension:
 		#       <span class="GvZmud" role="img" aria-label="Average rating 4.8 out of 5 stars. 16 ratings." id="i20">
 		#       <div>Average rating 4.8 out of 5 stars. 16 ratings.</div>
 		#
-		m = re.search('<span class="\\w+">([\\d,]+|No) ratings?</span>', html)
+		m = fields["no_of_ratings"]
 		if m:
 			self.no_of_ratings = 0 if m.group(1) == "No" else int(m.group(1).replace(",", ""))
 		else:
-			print(f"Error: failed to extract number of ratings for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract number of ratings for extension with ID {self.extension_id}")
 
 		# (2e) Retrieve average rating:
 		# e.g.: <div class="eTD1t"><h2 class="wpJH0b Yemige"><span class="GlMWqe">4.7 out of 5<div class=
@@ -131,38 +259,41 @@ class ChromeExtension:
 		#       <span class="GvZmud" role="img" aria-label="Average rating 4.8 out of 5 stars. 16 ratings." id="i20">
 		#       <div>Average rating 4.8 out of 5 stars. 16 ratings.</div>
 		#
-		m = re.search('<div class="\\w+"><h2 class=".+"><span class="\\w+">(\\d(\\.\\d)?) out of 5<div class=', html)
+		m = fields["avg_rating"]
 		if m:
 			self.avg_rating = float(m.group(1))
 		else:
-			print(f"Error: failed to extract average rating for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract average rating for extension with ID {self.extension_id}")
 
 		# (2f) Retrieve version number:
-		m = re.search('<div class="\\w+">Version</div><div class="\\w+">(.+?)</div>', html)
+		m = fields["version_no"]
 		if m:
 			self.version_no = m.group(1).replace(",", "")
 		else:
-			print(f"Error: failed to extract version number for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract version number for extension with ID {self.extension_id}")
 
 		# (2g) Retrieve size:
-		m = re.search('<div class="\\w+">Size</div><div>(.+?)</div>', html)
+		m = fields["size"]
 		if m:
 			self.size = m.group(1).replace(",", "")
 		else:
-			print(f"Error: failed to extract size for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract size for extension with ID {self.extension_id}")
 
 		# (2h) Retrieve last updated:
-		m = re.search('<div class="\\w+">Updated</div><div>(.+?)</div>', html) # e.g.: <div class="nws2nb">Updated</div><div>May 14, 2024</div>
+		m = fields["last_updated"] # e.g.: <div class="nws2nb">Updated</div><div>May 14, 2024</div>
 		if m:
 			self.last_updated = m.group(1).replace(",", "")
 		else:
-			print(f"Error: failed to extract date of last update for extension with ID {self.extension_id}", file=sys.stderr)
+			log("warning", f"Error: failed to extract date of last update for extension with ID {self.extension_id}")
+
+		return field_extraction_times, failed_fields
 
-	def download_crx_to(self, crx_dest_folder, user_agent=""): # may throw urllib.error.HTTPError 
+	def download_crx_to(self, crx_dest_folder, user_agent=""): # may throw urllib.error.HTTPError or ValueError (if the downloaded file is not a valid .CRX file)
 		crx_dest_file = os.path.join(crx_dest_folder, self.extension_id + ".crx")
-		url = f"https://clients2.google.com/service/update2/crx?response=redirect&os=win&arch=x64&os_arch=x86_64&nacl_arch=x86-64&prod=chromiumcrx&prodchannel=beta&prodversion=79.0.3945.53&lang=ru&acceptformat=crx3&x=id%3D{self.extension_id}%26installsource%3Dondemand%26uc"
-		# => see: https://superuser.com/questions/290280/how-to-download-chrome-extensions-for-installing-on-another-computer (comment by https://superuser.com/users/552011/geograph)
-		download_file(file_url=url, destination_file=crx_dest_file, user_agent=user_agent)
+		url = CRX_DOWNLOAD_URL.format(extension_id=self.extension_id)
+		# The .CRX file only appears under its final name once it has been downloaded completely and has been validated (cf. download_file_resumable()):
+		download_file_resumable(file_url=url, destination_file=crx_dest_file, user_agent=user_agent, validate=validate_crx_file, kind="crx")
+		crx_manifest(crx_dest_folder).add(self.extension_id, crx_dest_file)
 		return crx_dest_file
 
 	def download_crx_to___old(self, crx_dest_folder, user_agent=""): # may throw urllib.error.HTTPError or AttributeError
@@ -170,14 +301,9 @@ class ChromeExtension:
 		
 		# (1.) Visit https://www.crx4chrome.com/extensions/abcdefghijklmnopqrstuvwxyzabcdef/ and download as HTML:
 		url = "https://www.crx4chrome.com/extensions/" + self.extension_id
-		temp_dest_file = "./.crx4chrome.extensions." + self.extension_id + ".html" # e.g. "./.crx4chrome.abcdefghijklmnopqrstuvwxyzabcdef.html"
-		download_file(file_url=url, destination_file=temp_dest_file, user_agent=user_agent)
-		html = ""
-		with open(temp_dest_file, "r") as html_file:
-			html = html_file.read()
-		# Delete downloaded .HTML file again after it has been read in:
-		if not KEEP_TEMP_HTML_FILES:
-			os.remove(temp_dest_file)
+		html = download(file_url=url, user_agent=user_agent).decode("utf-8")
+		if KEEP_TEMP_HTML_FILES: # (for debugging only)
+			keep_temp_file("./.crx4chrome.extensions." + self.extension_id + ".html", html) # e.g. "./.crx4chrome.extensions.abcdefghijklmnopqrstuvwxyzabcdef.html"
 
 		# (2.) Extract the the link to the download site (e.g. "https://www.crx4chrome.com/crx/584/") from this HTML:
 		#      => example: <a href="/crx/584/" title="Download Now">Download Now &gt;</a>
@@ -188,14 +314,9 @@ class ChromeExtension:
 			raise AttributeError(f"Error: failed to download extension with ID {self.extension_id} (couldn't extract link to download site from '{url}')")
 
 		# (3.) Visit https://www.crx4chrome.com/crx/0000/ and download as HTML:
-		temp_dest_file = "./.crx4chrome.crx." + self.extension_id + ".html" # e.g. "./.crx4chrome.abcdefghijklmnopqrstuvwxyzabcdef.html"
-		download_file(file_url=url, destination_file=temp_dest_file, user_agent=user_agent)
-		html = ""
-		with open(temp_dest_file, "r") as html_file:
-			html = html_file.read()
-		# Delete downloaded .HTML file again after it has been read in:
-		if not KEEP_TEMP_HTML_FILES:
-			os.remove(temp_dest_file)
+		html = download(file_url=url, user_agent=user_agent).decode("utf-8")
+		if KEEP_TEMP_HTML_FILES: # (for debugging only)
+			keep_temp_file("./.crx4chrome.crx." + self.extension_id + ".html", html) # e.g. "./.crx4chrome.crx.abcdefghijklmnopqrstuvwxyzabcdef.html"
 
 		# (4.) Extract the the download link from this HTML (e.g. "https://www.crx4chrome.com/go.php?p=584&i=aapbdbdomjkkjkaonfhkkikfgjllcleb&s=O37YH28UQ4xbA&l=https%3A%2F%2Ff6.crx4chrome.com%2Fcrx.php%3Fi%3Daapbdbdomjkkjkaonfhkkikfgjllcleb%26v%3D2.0.15"):
 		#      => example: <p class="app-desc">download crx from <a href="/go.php?p=584&i=aapbdbdomjkkjkaonfhkkikfgjllcleb&s=O37YH28UQ4xbA&l=https%3A%2F%2Ff6.crx4chrome.com%2Fcrx.php%3Fi%3Daapbdbdomjkkjkaonfhkkikfgjllcleb%26v%3D2.0.15" class="more" rel="nofollow" title="download crx from crx4chrome">crx4chrome</a></p>
@@ -215,41 +336,211 @@ class ChromeExtension:
 		ext_csv = extensions_csv if isinstance(extensions_csv, ExtensionsCSV) else ExtensionsCSV(extensions_csv)
 		return ext_csv.contains(self)
 
-	def add_to_extensions_csv(self, extensions_csv):
-		ext_csv = extensions_csv if isinstance(extensions_csv, ExtensionsCSV) else ExtensionsCSV(extensions_csv)
-		ext_csv.add(self)
+	def add_to_extensions_csv(self, extensions_csv, on_written=None): # cf. ExtensionsCSV.add()
+		if isinstance(extensions_csv, ExtensionsCSV):
+			extensions_csv.add(self, on_written)
+		else:
+			with ExtensionsCSV(extensions_csv) as ext_csv: # (written right away)
+				ext_csv.add(self, on_written)
 
 	def from_extensions_csv(extensions_csv):
 		ext_csv = extensions_csv if isinstance(extensions_csv, ExtensionsCSV) else ExtensionsCSV(extensions_csv)
 		return ext_csv.read()
 
+	def size_in_bytes(self): # e.g.: 7958692 for "7.59MiB", or None if the size is unknown
+		if self.size is None or self.size == "":
+			return None
+		return parse_size(self.size)
+
 	def months_since_last_update(self):
-		date_string = self.last_updated # e.g.: "August 9 2014"
-		if date_string is None or date_string == "":
+		last_updated_ordinal = parse_date(self.last_updated) # e.g.: 735454 for "August 9 2014"
+		if last_updated_ordinal is None:
 			return None
-		last_updated_date = datetime.strptime(date_string, '%B %d %Y') # e.g.: datetime.datetime(2014, 8, 9, 0, 0) # cf. https://stackoverflow.com/questions/2265357/parse-date-string-and-change-format and https://docs.python.org/3/library/datetime.html#strftime-and-strptime-format-codes
-		time_delta = datetime.today() - last_updated_date # e.g.: datetime.timedelta(days=3636, seconds=78182, microseconds=601750)
-		no_of_months = time_delta.days/30.437 # On average, there are 30.437 days in each month!
+		no_of_days = date.today().toordinal() - last_updated_ordinal # (= (datetime.today() - datetime(2014, 8, 9)).days)
+		no_of_months = no_of_days/30.437 # On average, there are 30.437 days in each month!
 		return no_of_months
 
 
 
 class ExtensionsCSV:
-	def __init__(self, path):
+	# Lines are added in batches: add() only buffers the line, which is written (together with all other buffered lines, in a single write())
+	#   once {flush_every} lines have been buffered, after at most {flush_interval} seconds, on flush()/close() or when the program exits.
+	# Each batch ends with a complete line; should the program be killed in the middle of writing a batch nevertheless,
+	#   the torn last line is removed before the next batch is appended (and ignored by read()).
+	# Use on_written (cf. add()) to find out when a line has actually been written, e.g. to only then record it as done in the CrawlState.
+	# Lines of extensions that are already in the .CSV file are replaced using update() (--refresh): as that means rewriting the entire file,
+	#   the updates are collected and applied together, once {rewrite_every} updates have been collected and on flush()/close().
+
+	def __init__(self, path, flush_every=CSV_FLUSH_EVERY, flush_interval=CSV_FLUSH_INTERVAL_IN_SECONDS, fsync=False, rewrite_every=CSV_REWRITE_EVERY):
 		self.path = Path(path) # default: "./extensions.csv"
 		if not self.path.is_file():
 			# Create file:
 			open(self.path, 'a').close() # https://stackoverflow.com/questions/12654772/create-empty-file-using-python
+		self.flush_every = flush_every # = max. no. of lines buffered
+		self.flush_interval = flush_interval # = max. no. of seconds a line stays in the buffer
+		self.fsync = fsync # True = os.fsync() the .CSV file after writing each batch (s.t. it even survives a power failure)
+		self.rewrite_every = rewrite_every # = max. no. of updated lines collected before the file is rewritten
+		self._extension_ids = None # = the set of IDs of all extensions listed in the .CSV file; loaded (once!) on the first call to contains(), then kept up-to-date by add()
+		self._lock = threading.Lock() # serializes all writes (and the loading of the ID index), s.t. ExtensionsCSV can be shared between worker threads
+		self._dataset = None # = the ExtensionsDataset used by all the plot_...() methods; loaded (once!) by dataset()
+		self._buffer = [] # = the lines that have been add()ed but not written yet
+		self._on_written = [] # = the on_written callbacks of the lines in the buffer
+		self._updates = {} # = extension ID -> updated line (as bytes), cf. update()
+		self._on_updated = [] # = the on_written callbacks of the updated lines
+		self._csv_file = None # = the .CSV file opened for appending (on the first flush, until close())
+		self._flusher = None # = the thread that flushes the buffer every {flush_interval} seconds (started on the first add())
+		self._closed = threading.Event()
 
 	def read(self) -> List[ChromeExtension]:
-		return [ChromeExtension.from_csv_line(csv_line) for csv_line in open(self.path, "r")]
+		return list(self.iterate())
+
+	def iterate(self): # like read() but yields the extensions one by one instead of keeping all of them in memory at once
+		self.flush()
+		with open(self.path, "r") as csv_file:
+			for csv_line in csv_file:
+				extension = ChromeExtension.from_csv_line(csv_line) if csv_line.endswith("\n") else None
+				if extension is None:
+					print(f"Warning: ignoring torn line in '{self.path}': {csv_line[:50]} ...", file=sys.stderr)
+				else:
+					yield extension
+
+	def columns(self, column_store_path=""): # returns the contents of the .CSV file as an ExtensionsColumnStore
+		# With a column_store_path (--column-store), the column store there is used, (re-)creating it first if it's missing or out of date.
+		# Without, an up-to-date column store at the default path (e.g. "./extensions.columns", cf. --export-column-store) is used if there is one;
+		#   otherwise, a temporary column store is created (and deleted again when the program exits), i.e., nothing is written next to the .CSV file.
+		self.flush()
+		persistent = column_store_path != ""
+		column_store_path = Path(column_store_path) if persistent else self.path.with_suffix(".columns") # default: "./extensions.columns"
+		if (column_store_path / "meta.json").is_file():
+			column_store = ExtensionsColumnStore(column_store_path)
+			if column_store.is_up_to_date(self.path):
+				return column_store
+		if not persistent:
+			temp_folder = tempfile.mkdtemp(prefix="chrome_webstore_crawler_")
+			atexit.register(shutil.rmtree, temp_folder, ignore_errors=True)
+			return ExtensionsColumnStore.from_csv(self.path, Path(temp_folder) / column_store_path.name)
+		print(f"Creating column store '{column_store_path}' from '{self.path}' ...", file=sys.stderr) # (stderr, s.t. the output of --query can be piped into a .CSV file)
+		return ExtensionsColumnStore.from_csv(self.path, column_store_path)
+
+	def dataset(self, column_store_path=""): # returns the ExtensionsDataset of this .CSV file, loading it only once (column_store_path = cf. columns())
+		if self._dataset is None:
+			self._dataset = ExtensionsDataset(self.columns(column_store_path))
+		return self._dataset
+
+	def _load_extension_ids(self):
+		# Only the IDs (i.e., everything before the first comma) are extracted; no ChromeExtension objects are created here.
+		# (Read-only: a torn last line, i.e., a line that the crawler was killed in the middle of writing, is skipped, s.t. the extension will be crawled again;
+		#   the line itself is only removed from the file right before the next batch is written, cf. remove_torn_last_line().)
+		extension_ids = set()
+		with open(self.path, "rb") as csv_file:
+			for csv_line in csv_file:
+				if csv_line.endswith(b"\n"):
+					extension_ids.add(csv_line.split(b",", 1)[0].decode())
+		extension_ids.update(csv_line.split(",", 1)[0] for csv_line in self._buffer) # (not written yet)
+		self._extension_ids = extension_ids
 
 	def contains(self, extension: ChromeExtension):
-		return any(extension.extension_id == ext.extension_id for ext in self.read())
-
-	def add(self, extension: ChromeExtension):
-		with open(self.path, "a") as csv_file:
-			csv_file.write(extension.as_cvs_line() + "\n")
+		with self._lock:
+			if self._extension_ids is None:
+				self._load_extension_ids()
+			return extension.extension_id in self._extension_ids # O(1) instead of parsing the entire .CSV file every time
+
+	def add(self, extension: ChromeExtension, on_written=None): # on_written = a function that is called once the line has been written (from the thread writing it)
+		with self._lock:
+			self._buffer.append(extension.as_cvs_line() + "\n")
+			if on_written is not None:
+				self._on_written.append(on_written)
+			if self._extension_ids is not None:
+				self._extension_ids.add(extension.extension_id)
+			if self._flusher is None:
+				atexit.register(self.close) # (flush the buffer when the program exits, even because of an exception)
+				self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+				self._flusher.start()
+			callbacks = self._write_buffer() if len(self._buffer) >= self.flush_every else []
+		for callback in callbacks:
+			callback()
+
+	def update(self, extension: ChromeExtension, on_written=None): # replaces the line of an extension that's already in the .CSV file (or adds it, if it's not)
+		with self._lock:
+			self._updates[extension.extension_id] = (extension.as_cvs_line() + "\n").encode()
+			if on_written is not None:
+				self._on_updated.append(on_written)
+			if self._extension_ids is not None:
+				self._extension_ids.add(extension.extension_id)
+			callbacks = self._apply_updates() if len(self._updates) >= self.rewrite_every else []
+		for callback in callbacks:
+			callback()
+
+	def flush(self): # writes all buffered lines to the .CSV file (and applies all updates)
+		with self._lock:
+			callbacks = self._write_buffer() + self._apply_updates()
+		for callback in callbacks:
+			callback()
+
+	def close(self): # flushes the buffer and closes the .CSV file (ExtensionsCSV can also be used as a context manager)
+		self._closed.set()
+		self.flush()
+		with self._lock:
+			if self._csv_file is not None:
+				self._csv_file.close()
+				self._csv_file = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def _flush_periodically(self):
+		while not self._closed.wait(self.flush_interval):
+			with self._lock:
+				callbacks = self._write_buffer() # (only the added lines; rewriting the file for the updates every few seconds would be too expensive)
+			for callback in callbacks:
+				callback()
+
+	def _write_buffer(self): # (self._lock must be held) writes all buffered lines in a single write(), returns the on_written callbacks to be called
+		if len(self._buffer) == 0:
+			return []
+		if self._csv_file is None:
+			self._csv_file = open(self.path, "a+b", buffering=0) # (writes always go to the end of the file)
+			remove_torn_last_line(self._csv_file) # (s.t. the batch isn't appended onto a torn line)
+		data = memoryview("".join(self._buffer).encode())
+		while len(data) > 0:
+			data = data[self._csv_file.write(data):] # (a raw write() might write less than everything)
+		if self.fsync:
+			os.fsync(self._csv_file.fileno())
+		self._buffer = []
+		callbacks, self._on_written = self._on_written, []
+		return callbacks
+
+	def _apply_updates(self): # (self._lock must be held) rewrites the .CSV file with all updated lines (only if any line has actually changed), returns the on_written callbacks to be called
+		if len(self._updates) == 0:
+			return []
+		callbacks = self._write_buffer() # (s.t. the file contains every line added so far)
+		if self._csv_file is not None:
+			self._csv_file.close() # (the file is replaced below, the next batch of added lines will then be appended to the new file)
+			self._csv_file = None
+		updates, self._updates = self._updates, {}
+		no_of_updated_lines = 0
+		temp_path = self.path.with_name(self.path.name + ".tmp")
+		with open(self.path, "rb") as csv_file, open(temp_path, "wb") as temp_file:
+			for csv_line in csv_file:
+				if not csv_line.endswith(b"\n"): # (a torn last line)
+					continue
+				updated_line = updates.pop(csv_line.split(b",", 1)[0].decode(), csv_line)
+				no_of_updated_lines += updated_line != csv_line
+				temp_file.write(updated_line)
+			temp_file.writelines(updates.values()) # (the extensions that weren't in the .CSV file yet)
+			if self.fsync:
+				temp_file.flush()
+				os.fsync(temp_file.fileno())
+		if no_of_updated_lines + len(updates) > 0:
+			os.replace(temp_path, self.path) # (atomic, i.e., a crash leaves either the old or the new file behind)
+			print(f"Updated {no_of_updated_lines} line(s) and added {len(updates)} line(s) in '{self.path}'.", file=sys.stderr)
+		else:
+			os.remove(temp_path) # (no line has actually changed, so leave the file as it is, e.g. for lines crawled before their row hash was recorded in the CrawlState)
+		callbacks, self._on_updated = callbacks + self._on_updated, []
+		return callbacks
 
 	# (0.) PDF/bar plot: frequency of each bin of no. of users (<10 users, <100 users, <1000 users, ...) => are most extensions rarely used?
 	# (1.) plot cumulative distribution function of extension size in KB => important as larger extensions are generally harder to analyze
@@ -286,15 +577,12 @@ class ExtensionsCSV:
 
 	def plot_pdf_no_of_users(self): # (0.)
 		print("(0.) Plotting PDF (Probability Density Function) of no of users (<10 users, <100 users, <1000 users, ...).")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		extensions.sort(key=lambda ext: ext.no_of_users) # Sort extensions by no. of users, in ascending order.
+		dataset = self.dataset()
 		# Compute bins (<10 users, <100 users, <1000 users, ...):
-		bins = {} # something like: {10: 12, 100: 1234, 1000: 123, 10000: ...}
-		for ext in extensions:
-			bin_ = 10 if ext.no_of_users < 10 else 10**(floor(log10(ext.no_of_users))+1) # e.g., turns 123 into 1000, i.e., the smallest power of 10 that's strictly(!) larger than ext.no_of_users
-			if bin_ not in bins.keys():
-				bins[bin_] = 0
-			bins[bin_] += 1
+		powers_of_10 = 10 ** np.arange(1, 19, dtype=np.int64) # = [10, 100, 1000, ...]
+		bins_ = powers_of_10[np.searchsorted(powers_of_10, dataset.no_of_users, side='right')] # e.g., turns 123 into 1000, i.e., the smallest power of 10 that's strictly(!) larger than the no. of users
+		xs, ys = np.unique(bins_, return_counts=True)
+		bins = dict(zip(xs.tolist(), ys.tolist())) # something like: {10: 12, 100: 1234, 1000: 123, 10000: ...}
 		print(f"\t=> Bins: {bins}")
 		# Plot:
 		xs = sorted(list(bins.keys()))
@@ -309,13 +597,13 @@ class ExtensionsCSV:
 		print("(1.) Plotting cumulative distribution function of extension size in KB.")
 		NO_OF_BINS = 40
 		print(f"\t=> No. of bins: {NO_OF_BINS}")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		extension_sizes = [parse_size(ext.size)/1000 for ext in extensions if ext.size not in [None, ""]] # = [parse_size("7.59MiB")/1000, parse_size("29.56KiB")/1000, ...] = [7958.692, ...] # dividing by 1000 to turn into kilo-bytes
+		dataset = self.dataset()
+		extension_sizes = dataset.size_in_bytes[dataset.has_size] / 1000 # = [7958.692, ...] # dividing by 1000 to turn into kilo-bytes
 		values, base = np.histogram(extension_sizes, bins=NO_OF_BINS) # values = [1,2,3,2,1] = how many extensions fall into each bin (unit = count) # base = [10, 20, 30, 40, 50] = the bins (unit = kilo-bytes)
 		print(f"\t=> Bins (unit=KB): {base[:5]} ... {base[-5:]}")
 		print(f"\t=> Bin assignments: {values[:5]} ... {values[-5:]}")
 		cumulative = np.cumsum(values) # = [1, 3, 6, 8, 9]
-		cumulative_as_percentage = [100.0*(x/cumulative[-1]) for x in cumulative] # = [11.11, 33.33, 66.66, 88.88, 100.0]
+		cumulative_as_percentage = 100.0 * cumulative / cumulative[-1] # = [11.11, 33.33, 66.66, 88.88, 100.0]
 		plt.plot(base[:-1], cumulative_as_percentage, c='blue')
 		plt.xlabel("KB")
 		plt.ylabel("%")
@@ -325,13 +613,13 @@ class ExtensionsCSV:
 		print("(2.) Plotting cumulative distribution function of time since last update in months.")
 		NO_OF_BINS = 40
 		print(f"\t=> No. of bins: {NO_OF_BINS}")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		last_updates = [ext.months_since_last_update() for ext in extensions if ext.months_since_last_update() is not None]
+		dataset = self.dataset()
+		last_updates = dataset.months_since_last_update[dataset.has_last_updated]
 		values, base = np.histogram(last_updates, bins=NO_OF_BINS) # values = [1,2,3,2,1] = how many extensions fall into each bin (unit = count) # base = [1, 2, 3, 4, 5] = the bins (unit = months)
 		print(f"\t=> Bins (values=no. of months): {base[:5]} ... {base[-5:]}")
 		print(f"\t=> Bin assignments: {values[:5]} ... {values[-5:]}")
 		cumulative = np.cumsum(values) # = [1, 3, 6, 8, 9]
-		cumulative_as_percentage = [100.0*(x/cumulative[-1]) for x in cumulative] # = [11.11, 33.33, 66.66, 88.88, 100.0]
+		cumulative_as_percentage = 100.0 * cumulative / cumulative[-1] # = [11.11, 33.33, 66.66, 88.88, 100.0]
 		print(f"\t=> Cumulative percentages (no. of months since last update -> cumulative percentage): {[(float(base[i]), float(cumulative_as_percentage[i])) for i in range(len(cumulative_as_percentage))]}")
 		for i in range(len(cumulative_as_percentage)):
 			print(f"\t=> {100-cumulative_as_percentage[i]}% of extensions have not been updated for at least {base[i]} months")
@@ -344,13 +632,12 @@ class ExtensionsCSV:
 		print("(3.) Plotting cumulative distribution function of number of users.")
 		NO_OF_BINS = 40
 		print(f"\t=> No. of bins: {NO_OF_BINS}")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		no_of_users = [ext.no_of_users for ext in extensions] # = [1, 270, 308, 8, 0, ...] = the no. of users for each extension
-		values, base = np.histogram(no_of_users, bins=NO_OF_BINS) # values = [1,2,3,2,1] = how many extensions fall into each bin (unit = count) # base = [10, 20, 30, 40, 50] = the bins (no. of users)
+		dataset = self.dataset()
+		values, base = np.histogram(dataset.no_of_users, bins=NO_OF_BINS) # values = [1,2,3,2,1] = how many extensions fall into each bin (unit = count) # base = [10, 20, 30, 40, 50] = the bins (no. of users)
 		print(f"\t=> Bins (values=no. of users): {base[:5]} ... {base[-5:]}")
 		print(f"\t=> Bin assignments: {values[:5]} ... {values[-5:]}")
 		cumulative = np.cumsum(values) # = [1, 3, 6, 8, 9]
-		cumulative_as_percentage = [100.0*(x/cumulative[-1]) for x in cumulative] # = [11.11, 33.33, 66.66, 88.88, 100.0]
+		cumulative_as_percentage = 100.0 * cumulative / cumulative[-1] # = [11.11, 33.33, 66.66, 88.88, 100.0]
 		plt.plot(base[:-1], cumulative_as_percentage, c='blue')
 		plt.xlabel("No. of users")
 		plt.ylabel("%")
@@ -358,13 +645,13 @@ class ExtensionsCSV:
 
 	def plot_cum_distr_no_of_users_as_percentage_of_all_users(self): # (4.)
 		print("(4.) Plotting cumulative distribution function of number of users as percentage of sum of *all* users.")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		extensions.sort(key=lambda ext: ext.no_of_users) # Sort extensions by no. of users, in ascending order.
-		no_of_users = [ext.no_of_users for ext in extensions] # = [0, 1, 8, 270, 308, ...] = the no. of users for each extension
-		sum_of_all_user_counts = sum(no_of_users) # Note that this number might be rather large as some users might have *multiple* extensions installed!
-		print(f"\t=> Sum of all user counts: {sum_of_all_user_counts}")
-		xs = [ x for x in range(101) ] # = % of extensions
-		ys = [ 100 * sum(ext.no_of_users for ext in extensions[:int(len(extensions)*(x/100))]) / sum_of_all_user_counts for x in xs ] # = % of cumulative user count
+		dataset = self.dataset()
+		lorenz_curve = LorenzCurve(dataset.no_of_users)
+		print(f"\t=> Sum of all user counts: {lorenz_curve.total}") # Note that this number might be rather large as some users might have *multiple* extensions installed!
+		print(f"\t=> Gini coefficient of the user counts: {lorenz_curve.gini_coefficient():.4f}") # (0 = all extensions have the same no. of users, 1 = a single extension has all the users)
+		for percent in [0.1, 1, 5, 10, 20, 50]:
+			print(f"\t=> The top {percent}% of extensions have {lorenz_curve.top_share(percent):.2f}% of all users")
+		xs, ys = lorenz_curve.points() # = % of extensions (with one point per extension), % of cumulative user count
 		plt.plot(xs, ys, c='blue')
 		plt.xlabel("% of extensions")
 		plt.ylabel("% of cumulative user count")
@@ -374,10 +661,9 @@ class ExtensionsCSV:
 
 	def plot_corr_no_of_users_time_since_last_update(self, log_scale=False): # (5.)
 		print("(5.) Correlation between no. of users and time since last update in months (scatter plot).")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		extensions = [ext for ext in extensions if ext.no_of_users is not None and ext.months_since_last_update() is not None]
-		no_of_users = [ext.no_of_users for ext in extensions]
-		months_since_last_update = [ext.months_since_last_update() for ext in extensions]
+		dataset = self.dataset()
+		no_of_users = dataset.no_of_users[dataset.has_last_updated]
+		months_since_last_update = dataset.months_since_last_update[dataset.has_last_updated]
 		plt.scatter(no_of_users, months_since_last_update, c='blue')
 		plt.xlabel("No. of users")
 		plt.ylabel("Months since last update")
@@ -387,10 +673,9 @@ class ExtensionsCSV:
 
 	def plot_corr_no_of_users_ext_size(self, log_scale=False): # (6.)
 		print("(6.) Correlation between no. of users and extension size.")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		extensions = [ext for ext in extensions if ext.no_of_users is not None and ext.size not in [None, ""]]
-		no_of_users = [ext.no_of_users for ext in extensions]
-		extension_size = [parse_size(ext.size)/1000 for ext in extensions] # divide by 1000 to turn bytes into KB
+		dataset = self.dataset()
+		no_of_users = dataset.no_of_users[dataset.has_size]
+		extension_size = dataset.size_in_bytes[dataset.has_size] / 1000 # divide by 1000 to turn bytes into KB
 		plt.scatter(no_of_users, extension_size, c='blue')
 		plt.xlabel("No. of users")
 		plt.ylabel("Extension size (KB)")
@@ -400,16 +685,11 @@ class ExtensionsCSV:
 
 	def plot_bars_quantiles_user_count(self, no_of_quantiles=4, compute_median=False): # (7.)
 		print(f"(7.) Bar plot of the {'median' if compute_median else 'average'} user count for each of the {no_of_quantiles} quantiles of extensions, sorted *by* user count.")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		extensions.sort(key=lambda ext: ext.no_of_users) # Sort extensions by no. of users, in ascending order.
-		size_per_quantile = len(extensions) // no_of_quantiles # = how many extensions will be in each quantile
-		quantiles = [extensions[i*size_per_quantile:(i+1)*size_per_quantile] for i in range(no_of_quantiles-1)] + [extensions[(no_of_quantiles-1)*size_per_quantile:]]
+		dataset = self.dataset()
+		no_of_users = np.sort(dataset.no_of_users) # Sort extensions by no. of users, in ascending order.
+		quantiles = split_into_quantiles(no_of_users, no_of_quantiles)
 		xs = [i+1 for i in range(no_of_quantiles)] # e.g.: [1,2,3,4]
-		ys = []
-		if compute_median:
-			ys = [statistics.median(ext.no_of_users for ext in quantile) for quantile in quantiles]
-		else:
-			ys = [statistics.mean(ext.no_of_users for ext in quantile) for quantile in quantiles]
+		ys = [np.median(quantile) if compute_median else np.mean(quantile) for quantile in quantiles]
 		plt.bar(x=xs, height=ys)
 		plt.xlabel("Quantiles of extensions, sorted by user count")
 		plt.ylabel(f"{'Median' if compute_median else 'Average'} user count in each quantile")
@@ -417,17 +697,13 @@ class ExtensionsCSV:
 
 	def plot_bars_quantiles_extension_size(self, no_of_quantiles=4, compute_median=False): # (8.)
 		print(f"(8.) Bar plot of the {'median' if compute_median else 'average'} extension size for each of the {no_of_quantiles} quantiles of extensions, sorted *by* user count.")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-		extensions = [ext for ext in extensions if ext.size not in [None, ""]] # Remove all extensions where we have no value for the size!
-		extensions.sort(key=lambda ext: ext.no_of_users) # Sort extensions by no. of users, in ascending order.
-		size_per_quantile = len(extensions) // no_of_quantiles # = how many extensions will be in each quantile
-		quantiles = [extensions[i*size_per_quantile:(i+1)*size_per_quantile] for i in range(no_of_quantiles-1)] + [extensions[(no_of_quantiles-1)*size_per_quantile:]]
+		dataset = self.dataset()
+		# Remove all extensions where we have no value for the size, then sort the rest by no. of users, in ascending order:
+		no_of_users, size_in_bytes = dataset.no_of_users[dataset.has_size], dataset.size_in_bytes[dataset.has_size]
+		extension_sizes = size_in_bytes[np.argsort(no_of_users, kind='stable')] / 1000.0 # divide by 1000.0 to turn bytes into KB
+		quantiles = split_into_quantiles(extension_sizes, no_of_quantiles)
 		xs = [i+1 for i in range(no_of_quantiles)] # e.g.: [1,2,3,4]
-		ys = []
-		if compute_median:
-			ys = [statistics.median(parse_size(ext.size)/1000.0 for ext in quantile) for quantile in quantiles] # divide by 1000.0 to turn bytes into KB
-		else:
-			ys = [statistics.mean(parse_size(ext.size)/1000.0 for ext in quantile) for quantile in quantiles]
+		ys = [np.median(quantile) if compute_median else np.mean(quantile) for quantile in quantiles]
 		plt.bar(x=xs, height=ys)
 		plt.xlabel("Quantiles of extensions, sorted by user count")
 		plt.ylabel(f"{'Median' if compute_median else 'Average'} extension size in each quantile (KB)")
@@ -435,31 +711,23 @@ class ExtensionsCSV:
 
 	def plot_bars_most_common_languages(self): # (9.)
 		print("(9.) Most common languages as a bar chart.")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
-
-		# Collect all languages:
-		languages = set()
-		for ext in extensions:
-			for lang in ext.languages.split("|"):
-				languages.add(lang)
-		print(f"\t=> There are a total of {len(languages)} distinct languages (or rather language codes): {languages}")
-
-		# Count how often each language occurs:
-		lang_counts = {}
-		for lang in languages:
-			count = 0
-			for ext in extensions:
-				if lang in ext.languages.split("|"):
-					count += 1
-			lang_counts[lang] = count
-		print(f"\t=> Occurence of each of these languages: {lang_counts}")
+		dataset = self.dataset()
+
+		# Count how often each language occurs (cf. LanguageIndex):
+		lang_counts = dataset.language_index.counts
+		print(f"\t=> There are a total of {len(lang_counts)} distinct languages (or rather language codes): {set(lang_counts)}")
+		print(f"\t=> Occurence of each of these languages: {dict(lang_counts)}")
 
 		# Sort languages descendingly by their count:
-		languages = list(languages)
-		languages.sort(key=lambda lang: lang_counts[lang], reverse=True)
+		languages = [lang for lang, count in lang_counts.most_common()]
 
-		# Plot bar chart of the {MAX_NO_OF_BARS} most common languages:
+		# Breakdown of the user counts of the {MAX_NO_OF_BARS} most common languages:
 		MAX_NO_OF_BARS = 20
+		for lang in languages[:MAX_NO_OF_BARS]:
+			no_of_users = dataset.no_of_users[dataset.language_index.rows(lang)]
+			print(f"\t=> '{lang}': {lang_counts[lang]:,} extensions with {int(no_of_users.sum()):,} users in total (median: {np.median(no_of_users):,.0f} users per extension)")
+
+		# Plot bar chart of the {MAX_NO_OF_BARS} most common languages:
 		plt.bar(x=languages[:MAX_NO_OF_BARS], height=[lang_counts[lang] for lang in languages][:MAX_NO_OF_BARS])
 		plt.xlabel(f"{MAX_NO_OF_BARS} most common languages")
 		plt.ylabel(f"No. of extensions")
@@ -467,10 +735,13 @@ class ExtensionsCSV:
 
 	def plot_benfords_law(self): # (10.)
 		print("(10.) Fun fact: Benford's Law (user counts)")
-		extensions = self.read() # = [ChromeExtension, ChromeExtension, ChromeExtension, ...]
+		dataset = self.dataset()
 
+		first_digits = dataset.no_of_users.copy()
+		while (first_digits >= 10).any():
+			first_digits = np.where(first_digits >= 10, first_digits // 10, first_digits)
 		xs = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
-		ys = [len([ext for ext in extensions if str(ext.no_of_users)[0] == digit]) for digit in xs]
+		ys = np.bincount(first_digits, minlength=10)
 
 		plt.bar(x=xs, height=ys)
 		plt.xlabel("First digit of user count")
@@ -479,28 +750,1721 @@ class ExtensionsCSV:
 
 
 
+def remove_torn_last_line(csv_file): # csv_file = a file opened in binary mode for reading and writing; truncates the file after its last "\n" (if it doesn't end with a "\n")
+	end = csv_file.seek(0, os.SEEK_END)
+	position = end
+	while position > 0:
+		chunk_start = max(0, position - 64 * 1024)
+		csv_file.seek(chunk_start)
+		chunk = csv_file.read(position - chunk_start)
+		newline = chunk.rfind(b"\n")
+		if newline != -1:
+			position = chunk_start + newline + 1
+			break
+		position = chunk_start
+	if position < end:
+		print(f"Warning: removing torn last line from '{csv_file.name}' ({end - position} bytes)", file=sys.stderr)
+		csv_file.truncate(position)
+	csv_file.seek(0, os.SEEK_END)
+
+
+
+class ExtensionsDataset:
+	# The columns that the --stats plots are computed from, as NumPy arrays (one entry per extension), cf. ExtensionsCSV.dataset().
+	# Loaded once from the column store of the .CSV file (cf. ExtensionsColumnStore), s.t. every plot is a vectorized operation over these arrays
+	#   instead of parsing the entire .CSV file again.
+	def __init__(self, column_store):
+		self.column_store = column_store
+		self.no_of_users = np.array(column_store.column("no_of_users")) # (np.array() copies the memory-mapped column into memory)
+		self.no_of_ratings = np.array(column_store.column("no_of_ratings"))
+		self.avg_rating = np.array(column_store.column("avg_rating"))
+		self.no_of_languages = np.array(column_store.column("no_of_languages"))
+		# Sizes and dates have already been parsed when the column store was created (cf. ExtensionsColumnStore.DERIVED_COLUMNS):
+		self.size_in_bytes = np.array(column_store.column("size_in_bytes")) # (NaN = unknown size)
+		self.last_updated_ordinal = np.array(column_store.column("last_updated_ordinal")) # (0 = unknown date)
+		self.has_size = ~np.isnan(self.size_in_bytes)
+		self.has_last_updated = self.last_updated_ordinal > 0
+		self.months_since_last_update = np.where(self.has_last_updated, (date.today().toordinal() - self.last_updated_ordinal) / 30.437, np.nan) # (cf. ChromeExtension.months_since_last_update())
+		self.language_codes = np.array(column_store.column("languages")) # = index into language_combinations for each extension
+		self.language_combinations = column_store.dictionary("languages") # = the distinct values of the languages column, e.g. ["en", "en|de", ...]
+		self.language_index = LanguageIndex(self.language_codes, self.language_combinations, lambda: column_store.strings("extension_id"))
+
+	def __len__(self):
+		return len(self.no_of_users)
+
+
+
+class LanguageIndex:
+	# Which extensions support which language, built in a single pass over the (dictionary-encoded) languages column, cf. ExtensionsDataset:
+	#   * counts = how many extensions support each language, e.g. Counter({"en": 1234, "de": 567, ...}),
+	#   * rows(lang) = the row numbers of all extensions supporting a language (an inverted index, e.g. to break down the other columns by language),
+	#   * extension_ids(lang) = the IDs of all extensions supporting a language.
+	# Each distinct combination of languages (e.g. "en|de") is only split once, no matter how many extensions share it.
+	def __init__(self, language_codes, language_combinations, load_extension_ids):
+		combination_counts = np.bincount(language_codes, minlength=len(language_combinations)) # = no. of extensions with each combination
+		rows_by_combination = np.argsort(language_codes, kind='stable') # = all row numbers, grouped by combination
+		ends = np.cumsum(combination_counts)
+		self.counts = Counter()
+		rows = defaultdict(list) # language -> [row numbers of all extensions with a combination containing that language, ...]
+		for code, languages in enumerate(language_combinations):
+			if combination_counts[code] > 0:
+				for lang in dict.fromkeys(languages.split("|")): # (without duplicates, keeping the order)
+					self.counts[lang] += int(combination_counts[code])
+					rows[lang].append(rows_by_combination[ends[code]-combination_counts[code]:ends[code]])
+		self._rows = {lang: np.sort(np.concatenate(arrays)) for lang, arrays in rows.items()}
+		self._load_extension_ids = load_extension_ids # = a function returning the IDs of all extensions (in row order)
+		self._extension_ids = None # = the IDs of all extensions; only loaded on the first call to extension_ids()
+
+	def rows(self, lang): # e.g. rows("de") = array([3, 17, 42, ...])
+		return self._rows.get(lang, np.array([], dtype=np.int64))
+
+	def extension_ids(self, lang): # e.g. extension_ids("de") = ["abcdefghijklmnopqrstuvwxyzabcdef", ...]
+		if self._extension_ids is None:
+			self._extension_ids = self._load_extension_ids()
+		return [self._extension_ids[row] for row in self.rows(lang).tolist()]
+
+
+
+class ReservoirSampler:
+	# Selects a uniformly random sample of k items from a stream of items of unknown length, in a single pass and with O(k) memory,
+	#   using "Algorithm L" (Li, 1994): instead of drawing a random number for every item, it draws how many items to skip until the next one that goes into the sample.
+	def __init__(self, k, rng):
+		self.k = k
+		self.rng = rng # = a random.Random
+		self.sample = [] # (in random order once all items have been added, cf. add())
+		self.n = 0 # = the no. of items added so far
+		self._w = 0.0
+		self._next_n = None # = the index of the next item that goes into the sample (once the sample is full)
+
+	def add(self, item):
+		if len(self.sample) < self.k:
+			self.sample.append(item)
+			if len(self.sample) == self.k:
+				self.rng.shuffle(self.sample) # (s.t. the sample is in random order, even if the stream has no more than k items)
+				self._w = exp(math.log(self._random()) / self.k)
+				self._skip()
+		elif self.n == self._next_n:
+			self.sample[self.rng.randrange(self.k)] = item
+			self._w *= exp(math.log(self._random()) / self.k)
+			self._skip()
+		self.n += 1
+
+	def _skip(self):
+		log_1_minus_w = log1p(-self._w) if self._w < 1.0 else -inf
+		self._next_n = (self._next_n if self._next_n is not None else self.k - 1) + floor(math.log(self._random()) / log_1_minus_w) + 1
+
+	def _random(self): # returns a random float in (0,1)
+		while True:
+			u = self.rng.random()
+			if u > 0.0:
+				return u
+
+
+
+def user_count_stratum(no_of_users): # e.g. 1000 for 123 users, i.e., the smallest power of 10 that's strictly(!) larger than no_of_users (cf. plot_pdf_no_of_users())
+	return 10 ** len(str(no_of_users))
+
+
+
+def weighted_sample_without_replacement(weights, k, rng): # returns the indices of k items, sampled with probabilities proportional to their weights without replacement, in the order in which they were drawn
+	# Efraimidis & Spirakis (2006): give each item the key u^(1/weight) with u uniformly random in (0,1); the k items with the largest keys are the sample.
+	#   => O(n) memory and O(n + k log k) time (no matter how large the weights are); items with weight 0 are never drawn.
+	# The keys are compared as log(u)/weight instead, which is equivalent but doesn't underflow.
+	weights = np.asarray(weights, dtype=np.float64)
+	with np.errstate(divide='ignore'): # (log(u)/0 = -inf for weight 0)
+		keys = np.log(1.0 - rng.random(len(weights))) / weights # (1.0 - random() is in (0,1])
+	keys[weights <= 0] = -np.inf
+	k = min(k, int(np.count_nonzero(weights > 0)))
+	if k == 0:
+		return np.array([], dtype=np.int64)
+	largest_keys = np.argpartition(-keys, k-1)[:k] # = the indices of the k largest keys (in no particular order)
+	return largest_keys[np.argsort(-keys[largest_keys], kind='stable')]
+
+
+
+class LorenzCurve:
+	# The Lorenz curve of a distribution (e.g. of the user counts of all extensions): which % of the total is held by the smallest x% of the values?
+	# Everything is computed from a single cumulative sum over the sorted values (i.e., in O(n log n)), at any resolution, up to one point per value.
+	def __init__(self, values):
+		self.cumulative = np.concatenate([[0], np.cumsum(np.sort(values))]) # cumulative[k] = sum of the k smallest values
+		self.n = len(values)
+		self.total = int(self.cumulative[-1])
+
+	def points(self): # returns (xs, ys) with one point per value: xs = % of values (smallest first), ys = % of the total
+		return 100 * np.arange(self.n + 1) / max(self.n, 1), 100 * self.cumulative / max(self.total, 1)
+
+	def top_share(self, percent): # % of the total held by the largest {percent}% of the values
+		k = int(self.n * percent / 100) # (e.g. the top 1% of 250 extensions are the largest 2)
+		return 100 * (self.total - int(self.cumulative[self.n - k])) / max(self.total, 1)
+
+	def gini_coefficient(self): # = 1 - 2 * (area under the Lorenz curve) (0 = perfect equality, 1 = maximal inequality)
+		if self.n == 0 or self.total == 0:
+			return 0.0
+		# (area under the curve using the trapezoidal rule, i.e., sum of (L[k-1] + L[k]) / (2n) for k = 1..n, with L = cumulative / total)
+		return 1 - (2 * self.cumulative[1:-1].sum() + self.total) / (self.n * self.total)
+
+
+
+def split_into_quantiles(values, no_of_quantiles): # splits a (sorted) array into {no_of_quantiles} parts of equal size (the last one taking the remainder)
+	size_per_quantile = len(values) // no_of_quantiles # = how many extensions will be in each quantile
+	return [values[i*size_per_quantile:(i+1)*size_per_quantile] for i in range(no_of_quantiles-1)] + [values[(no_of_quantiles-1)*size_per_quantile:]]
+
+
+
+class ExtensionsColumnStore:
+	# A columnar, binary copy of an extensions .CSV file: a folder (e.g. "./extensions.columns") with one NumPy .npy file per column,
+	#   which are memory-mapped when loaded (i.e., loading takes milliseconds and no ChromeExtension object is created per row).
+	# String columns are stored as one array of UTF-8 bytes plus an array of offsets (row i = data[offsets[i]:offsets[i+1]]).
+	# String columns with few distinct values (e.g. languages or version_no) are dictionary-encoded instead,
+	#   i.e., stored as an array of int32 codes into an array of the distinct values (row i = values[codes[i]]).
+	# Columns derived from the dictionary-encoded ones (e.g. the size in bytes) are computed once, when the column store is created, and stored alongside the others.
+	# The columns in SORTED_INDEXES are additionally stored in sorted order (together with the permutation that sorts them), e.g. for range queries (cf. Query).
+	# For each row, the line number in the .CSV file that it has been created from is stored as well (malformed lines are skipped, i.e., row number != line number).
+	FORMAT_VERSION = 4
+	COLUMNS = { # column name -> kind (in the order of the columns of the .CSV file)
+		"extension_id": "string",
+		"title": "string",
+		"description": "string",
+		"no_of_users": "int64",
+		"no_of_ratings": "int64",
+		"avg_rating": "float64",
+		"version_no": "dictionary",
+		"size": "dictionary",
+		"last_updated": "dictionary",
+		"no_of_languages": "int32",
+		"languages": "dictionary",
+	}
+	DERIVED_COLUMNS = { # column name -> (kind, source column, function that is called once for each distinct value of the source column)
+		"size_in_bytes": ("float64", "size", lambda size: parse_size(size) if size != "" else np.nan), # (NaN = unknown size)
+		"last_updated_ordinal": ("int32", "last_updated", lambda date_string: parse_date(date_string) or 0), # = date.toordinal() (0 = unknown date)
+	}
+	SORTED_INDEXES = ["no_of_users", "avg_rating", "last_updated_ordinal"]
+
+	def __init__(self, path):
+		self.path = Path(path) # default: "./extensions.columns"
+		with open(self.path / "meta.json", "r") as meta_file:
+			self.meta = json.load(meta_file) # e.g. {"format_version": 2, "no_of_rows": 1234, "source": {"size": 567890, "mtime_ns": 1690000000000000000}}
+		self._arrays = {} # file name (without ".npy") -> (memory-mapped) numpy array
+
+	def __len__(self):
+		return self.meta["no_of_rows"]
+
+	def _array(self, name):
+		if name not in self._arrays:
+			# (an empty array can't be memory-mapped)
+			self._arrays[name] = np.load(self.path / f"{name}.npy", mmap_mode="r" if len(self) > 0 else None)
+		return self._arrays[name]
+
+	def column(self, name): # returns a numeric (or derived) column as a numpy array, or the codes of a dictionary-encoded column (cf. dictionary())
+		if name in ExtensionsColumnStore.DERIVED_COLUMNS:
+			return self._array(name)
+		match ExtensionsColumnStore.COLUMNS[name]:
+			case "dictionary":
+				return self._array(f"{name}.codes")
+			case "string":
+				raise ValueError(f"'{name}' is not a numeric or dictionary-encoded column, use strings() instead.")
+			case _:
+				return self._array(name)
+
+	def dictionary(self, name): # returns the distinct values of a dictionary-encoded column, e.g. ["", "en", "en|de", ...]
+		return self._decode_strings(f"{name}.values")
+
+	def strings(self, name, rows=None): # returns any string column as a list of strings (one per row, or only for the given row numbers)
+		if ExtensionsColumnStore.COLUMNS[name] == "dictionary":
+			values = self.dictionary(name)
+			codes = self.column(name) if rows is None else self.column(name)[rows]
+			return [values[code] for code in codes.tolist()]
+		return self._decode_strings(name, rows)
+
+	def _decode_strings(self, name, rows=None):
+		offsets = self._array(f"{name}.offsets")
+		data = self._array(f"{name}.data").tobytes()
+		if rows is not None: # (only decode the given rows)
+			rows = np.asarray(rows, dtype=np.int64)
+			return [data[start:end].decode() for start, end in zip(offsets[rows].tolist(), offsets[rows+1].tolist())]
+		offsets = offsets.tolist()
+		return [data[offsets[i]:offsets[i+1]].decode() for i in range(len(offsets)-1)]
+
+	def sorted_index(self, name): # returns (order, sorted values) for a column in SORTED_INDEXES, i.e., column[order] == sorted values
+		return self._array(f"{name}.order"), self._array(f"{name}.sorted")
+
+	def line_numbers(self): # returns the line number (0 = first line) in the .CSV file of each row, cf. read_csv_lines()
+		return self._array("line_numbers")
+
+	def read(self) -> List[ChromeExtension]: # (same result as ExtensionsCSV.read())
+		columns = [self.strings(name) if kind in ["string", "dictionary"] else self.column(name).tolist() for name, kind in ExtensionsColumnStore.COLUMNS.items()]
+		return [ChromeExtension(*row) for row in zip(*columns)]
+
+	def is_up_to_date(self, csv_path): # True iff this column store has been created from the current version of the given .CSV file (by the current version of this script)
+		stat = os.stat(csv_path)
+		return self.meta["format_version"] == ExtensionsColumnStore.FORMAT_VERSION and self.meta["source"] == {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+	def to_csv(self, csv_path): # exports the column store (back) into a .CSV file
+		columns = [self.strings(name) if kind in ["string", "dictionary"] else self.column(name).tolist() for name, kind in ExtensionsColumnStore.COLUMNS.items()]
+		with open(csv_path, "w") as csv_file:
+			csv_file.writelines(",".join(map(str, row)) + "\n" for row in zip(*columns))
+
+	def from_csv(csv_path, path): # creates (or replaces) the column store at {path} from the given .CSV file (in a single pass over it); returns the new ExtensionsColumnStore
+		stat = os.stat(csv_path) # (before reading, s.t. lines appended in the meantime make the column store out of date)
+		builders = {name: ColumnBuilder(kind) for name, kind in ExtensionsColumnStore.COLUMNS.items()}
+		builder_list = list(builders.values())
+		line_numbers = array.array("q") # = the line number of each row
+		with open(csv_path, "r") as csv_file:
+			for line_number, csv_line in enumerate(csv_file):
+				if not csv_line.endswith("\n"):
+					print(f"Warning: ignoring torn last line of '{csv_path}': {csv_line[:50]} ...", file=sys.stderr)
+					break
+				vals = csv_line[:-1].rstrip("\r").split(",")
+				try:
+					if len(vals) != len(builder_list):
+						raise ValueError(f"{len(vals)} instead of {len(builder_list)} values")
+					values = [builder.parse(val) for builder, val in zip(builder_list, vals)] # (all values are parsed before any of them is appended, s.t. the columns stay aligned)
+				except ValueError as err:
+					print(f"Warning: ignoring malformed line of '{csv_path}' ({err}): {csv_line[:50].rstrip()} ...", file=sys.stderr)
+					continue
+				for builder, value in zip(builder_list, values):
+					builder.append(value)
+				line_numbers.append(line_number)
+
+		# Write into a temporary folder first, then replace the old column store (if any) with it:
+		path = Path(path)
+		temp_path = path.with_name(path.name + ".tmp")
+		shutil.rmtree(temp_path, ignore_errors=True)
+		temp_path.mkdir(parents=True)
+		for name, builder in builders.items():
+			builder.save(temp_path, name)
+		np.save(temp_path / "line_numbers.npy", np.frombuffer(line_numbers, dtype=np.int64))
+		for name, (kind, source_column, function) in ExtensionsColumnStore.DERIVED_COLUMNS.items():
+			builders[source_column].save_derived(temp_path, name, kind, function)
+		for name in ExtensionsColumnStore.SORTED_INDEXES:
+			values = np.load(temp_path / f"{name}.npy")
+			order = np.argsort(values, kind='stable')
+			np.save(temp_path / f"{name}.order.npy", order)
+			np.save(temp_path / f"{name}.sorted.npy", values[order])
+		with open(temp_path / "meta.json", "w") as meta_file:
+			json.dump({"format_version": ExtensionsColumnStore.FORMAT_VERSION, "no_of_rows": len(line_numbers), "source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}}, meta_file)
+		shutil.rmtree(path, ignore_errors=True)
+		temp_path.rename(path)
+		return ExtensionsColumnStore(path)
+
+
+
+class ColumnBuilder: # collects the values of one column of an ExtensionsColumnStore, cf. ExtensionsColumnStore.from_csv()
+	def __init__(self, kind):
+		self.kind = kind # cf. ExtensionsColumnStore.COLUMNS
+		match kind:
+			case "string":
+				self.offsets, self.data = array.array("q", [0]), bytearray()
+			case "dictionary":
+				self.codes, self.values = array.array("i"), {} # values = distinct value -> code
+			case "int64":
+				self.values = array.array("q")
+			case "int32":
+				self.values = array.array("i")
+			case "float64":
+				self.values = array.array("d")
+
+	def parse(self, val): # val = the value as a string, as it appears in the .CSV file; raises a ValueError if it's not a valid value of this column
+		match self.kind:
+			case "float64":
+				return float(val)
+			case "int64" | "int32":
+				return int(val)
+			case _:
+				return val
+
+	def append(self, value): # value = cf. parse()
+		match self.kind:
+			case "string":
+				self.data += value.encode()
+				self.offsets.append(len(self.data))
+			case "dictionary":
+				self.codes.append(self.values.setdefault(value, len(self.values)))
+			case _:
+				self.values.append(value)
+
+	def save(self, folder, name):
+		match self.kind:
+			case "string":
+				save_strings(folder, name, self.offsets, self.data)
+			case "dictionary":
+				np.save(folder / f"{name}.codes.npy", np.frombuffer(self.codes, dtype=np.int32))
+				offsets, data = array.array("q", [0]), bytearray()
+				for val in self.values: # (dicts keep the insertion order, i.e., the order of the codes)
+					data += val.encode()
+					offsets.append(len(data))
+				save_strings(folder, f"{name}.values", offsets, data)
+			case _:
+				np.save(folder / f"{name}.npy", np.frombuffer(self.values, dtype=self.kind))
+
+	def save_derived(self, folder, name, kind, function): # (only for dictionary-encoded columns) saves function(value) for each row, calling function only once per distinct value
+		derived_values = np.array([function(val) for val in self.values], dtype=kind)
+		np.save(folder / f"{name}.npy", derived_values[np.frombuffer(self.codes, dtype=np.int32)])
+
+
+
+def save_strings(folder, name, offsets, data):
+	np.save(folder / f"{name}.offsets.npy", np.frombuffer(offsets, dtype=np.int64))
+	np.save(folder / f"{name}.data.npy", np.frombuffer(bytes(data), dtype=np.uint8))
+
+
+
+class Query:
+	# A query on the extensions of a .CSV file (cf. --query), e.g.:
+	#   "select extension_id, title, no_of_users where langs has de and langs has en and no_of_users > 10000 order by no_of_users desc limit 10"
+	# Syntax: [select FIELD, ...] [where CONDITION] [order by FIELD [asc|desc]] [limit N]
+	#   * FIELD = any column of the .CSV file (cf. ExtensionsColumnStore.COLUMNS), or size_in_bytes or months_since_last_update,
+	#   * CONDITION = FIELD (= | != | < | <= | > | >=) VALUE, FIELD contains VALUE, langs has LANGUAGE, combined with and/or/not and parentheses,
+	#   * VALUE = a number, a word (e.g. en-US) or a 'quoted string'; dates (last_updated) can be given as 'August 9 2014' or 2014-08-09.
+	# The query is compiled into vectorized predicates over the columns of the ExtensionsDataset (instead of running Python code with eval()),
+	#   range predicates and "order by" use the sorted indexes of the column store (cf. ExtensionsColumnStore.SORTED_INDEXES) and "langs has" uses the LanguageIndex.
+	NUMERIC_FIELDS = ["no_of_users", "no_of_ratings", "avg_rating", "no_of_languages", "size_in_bytes", "months_since_last_update", "last_updated"]
+	INDEXED_FIELDS = {"no_of_users": "no_of_users", "avg_rating": "avg_rating", "last_updated": "last_updated_ordinal"} # field -> sorted index
+	FIELDS = list(ExtensionsColumnStore.COLUMNS) + ["size_in_bytes", "months_since_last_update"]
+	TOKEN_PATTERN = re.compile(r"\s*(?:(-?\d+(?:\.\d+)?(?![\w-]))|'([^']*)'|\"([^\"]*)\"|(<=|>=|!=|==|=|<|>|\(|\)|,|\*)|([\w][\w.\-]*))")
+
+	def __init__(self, query_string): # raises a ValueError if the query is invalid
+		self.query_string = query_string
+		self._tokens = self._tokenize(query_string) # [(kind, value), ...] with kind = "number", "string", "symbol" or "word" and value = the text of the token (numbers aren't converted yet, e.g. version_no = 1.10)
+		self._pos = 0
+		self.fields = list(ExtensionsColumnStore.COLUMNS) # (all fields by default, i.e., the lines of the .CSV file)
+		self.condition = None # e.g. ("and", ("has", "de"), ("compare", "no_of_users", ">", 10000))
+		self.order_by, self.descending = None, False
+		self.limit = None
+		if self._accept_keyword("select"):
+			if not self._accept_symbol("*"):
+				self.fields = [self._field()]
+				while self._accept_symbol(","):
+					self.fields.append(self._field())
+		if self._accept_keyword("where"):
+			self.condition = self._or()
+		if self._accept_keyword("order"):
+			self._expect_keyword("by")
+			self.order_by = self._field()
+			self.descending = self._accept_keyword("desc")
+			if not self.descending:
+				self._accept_keyword("asc")
+		if self._accept_keyword("limit"):
+			kind, value = self._next()
+			if kind != "number" or not value.isdigit():
+				raise ValueError(f"expected a no. of rows after 'limit', got '{value}'")
+			self.limit = int(value)
+		if self._pos < len(self._tokens):
+			raise ValueError(f"unexpected '{self._tokens[self._pos][1]}'")
+
+	# ##### Parsing: #####
+
+	def _tokenize(self, query_string):
+		tokens = []
+		pos = 0
+		while query_string[pos:].strip() != "":
+			m = Query.TOKEN_PATTERN.match(query_string, pos)
+			if m is None or m.end() == pos:
+				raise ValueError(f"unexpected character at: '{query_string[pos:].strip()[:20]}'")
+			number, single_quoted, double_quoted, symbol, word = m.groups()
+			if number is not None:
+				tokens.append(("number", number))
+			elif single_quoted is not None or double_quoted is not None:
+				tokens.append(("string", single_quoted if single_quoted is not None else double_quoted))
+			elif symbol is not None:
+				tokens.append(("symbol", "=" if symbol == "==" else symbol))
+			else:
+				tokens.append(("word", word))
+			pos = m.end()
+		return tokens
+
+	def _peek(self):
+		return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, "end of query")
+
+	def _next(self):
+		if self._pos >= len(self._tokens):
+			raise ValueError("unexpected end of query")
+		self._pos += 1
+		return self._tokens[self._pos-1]
+
+	def _accept_keyword(self, keyword):
+		kind, value = self._peek()
+		if kind == "word" and value.lower() == keyword:
+			self._pos += 1
+			return True
+		return False
+
+	def _expect_keyword(self, keyword):
+		if not self._accept_keyword(keyword):
+			raise ValueError(f"expected '{keyword}', got: {self._peek()[1]}")
+
+	def _accept_symbol(self, symbol):
+		if self._peek() == ("symbol", symbol):
+			self._pos += 1
+			return True
+		return False
+
+	def _field(self):
+		kind, value = self._next()
+		if kind != "word" or value not in Query.FIELDS:
+			raise ValueError(f"unknown field '{value}', expected one of: {', '.join(Query.FIELDS)}")
+		return value
+
+	def _value(self):
+		kind, value = self._next()
+		if kind not in ["number", "string", "word"]:
+			raise ValueError(f"expected a value, got '{value}'")
+		return value
+
+	def _or(self):
+		condition = self._and()
+		while self._accept_keyword("or"):
+			condition = ("or", condition, self._and())
+		return condition
+
+	def _and(self):
+		condition = self._not()
+		while self._accept_keyword("and"):
+			condition = ("and", condition, self._not())
+		return condition
+
+	def _not(self):
+		if self._accept_keyword("not"):
+			return ("not", self._not())
+		if self._accept_symbol("("):
+			condition = self._or()
+			if not self._accept_symbol(")"):
+				raise ValueError(f"expected ')', got: {self._peek()[1]}")
+			return condition
+		if self._accept_keyword("langs"):
+			self._expect_keyword("has")
+			return ("has", self._value())
+		field = self._field()
+		if self._accept_keyword("contains"):
+			if ExtensionsColumnStore.COLUMNS.get(field) not in ["string", "dictionary"]:
+				raise ValueError(f"'{field}' is a number, it can only be compared with =, !=, <, <=, > and >= (not with contains)")
+			return ("contains", field, self._value())
+		kind, op = self._next()
+		if kind != "symbol" or op not in ["=", "!=", "<", "<=", ">", ">="]:
+			raise ValueError(f"expected a comparison (=, !=, <, <=, >, >=) or 'contains' after '{field}', got '{op}'")
+		kind = self._peek()[0]
+		value = self._value()
+		if field == "last_updated":
+			value = parse_query_date(value)
+		elif field in Query.NUMERIC_FIELDS:
+			if kind != "number":
+				raise ValueError(f"'{field}' can only be compared to numbers, not to '{value}'")
+			value = float(value) if "." in value else int(value)
+		elif op not in ["=", "!="]:
+			raise ValueError(f"'{field}' can only be compared with = and != (or contains)")
+		return ("compare", field, op, value)
+
+	# ##### Execution: #####
+
+	def execute(self, dataset): # returns the row numbers of the result, in the order of the result
+		mask = self._mask(self.condition, dataset) if self.condition is not None else np.ones(len(dataset), dtype=bool)
+		if self.order_by is None:
+			rows = np.flatnonzero(mask)
+		elif self.order_by in Query.INDEXED_FIELDS: # (already sorted, only needs to be filtered)
+			order, _ = dataset.column_store.sorted_index(Query.INDEXED_FIELDS[self.order_by])
+			rows = order[mask[order]]
+		else:
+			rows = np.flatnonzero(mask)
+			if self.order_by in Query.NUMERIC_FIELDS:
+				rows = rows[np.argsort(self._numeric(self.order_by, dataset)[rows], kind='stable')]
+			else:
+				values = dataset.column_store.strings(self.order_by, rows)
+				rows = rows[sorted(range(len(rows)), key=lambda i: values[i])]
+		if self.descending:
+			rows = rows[::-1]
+		return rows[:self.limit] if self.limit is not None else rows
+
+	def csv_lines(self, dataset, rows): # yields the selected fields of the given rows, as lines of a .CSV file (e.g. for "select *" exactly the lines of the .CSV file)
+		BATCH_SIZE = 10_000 # (only the rows of the current batch are decoded)
+		for start in range(0, len(rows), BATCH_SIZE):
+			batch = rows[start:start+BATCH_SIZE]
+			columns = [self._formatted(field, dataset, batch) for field in self.fields]
+			for values in zip(*columns):
+				yield ",".join(values) + "\n"
+
+	def _formatted(self, field, dataset, rows): # returns the values of a field for the given rows as strings (as they would appear in the .CSV file)
+		if field not in Query.NUMERIC_FIELDS or field == "last_updated":
+			return dataset.column_store.strings(field, rows)
+		values = self._numeric(field, dataset)[rows]
+		match field:
+			case "size_in_bytes":
+				return ["" if np.isnan(value) else str(int(value)) for value in values.tolist()]
+			case "months_since_last_update":
+				return ["" if np.isnan(value) else f"{value:.2f}" for value in values.tolist()]
+			case _:
+				return [str(value) for value in values.tolist()] # (e.g. "4.5" for avg_rating, exactly like ChromeExtension.as_cvs_line())
+
+	def _numeric(self, field, dataset): # returns a numeric field as an array
+		return dataset.last_updated_ordinal if field == "last_updated" else getattr(dataset, field)
+
+	def _mask(self, condition, dataset): # returns a boolean array: True for every row that satisfies the condition
+		match condition:
+			case ("and", left, right):
+				return self._mask(left, dataset) & self._mask(right, dataset)
+			case ("or", left, right):
+				return self._mask(left, dataset) | self._mask(right, dataset)
+			case ("not", operand):
+				return ~self._mask(operand, dataset)
+			case ("has", lang):
+				mask = np.zeros(len(dataset), dtype=bool)
+				mask[dataset.language_index.rows(lang)] = True
+				return mask
+			case ("contains", field, value):
+				return np.array([value in string for string in dataset.column_store.strings(field)], dtype=bool)
+			case ("compare", field, op, value) if field in Query.INDEXED_FIELDS and op != "!=":
+				# Binary search in the sorted index, i.e., the matching rows are order[start:end]:
+				order, sorted_values = dataset.column_store.sorted_index(Query.INDEXED_FIELDS[field])
+				start = {"=": "left", ">": "right", ">=": "left"}.get(op)
+				end = {"=": "right", "<": "left", "<=": "right"}.get(op)
+				start = np.searchsorted(sorted_values, value, side=start) if start is not None else 0
+				end = np.searchsorted(sorted_values, value, side=end) if end is not None else len(sorted_values)
+				mask = np.zeros(len(dataset), dtype=bool)
+				mask[order[start:end]] = True
+				return mask & dataset.has_last_updated if field == "last_updated" else mask
+			case ("compare", field, op, value) if field in Query.NUMERIC_FIELDS:
+				values = self._numeric(field, dataset)
+				mask = {"=": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}[op](values, value)
+				return mask & dataset.has_last_updated if field == "last_updated" else mask
+			case ("compare", field, op, value) if ExtensionsColumnStore.COLUMNS[field] == "dictionary":
+				values = dataset.column_store.dictionary(field)
+				mask = np.isin(dataset.column_store.column(field), [code for code, v in enumerate(values) if v == value]) # (compares each distinct value only once)
+				return mask if op == "=" else ~mask
+			case ("compare", field, op, value):
+				mask = np.array([string == value for string in dataset.column_store.strings(field)], dtype=bool)
+				return mask if op == "=" else ~mask
+
+
+
+def parse_query_date(date_string): # turns a date like "August 9 2014" or "2014-08-09" into the date's ordinal (cf. parse_date())
+	try:
+		return date.fromisoformat(date_string).toordinal()
+	except ValueError:
+		pass
+	try:
+		return parse_date(date_string)
+	except ValueError:
+		raise ValueError(f"'{date_string}' is not a valid date, expected something like 'August 9 2014' or 2014-08-09")
+
+
+
+class CrawlState:
+	# A durable record of the progress of a --crawl (an SQLite database next to the .CSV file, cf. --crawl-state), so that a crawl that died
+	#   (e.g. because of an HTTP Error 503) can be resumed exactly where it stopped:
+	#   * the (shuffled) order of the shards, s.t. a restart doesn't start over in a new random order,
+	#   * the status of each shard: 'pending' (not downloaded yet) -> 'downloaded' (all its extensions are in the frontier) -> 'done',
+	#   * the frontier, i.e., every extension listed in a downloaded shard, with its status ('pending', 'done' or 'failed') and its last HTTP status.
+	# Once a shard is 'downloaded', it is never downloaded again; its remaining 'pending' extensions are taken from the database instead.
+	# (The extensions of a shard are added batch by batch while it's being parsed, and the shard only becomes 'downloaded' after the last batch;
+	#   a shard that was only partially added when the crawl died is simply downloaded again, the extensions that are already in the frontier keep their status.)
+	# For --refresh, the validators (ETag/Last-Modified) of each shard and each extension page, the <lastmod> of each shard (from sitemap.xml)
+	#   and a hash of each extension's .CSV line are kept as well, s.t. unchanged pages and unchanged extensions can be recognized (cf. start_refresh()).
+
+	NEW_COLUMNS = { # columns that were added later (and are added to existing databases automatically): table -> [(column, type), ...]
+		"shards": [("etag", "TEXT"), ("last_modified", "TEXT"), ("lastmod", "TEXT")],
+		"extensions": [("etag", "TEXT"), ("last_modified", "TEXT"), ("row_hash", "TEXT")],
+	}
+
+	def __init__(self, path):
+		self.path = Path(path) # default: "./extensions.crawl_state.sqlite"
+		self._connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False) # (autocommit; shared by all worker threads, cf. self._lock)
+		self._connection.execute("PRAGMA journal_mode=WAL")
+		self._connection.execute("PRAGMA synchronous=NORMAL")
+		self._connection.execute("CREATE TABLE IF NOT EXISTS shards (position INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, status TEXT NOT NULL DEFAULT 'pending')")
+		self._connection.execute("CREATE TABLE IF NOT EXISTS extensions (extension_id TEXT PRIMARY KEY, extension_url TEXT NOT NULL, languages TEXT NOT NULL, shard_url TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', http_status INTEGER)")
+		self._connection.execute("CREATE INDEX IF NOT EXISTS extensions_by_shard ON extensions (shard_url, status)")
+		self._connection.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+		for table, columns in CrawlState.NEW_COLUMNS.items():
+			existing_columns = [row[1] for row in self._connection.execute(f"PRAGMA table_info({table})")]
+			for column, column_type in columns:
+				if column not in existing_columns:
+					self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+		self._lock = threading.Lock()
+
+	def start_refresh(self): # (--refresh) if the previous crawl is complete, starts over (i.e., marks all shards and extensions as 'pending' again) and returns True; otherwise (False), the previous crawl is simply resumed
+		with self._lock:
+			(no_of_shards, no_of_incomplete_shards) = self._connection.execute("SELECT COUNT(*), COUNT(*) FILTER (WHERE status != 'done') FROM shards").fetchone()
+			if no_of_shards == 0 or no_of_incomplete_shards > 0:
+				return False
+			self._connection.execute("BEGIN")
+			self._connection.execute("UPDATE shards SET status = 'pending'")
+			self._connection.execute("UPDATE extensions SET status = 'pending'")
+			self._connection.execute("COMMIT")
+			return True
+
+	def start_take_over(self, dead_nodes): # (--dead-nodes with --partition-by extensions) returns True iff the dead nodes have changed since the previous run
+		# In that case, all shards are marked as 'pending' again (and downloaded unconditionally), s.t. the extensions that have been reassigned to this node
+		#   are added to the frontier (the extensions already in there keep their status).
+		dead_nodes = ",".join(str(dead_node) for dead_node in sorted(dead_nodes)) # e.g. "2,3"
+		with self._lock:
+			row = self._connection.execute("SELECT value FROM settings WHERE key = 'dead_nodes'").fetchone()
+			if (row[0] if row is not None else "") == dead_nodes:
+				return False
+			self._connection.execute("BEGIN")
+			self._connection.execute("UPDATE shards SET status = 'pending', etag = NULL, last_modified = NULL, lastmod = NULL")
+			self._connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('dead_nodes', ?)", (dead_nodes,))
+			self._connection.execute("COMMIT")
+			return True
+
+	def shard_order(self, urls): # returns the order in which the shards shall be crawled: the stored order (if any), followed by all new shard URLs in the given order
+		with self._lock:
+			self._connection.execute("BEGIN")
+			for url in urls:
+				self._connection.execute("INSERT OR IGNORE INTO shards (url) VALUES (?)", (url,)) # (the position is assigned automatically, in ascending order)
+			self._connection.execute("COMMIT")
+			return [url for (url,) in self._connection.execute("SELECT url FROM shards ORDER BY position")]
+
+	def shard_status(self, url):
+		with self._lock:
+			row = self._connection.execute("SELECT status FROM shards WHERE url = ?", (url,)).fetchone()
+			return None if row is None else row[0]
+
+	def shard_validators(self, url): # returns ({"ETag": ..., "Last-Modified": ...}, lastmod) of the last download of the given shard (cf. download())
+		with self._lock:
+			row = self._connection.execute("SELECT etag, last_modified, lastmod FROM shards WHERE url = ?", (url,)).fetchone()
+		if row is None:
+			return {}, None
+		etag, last_modified, lastmod = row
+		return {header: value for header, value in [("ETag", etag), ("Last-Modified", last_modified)] if value is not None}, lastmod
+
+	def add_shard_extensions(self, url, extensions): # extensions = iterable of (extension_url, languages) listed in the given shard; stores them as 'pending' (in a single transaction)
+		# Returns [(extension_url, languages), ...] for those of them that still need to be crawled as part of this shard (i.e., are 'pending' and not listed in an earlier shard).
+		# (An extension that is already known, e.g. from the previous crawl in case of --refresh, keeps its status, only its URL and languages are updated.)
+		pending_extensions = []
+		with self._lock:
+			self._connection.execute("BEGIN")
+			for extension_url, languages in extensions:
+				extension_id = extension_id_from_url(extension_url)
+				self._connection.execute("INSERT INTO extensions (extension_id, extension_url, languages, shard_url) VALUES (?, ?, ?, ?) ON CONFLICT (extension_id) DO UPDATE SET extension_url = excluded.extension_url, languages = excluded.languages",
+					(extension_id, extension_url, "|".join(languages), url))
+				if self._connection.execute("SELECT status = 'pending' AND shard_url = ? FROM extensions WHERE extension_id = ?", (url, extension_id)).fetchone()[0]:
+					pending_extensions.append((extension_url, languages))
+			self._connection.execute("COMMIT")
+		return pending_extensions
+
+	def mark_shard_downloaded(self, url, validators=None, lastmod=None): # (once all extensions of the shard have been added, cf. add_shard_extensions()) the shard will never have to be downloaded again
+		validators = validators or {}
+		with self._lock:
+			self._connection.execute("UPDATE shards SET status = 'downloaded', etag = ?, last_modified = ?, lastmod = ? WHERE url = ?", (validators.get("ETag"), validators.get("Last-Modified"), lastmod, url))
+
+	def mark_shard_unchanged(self, url, validators=None, lastmod=None): # (--refresh) the shard hasn't changed since the previous crawl, i.e., its extensions are already in the frontier
+		validators = validators or {}
+		with self._lock:
+			self._connection.execute("UPDATE shards SET status = 'downloaded', etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), lastmod = COALESCE(?, lastmod) WHERE url = ?",
+				(validators.get("ETag"), validators.get("Last-Modified"), lastmod, url))
+
+	def pending_extensions(self, url): # returns [(extension_url, languages), ...] for all extensions of the given shard that still need to be crawled, in crawl order
+		with self._lock:
+			rows = self._connection.execute("SELECT extension_url, languages FROM extensions WHERE shard_url = ? AND status = 'pending' ORDER BY rowid", (url,)).fetchall()
+		return [(extension_url, languages.split("|")) for extension_url, languages in rows]
+
+	def extension_validators(self, extension_id): # returns ({"ETag": ..., "Last-Modified": ...}, row hash) of the last time the given extension was crawled
+		with self._lock:
+			row = self._connection.execute("SELECT etag, last_modified, row_hash FROM extensions WHERE extension_id = ?", (extension_id,)).fetchone()
+		if row is None:
+			return {}, None
+		etag, last_modified, row_hash = row
+		return {header: value for header, value in [("ETag", etag), ("Last-Modified", last_modified)] if value is not None}, row_hash
+
+	def mark_extension(self, extension_id, status, http_status=None, validators=None, row_hash=None): # status = 'pending', 'done' or 'failed'
+		# (the validators and the row hash are only updated when given)
+		validators = validators or {}
+		with self._lock:
+			self._connection.execute("UPDATE extensions SET status = ?, http_status = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), row_hash = COALESCE(?, row_hash) WHERE extension_id = ?",
+				(status, http_status, validators.get("ETag"), validators.get("Last-Modified"), row_hash, extension_id))
+
+	def mark_completed_shards(self): # marks every downloaded shard without any pending extensions left as 'done'
+		with self._lock:
+			self._connection.execute("UPDATE shards SET status = 'done' WHERE status = 'downloaded' AND NOT EXISTS (SELECT 1 FROM extensions WHERE extensions.shard_url = shards.url AND extensions.status = 'pending')")
+
+	def finished_shards(self): # returns the set of URLs of all shards that are 'done' (cf. --dead-nodes)
+		with self._lock:
+			return {url for (url,) in self._connection.execute("SELECT url FROM shards WHERE status = 'done'")}
+
+	def finished_extension_ids(self): # returns the set of IDs of all extensions that are 'done' or 'failed' (cf. --dead-nodes)
+		with self._lock:
+			return {extension_id for (extension_id,) in self._connection.execute("SELECT extension_id FROM extensions WHERE status != 'pending'")}
+
+	def estimated_remaining_extensions(self): # = the pending extensions in the frontier + the shards not downloaded yet * the avg. no. of extensions per downloaded shard
+		with self._lock:
+			(no_of_pending_extensions,) = self._connection.execute("SELECT COUNT(*) FROM extensions WHERE status = 'pending'").fetchone()
+			(no_of_pending_shards, no_of_downloaded_shards) = self._connection.execute("SELECT COUNT(*) FILTER (WHERE status = 'pending'), COUNT(*) FILTER (WHERE status != 'pending') FROM shards").fetchone()
+			(no_of_extensions,) = self._connection.execute("SELECT COUNT(*) FROM extensions").fetchone()
+		return no_of_pending_extensions + (round(no_of_pending_shards * no_of_extensions / no_of_downloaded_shards) if no_of_downloaded_shards > 0 else 0)
+
+	def summary(self): # e.g. "3/1234 shards done, 2 downloaded | extensions: 5678 done (4321 not modified), 12 failed, 345 pending"
+		with self._lock:
+			shard_counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM shards GROUP BY status").fetchall())
+			extension_counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM extensions GROUP BY status").fetchall())
+			(not_modified,) = self._connection.execute("SELECT COUNT(*) FROM extensions WHERE status = 'done' AND http_status = 304").fetchone()
+		return f"{shard_counts.get('done', 0)}/{sum(shard_counts.values())} shards done, {shard_counts.get('downloaded', 0)} downloaded | extensions: {extension_counts.get('done', 0)} done{f' ({not_modified} not modified)' if not_modified > 0 else ''}, {extension_counts.get('failed', 0)} failed, {extension_counts.get('pending', 0)} pending"
+
+	def close(self):
+		self._connection.close()
+
+
+
+# A distributed crawl (--node-count) splits the shards (or the extensions, cf. --partition-by) between the nodes by a hash of their URL (or ID),
+#   i.e., every node knows which shards are its own without any coordination. Each node writes its own partition of the .CSV file (and its own crawl state),
+#   the partitions are merged into a single .CSV file afterwards (--merge-partitions).
+
+def partition_node(key, node_count, dead_nodes=()): # returns the index of the node that the key (a shard URL or an extension ID) is assigned to, the same on every node
+	# The keys of the --dead-nodes are spread evenly over the remaining nodes, all other keys stay where they are:
+	digest = hashlib.sha1(key.encode()).digest()
+	node_index = int.from_bytes(digest[:8], "big") % node_count
+	if node_index in dead_nodes:
+		alive_nodes = [i for i in range(node_count) if i not in dead_nodes]
+		node_index = alive_nodes[int.from_bytes(digest[8:16], "big") % len(alive_nodes)]
+	return node_index
+
+def partition_csv_path(csv_path, node_index, node_count): # e.g. "./extensions.node-2-of-4.csv" for "./extensions.csv"
+	return csv_path.removesuffix(".csv") + f".node-{node_index}-of-{node_count}.csv"
+
+
+
+LOG_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+log_level = LOG_LEVELS["info"] # (set by main() using --log-level)
+
+def log(level, message): # level = "debug", "info", "warning" or "error"; warnings and errors go to stderr
+	if LOG_LEVELS[level] >= log_level:
+		print(message, file=sys.stderr if LOG_LEVELS[level] >= LOG_LEVELS["warning"] else sys.stdout)
+
+
+
+class Metrics:
+	# Counters, gauges and histograms describing a running crawl, e.g. metrics.inc("http_responses_total", status="200") or metrics.observe("fetch_seconds", 0.123, kind="shard").
+	# Each metric can have labels (keyword arguments); all methods are thread-safe.
+	# A gauge can also be a function, which is then evaluated whenever the metrics are written (cf. MetricsReporter).
+	# Histograms count the observed values in fixed buckets (Prometheus-style, i.e., each bucket counts the values <= its upper bound).
+
+	PREFIX = "chrome_webstore_crawler_"
+	HISTOGRAM_BUCKETS = { # histogram name -> upper bounds of the buckets
+		"fetch_seconds": [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60],
+		"fetch_bytes": [1_000, 10_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 10_000_000, 100_000_000],
+		"parse_seconds": [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1],
+	}
+
+	def __init__(self):
+		self._counters = defaultdict(float) # (name, labels) -> value, with labels = tuple of (label, value) pairs, e.g. (("status", "200"),)
+		self._gauges = {} # (name, labels) -> value or function
+		self._histograms = {} # (name, labels) -> [count of bucket 1, ..., count of bucket n, count of +Inf bucket, sum]
+		self._lock = threading.Lock()
+		self.throughput = ThroughputEstimator() # = the smoothed no. of crawled extensions per second
+
+	def inc(self, name, value=1, **labels):
+		with self._lock:
+			self._counters[(name, tuple(sorted(labels.items())))] += value
+
+	def set(self, name, value, **labels): # value = a number or a function returning a number
+		with self._lock:
+			self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+	def observe(self, name, value, **labels):
+		buckets = Metrics.HISTOGRAM_BUCKETS[name]
+		with self._lock:
+			key = (name, tuple(sorted(labels.items())))
+			if key not in self._histograms:
+				self._histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+			histogram = self._histograms[key]
+			histogram[next((i for i, upper_bound in enumerate(buckets) if value <= upper_bound), len(buckets))] += 1
+			histogram[-1] += value
+
+	def _snapshot(self):
+		with self._lock:
+			counters = dict(self._counters)
+			gauges = dict(self._gauges)
+			histograms = {key: list(histogram) for key, histogram in self._histograms.items()}
+		gauges = {key: value() if callable(value) else value for key, value in gauges.items()} # (outside of the lock, as the functions might use other locks)
+		return counters, {key: value for key, value in gauges.items() if value is not None}, histograms
+
+	def to_json(self): # e.g. {"time": 1690000000.0, "counters": {"http_responses_total{status=\"200\"}": 123, ...}, "gauges": {...}, "histograms": {"fetch_seconds{kind=\"shard\"}": {"count": 3, "sum": 1.2, "p50": 0.5, "p99": 1.0}, ...}}
+		counters, gauges, histograms = self._snapshot()
+		json_histograms = {}
+		for (name, labels), histogram in histograms.items():
+			count = sum(histogram[:-1])
+			json_histograms[Metrics._format_name(name, labels)] = {"count": count, "sum": histogram[-1],
+				"p50": Metrics._quantile(Metrics.HISTOGRAM_BUCKETS[name], histogram, 0.5), "p99": Metrics._quantile(Metrics.HISTOGRAM_BUCKETS[name], histogram, 0.99)}
+		return json.dumps({
+			"time": time.time(),
+			"counters": {Metrics._format_name(name, labels): value for (name, labels), value in sorted(counters.items())},
+			"gauges": {Metrics._format_name(name, labels): value for (name, labels), value in sorted(gauges.items())},
+			"histograms": json_histograms,
+		})
+
+	def to_prometheus(self): # returns the metrics in the Prometheus text format, e.g. for the textfile collector of the node_exporter
+		counters, gauges, histograms = self._snapshot()
+		lines = []
+		for metric_type, values in [("counter", counters), ("gauge", gauges)]:
+			for name in sorted(set(name for name, _ in values)):
+				lines.append(f"# TYPE {Metrics.PREFIX}{name} {metric_type}")
+				lines += [f"{Metrics.PREFIX}{Metrics._format_name(name, labels)} {value}" for (name_, labels), value in sorted(values.items()) if name_ == name]
+		for name in sorted(set(name for name, _ in histograms)):
+			lines.append(f"# TYPE {Metrics.PREFIX}{name} histogram")
+			for (name_, labels), histogram in sorted(histograms.items()):
+				if name_ == name:
+					cumulative_count = 0
+					for upper_bound, count in zip(Metrics.HISTOGRAM_BUCKETS[name] + ["+Inf"], histogram[:-1]):
+						cumulative_count += count
+						lines.append(f"{Metrics.PREFIX}{Metrics._format_name(name + '_bucket', labels + (('le', str(upper_bound)),))} {cumulative_count}")
+					lines.append(f"{Metrics.PREFIX}{Metrics._format_name(name + '_sum', labels)} {histogram[-1]}")
+					lines.append(f"{Metrics.PREFIX}{Metrics._format_name(name + '_count', labels)} {cumulative_count}")
+		return "\n".join(lines) + "\n"
+
+	def _format_name(name, labels): # e.g. 'http_responses_total{status="200"}'
+		return name if len(labels) == 0 else name + "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+	def _quantile(buckets, histogram, q): # returns the upper bound of the bucket containing the q-quantile (or None)
+		count = sum(histogram[:-1])
+		cumulative_count = 0
+		for upper_bound, bucket_count in zip(buckets + [inf], histogram[:-1]):
+			cumulative_count += bucket_count
+			if count > 0 and cumulative_count >= q * count:
+				return upper_bound if upper_bound != inf else None
+		return None
+
+
+
+class ThroughputEstimator:
+	# An exponentially smoothed rate of events per second (e.g. crawled extensions), like the Unix load average:
+	#   every {tick} seconds (at the earliest), the rate of the last interval is blended into the estimate with weight 1 - exp(-interval/{time_constant}).
+
+	def __init__(self, time_constant=60.0, tick=5.0):
+		self.time_constant = time_constant
+		self.tick = tick
+		self._rate = None # (None until the first interval is over)
+		self._count = 0 # = no. of events in the current interval
+		self._interval_start = time.monotonic()
+		self._lock = threading.Lock()
+
+	def add(self, n=1):
+		with self._lock:
+			self._update()
+			self._count += n
+
+	def rate(self): # in events per second (or None if there's no estimate yet)
+		with self._lock:
+			self._update()
+			return self._rate
+
+	def eta(self, remaining): # the estimated no. of seconds until {remaining} more events have happened (or None)
+		rate = self.rate()
+		return remaining / rate if rate is not None and rate > 0 else None
+
+	def _update(self):
+		now = time.monotonic()
+		interval = now - self._interval_start
+		if interval >= self.tick:
+			interval_rate = self._count / interval
+			self._rate = interval_rate if self._rate is None else self._rate + (1 - exp(-interval / self.time_constant)) * (interval_rate - self._rate)
+			self._count = 0
+			self._interval_start = now
+
+
+
+class MetricsReporter:
+	# Writes the metrics every {interval} seconds (and once more on stop()) to {sink}:
+	#   format "json": appends one JSON line each time (sink "-" = stderr),
+	#   format "prometheus": replaces the file each time (atomically, as required by the textfile collector of the node_exporter).
+
+	def __init__(self, metrics, sink, format="json", interval=10.0):
+		self.metrics = metrics
+		self.sink = sink # a file path or "-"
+		self.format = format
+		self.interval = interval
+		self._stopped = threading.Event()
+		self._thread = threading.Thread(target=self._report_periodically, daemon=True)
+
+	def start(self):
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._stopped.set()
+		self._thread.join()
+		self.report()
+
+	def report(self):
+		if self.format == "prometheus":
+			content = self.metrics.to_prometheus()
+			if self.sink == "-":
+				print(content, file=sys.stderr)
+			else:
+				temp_path = str(self.sink) + ".tmp"
+				with open(temp_path, "w") as f:
+					f.write(content)
+				os.replace(temp_path, self.sink)
+		else:
+			line = self.metrics.to_json()
+			if self.sink == "-":
+				print(line, file=sys.stderr)
+			else:
+				with open(self.sink, "a") as f:
+					f.write(line + "\n")
+
+	def _report_periodically(self):
+		while not self._stopped.wait(self.interval):
+			try:
+				self.report()
+			except OSError as err:
+				log("warning", f"Warning: failed to write the metrics to '{self.sink}': {err}")
+
+
+
+metrics = Metrics() # (shared by all threads)
+
+
+
+class RateLimiter:
+	# An adaptive token bucket limiting the rate of requests to a single host (shared by all threads):
+	#   * every request takes one token; tokens are refilled at {rate} tokens per second (allowing bursts of up to 1 second worth of tokens),
+	#   * the rate is halved whenever the host responds with a 429 or 5xx (and all requests are paused for the duration of a "Retry-After" header, if any),
+	#   * while the host keeps responding fine, the rate is increased again by 10% after every {SUCCESSES_PER_INCREASE} successful responses, up to {max_rate}.
+
+	SUCCESSES_PER_INCREASE = 10
+
+	def __init__(self, rate, max_rate, min_rate=MIN_RATE_LIMIT):
+		self.rate = rate # = current no. of requests per second
+		self.max_rate = max(rate, max_rate)
+		self.min_rate = min(rate, min_rate)
+		self._tokens = 1.0
+		self._last_refill = time.monotonic()
+		self._blocked_until = 0.0 # (set by a "Retry-After" header)
+		self._consecutive_successes = 0
+		self._lock = threading.Lock()
+
+	def acquire(self): # blocks until the next request may be sent
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last_refill) * self.rate)
+			self._last_refill = now
+			self._tokens -= 1 # (may become negative, which reserves a token in the future, s.t. waiting threads are spaced out evenly)
+			wait = max(0.0, self._blocked_until - now) + max(0.0, -self._tokens / self.rate)
+		if wait > 0:
+			time.sleep(wait)
+
+	def success(self):
+		with self._lock:
+			self._consecutive_successes += 1
+			if self._consecutive_successes >= RateLimiter.SUCCESSES_PER_INCREASE:
+				self._consecutive_successes = 0
+				self.rate = min(self.max_rate, self.rate * 1.1)
+
+	def throttle(self, retry_after=None): # to be called on a 429 or 5xx; retry_after = value of the "Retry-After" header in seconds (or None)
+		with self._lock:
+			self._consecutive_successes = 0
+			self.rate = max(self.min_rate, self.rate / 2)
+			self._tokens = min(self._tokens, 0.0)
+			if retry_after is not None:
+				self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+
+
+def parse_retry_after(retry_after): # turns the value of a "Retry-After" header (e.g. "120" or "Wed, 21 Oct 2015 07:28:00 GMT") into seconds (or None)
+	if retry_after is None:
+		return None
+	try:
+		return max(0.0, float(retry_after))
+	except ValueError:
+		try:
+			return max(0.0, (email.utils.parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+		except (TypeError, ValueError):
+			return None
+
+
+
+class HTTPClient:
+	# A small HTTP client keeping persistent (keep-alive) connections to each host, instead of opening a new TCP+TLS connection for every single request.
+	# Nearly all requests go to the same two hosts (chrome.google.com and clients2.google.com), so this saves a TLS handshake on almost every request.
+	# The no. of concurrent connections to each host is capped by max_connections_per_host (cf. --max-connections-per-host).
+	# Responses are requested with "Accept-Encoding: gzip, deflate" (and "br" if the optional brotli module is installed) and decoded transparently.
+	# Errors are raised as urllib.error.HTTPError, just like urllib.request.urlopen() would, so that all existing error handling keeps working.
+	# The rate of requests to each host is limited by an (adaptive) RateLimiter (cf. --rate-limit and --max-rate-limit).
+	# Requests failing with a 429/5xx or a network error are retried up to {max_retries} times with exponential backoff and jitter,
+	#   honoring "Retry-After" headers; only then is the error raised.
+
+	RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+	MAX_BACKOFF_IN_SECONDS = 300
+
+	MAX_REDIRECTS = 10 # (same as urllib.request.HTTPRedirectHandler.max_redirections)
+	MAX_REPEATS = 4 # (same as urllib.request.HTTPRedirectHandler.max_repeats)
+
+	def __init__(self, max_connections_per_host=MAX_CONNECTIONS_PER_HOST, timeout=DEFAULT_TIMEOUT_IN_SECONDS, rate_limit=DEFAULT_RATE_LIMIT, max_rate_limit=DEFAULT_MAX_RATE_LIMIT, max_retries=DEFAULT_MAX_RETRIES):
+		self.max_connections_per_host = max_connections_per_host
+		self.timeout = timeout
+		self.rate_limit = rate_limit # = initial no. of requests per second to each host
+		self.max_rate_limit = max_rate_limit
+		self.max_retries = max_retries
+		self._rate_limiters = {} # maps each host (e.g. "chrome.google.com") to its RateLimiter
+		self._semaphores = {} # maps each (scheme, host) to a threading.BoundedSemaphore(max_connections_per_host)
+		self._idle_connections = defaultdict(list) # maps each (scheme, host) to a list of idle (keep-alive) http.client.HTTPConnection's
+		self._lock = threading.Lock()
+
+	def get(self, url, user_agent="", headers=None): # may throw urllib.error.HTTPError; returns an HTTPClientResponse which should be used as a context manager
+		# headers = additional request headers, e.g. {"Range": "bytes=1000-"}
+		attempt = 0
+		while True:
+			try:
+				return self._get(url, user_agent, headers)
+			except urllib.error.HTTPError as http_err:
+				if http_err.code not in HTTPClient.RETRY_STATUS_CODES or attempt >= self.max_retries:
+					raise
+				error = http_err
+				retry_after = parse_retry_after(http_err.headers.get("Retry-After"))
+			except (OSError, http.client.HTTPException) as err: # e.g. a timeout or a connection reset
+				metrics.inc("http_network_errors_total", error=type(err).__name__)
+				if attempt >= self.max_retries:
+					raise
+				error = err
+				retry_after = None
+			attempt += 1
+			metrics.inc("http_retries_total")
+			backoff = min(HTTPClient.MAX_BACKOFF_IN_SECONDS, 2 ** attempt) * random.uniform(0.5, 1.5) # exponential backoff with jitter: ~2s, ~4s, ~8s, ...
+			delay = backoff if retry_after is None else max(retry_after, backoff)
+			log("warning", f"Warning: request to '{url}' failed ({error}), retrying in {delay:.1f} seconds (retry {attempt}/{self.max_retries}) ...")
+			time.sleep(delay)
+
+	def rate_summary(self): # e.g. "chrome.google.com: 1.33 req/s, clients2.google.com: 0.50 req/s"
+		with self._lock:
+			return ", ".join(f"{host}: {rate_limiter.rate:.2f} req/s" for host, rate_limiter in self._rate_limiters.items())
+
+	def _rate_limiter(self, host):
+		with self._lock:
+			if host not in self._rate_limiters:
+				self._rate_limiters[host] = RateLimiter(self.rate_limit, self.max_rate_limit)
+			return self._rate_limiters[host]
+
+	def _get(self, url, user_agent, extra_headers):
+		visited = defaultdict(int) # redirect URL -> how often it has been visited
+		while True:
+			response = self._request(url, user_agent, extra_headers)
+			if response.status in [301, 302, 303, 307, 308] and "Location" in response.headers:
+				response.read() # (reading the response is necessary to be able to re-use the connection)
+				response.close()
+				new_url = urllib.parse.urljoin(url, response.headers["Location"])
+				visited[new_url] += 1
+				if visited[new_url] >= HTTPClient.MAX_REPEATS or len(visited) >= HTTPClient.MAX_REDIRECTS:
+					raise urllib.error.HTTPError(url, response.status, "The HTTP server returned a redirect error that would lead to an infinite loop.\nThe last 30x error message was:\n" + response.reason, response.headers, None)
+				url = new_url
+			elif response.status >= 400:
+				body = response.read()
+				response.close()
+				raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+			else:
+				return response
+
+	def _request(self, url, user_agent, extra_headers):
+		url_parts = urllib.parse.urlsplit(url) # e.g. SplitResult(scheme='https', netloc='chrome.google.com', path='/webstore/sitemap', query='shard=573', fragment='')
+		key = (url_parts.scheme, url_parts.netloc)
+		path = url_parts.path or "/"
+		if url_parts.query != "":
+			path += "?" + url_parts.query
+		path = urllib.parse.quote(path, safe="/%?=&:;@+$,!*'()~#[]") # (only has an effect on non-ASCII characters etc., already percent-encoded URLs are left untouched)
+		headers = {
+			"User-Agent": user_agent if user_agent != "" else DEFAULT_USER_AGENT,
+			"Accept-Encoding": "gzip, deflate, br" if brotli is not None else "gzip, deflate",
+		} | (extra_headers or {})
+		rate_limiter = self._rate_limiter(url_parts.netloc)
+		rate_limiter.acquire()
+		semaphore = self._semaphore(key)
+		semaphore.acquire() # (released again by HTTPClientResponse.close())
+		try:
+			while True:
+				connection, reused = self._checkout_connection(key)
+				try:
+					connection.request("GET", path, headers=headers)
+					response = HTTPClientResponse(self, key, connection, connection.getresponse(), url)
+					metrics.inc("http_responses_total", status=str(response.status))
+					if response.status == 429 or response.status >= 500:
+						rate_limiter.throttle(parse_retry_after(response.headers.get("Retry-After")))
+					else:
+						rate_limiter.success()
+					return response
+				except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+					connection.close()
+					if not reused:
+						raise
+					# else: the server closed the idle keep-alive connection in the meantime => simply retry with a new connection
+				except BaseException: # (e.g. a timeout in the middle of the response: the connection is in an unknown state and must never be reused)
+					connection.close()
+					raise
+		except BaseException:
+			semaphore.release()
+			raise
+
+	def _semaphore(self, key):
+		with self._lock:
+			if key not in self._semaphores:
+				self._semaphores[key] = threading.BoundedSemaphore(self.max_connections_per_host)
+			return self._semaphores[key]
+
+	def _checkout_connection(self, key): # returns (connection, reused)
+		with self._lock:
+			if len(self._idle_connections[key]) > 0:
+				return self._idle_connections[key].pop(), True
+		scheme, host = key
+		if scheme == "https":
+			return http.client.HTTPSConnection(host, timeout=self.timeout), False
+		else:
+			return http.client.HTTPConnection(host, timeout=self.timeout), False
+
+	def _release_connection(self, key, connection, reusable):
+		if reusable:
+			with self._lock:
+				self._idle_connections[key].append(connection)
+		else:
+			connection.close()
+		self._semaphore(key).release()
+
+
+
+class HTTPClientResponse:
+	# Returned by HTTPClient.get(); iterating over it yields the (decoded) body chunk by chunk, read() returns the entire (decoded) body.
+	CHUNK_SIZE = 64 * 1024
+
+	def __init__(self, client, key, connection, raw_response, url):
+		self.url = url
+		self.status = raw_response.status # e.g. 200
+		self.reason = raw_response.reason # e.g. "OK"
+		self.headers = raw_response.headers # an http.client.HTTPMessage
+		self._client = client
+		self._key = key
+		self._connection = connection
+		self._raw_response = raw_response
+		self._closed = False
+
+	def __iter__(self):
+		decoder = content_decoder(self.headers.get("Content-Encoding", ""))
+		received = 0
+		while True:
+			chunk = self._raw_response.read(HTTPClientResponse.CHUNK_SIZE)
+			if not chunk:
+				break
+			received += len(chunk)
+			yield chunk if decoder is None else decoder.decompress(chunk)
+		# (read(amt) doesn't complain when the server closes the connection too early, so check the Content-Length ourselves:)
+		expected = self.headers.get("Content-Length")
+		if expected is not None and expected.isdigit() and received < int(expected) and self._raw_response.chunked is False:
+			raise http.client.IncompleteRead(b"", int(expected) - received)
+		if decoder is not None:
+			yield decoder.flush()
+
+	def read(self):
+		return b"".join(self)
+
+	def close(self):
+		if not self._closed:
+			self._closed = True
+			# The connection can only be re-used if the response has been read entirely and the server didn't ask to close the connection:
+			reusable = self._raw_response.isclosed() and not self._raw_response.will_close
+			self._client._release_connection(self._key, self._connection, reusable)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+
+
+class BrotliDecoder: # gives brotli the same interface as zlib.decompressobj()
+	def __init__(self):
+		self._decompressor = brotli.Decompressor()
+
+	def decompress(self, data):
+		return self._decompressor.process(data)
+
+	def flush(self):
+		return b""
+
+
+
+def content_decoder(content_encoding): # returns a decoder for the given "Content-Encoding" header value (e.g. "gzip"), or None if the body isn't encoded
+	match content_encoding.strip().lower():
+		case "" | "identity":
+			return None
+		case "gzip" | "x-gzip":
+			return zlib.decompressobj(16 + zlib.MAX_WBITS)
+		case "deflate":
+			return zlib.decompressobj(32 + zlib.MAX_WBITS) # (32 = automatic zlib/gzip header detection)
+		case "br" if brotli is not None:
+			return BrotliDecoder()
+		case _:
+			raise ValueError(f"'{content_encoding}' is not a supported Content-Encoding.")
+
+
+
+http_client = HTTPClient() # (shared by all threads; configured by main() using --max-connections-per-host and --timeout)
+
+
+
 def download_file(file_url, destination_file, user_agent=""):
-	# cf. https://stackoverflow.com/questions/27928470/how-can-i-download-this-xml-file-from-given-url
-	headers = {} if user_agent == "" else {'User-Agent': user_agent}
-	
-	request = urllib.request.Request(file_url, headers=headers)
-	response = urllib.request.urlopen(request)
-	with open(destination_file, 'wb') as outfile:
-		shutil.copyfileobj(response, outfile)
+	with http_client.get(file_url, user_agent=user_agent) as response:
+		with open(destination_file, 'wb') as outfile:
+			for chunk in response:
+				outfile.write(chunk)
+
+
+
+def download(file_url, user_agent="", validators=None, kind="other"): # like download_file() but returns the (decoded) content as bytes instead of writing it to a file
+	# validators = a dict like {"ETag": '"abc123"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"} (e.g. from a previous download, or {})
+	#   => The request is conditional (If-None-Match/If-Modified-Since) and None is returned if the content hasn't changed (i.e., "304 Not Modified").
+	#   => The dict is updated with the validators of the response.
+	# kind = the label of the fetch_seconds and fetch_bytes metrics, e.g. "detail_page" or "shard"
+	start_time = time.perf_counter()
+	headers = {}
+	if validators is not None:
+		if validators.get("ETag"):
+			headers["If-None-Match"] = validators["ETag"]
+		if validators.get("Last-Modified"):
+			headers["If-Modified-Since"] = validators["Last-Modified"]
+	with http_client.get(file_url, user_agent=user_agent, headers=headers) as response:
+		content = response.read() # (even the empty body of a 304 has to be read in order to re-use the connection)
+		if validators is not None:
+			for header in ["ETag", "Last-Modified"]:
+				if response.headers.get(header) is not None:
+					validators[header] = response.headers[header]
+	metrics.observe("fetch_seconds", time.perf_counter() - start_time, kind=kind)
+	metrics.observe("fetch_bytes", len(content), kind=kind)
+	return None if response.status == 304 else content
+
+
+
+def download_file_resumable(file_url, destination_file, user_agent="", validate=None, kind="file"): # may throw urllib.error.HTTPError or ValueError (if validate() fails)
+	# Like download_file(), but safe to interrupt:
+	#   * the download goes into "{destination_file}.part" first, which is only renamed to {destination_file} (atomically) once it's complete and valid,
+	#   * should the connection break off (in this or in an earlier run), the download is resumed where it stopped, using an HTTP Range request.
+	# validate = a function that is given the path of the downloaded file and raises a ValueError if the file is invalid (e.g. validate_crx_file).
+	# kind = cf. download()
+	start_time = time.perf_counter()
+	part_file = destination_file + ".part"
+	attempt = 0
+	while True:
+		offset = os.path.getsize(part_file) if os.path.isfile(part_file) else 0
+		headers = {"Accept-Encoding": "identity"} # (no compression, so that the byte offsets of the Range request refer to the file itself)
+		if offset > 0:
+			headers["Range"] = f"bytes={offset}-"
+		try:
+			with http_client.get(file_url, user_agent=user_agent, headers=headers) as response:
+				content_range = response.headers.get("Content-Range", "") # e.g. "bytes 1000-4999/5000"
+				if response.status == 206 and content_range.startswith(f"bytes {offset}-"):
+					mode = "ab" # resume
+					expected_size = int(content_range.split("/")[-1]) if not content_range.endswith("/*") else None
+				else:
+					mode = "wb" # (the server ignored the Range header, start over)
+					expected_size = int(response.headers["Content-Length"]) if "Content-Length" in response.headers else None
+				with open(part_file, mode) as outfile:
+					for chunk in response:
+						outfile.write(chunk)
+			break
+		except urllib.error.HTTPError as http_err:
+			if http_err.code == 416 and offset > 0: # 416 Range Not Satisfiable, i.e., the .part file is invalid => start over
+				os.remove(part_file)
+			else:
+				raise
+		except (OSError, http.client.HTTPException) as err: # the connection broke off => resume (the partial download is kept)
+			attempt += 1
+			if attempt > http_client.max_retries:
+				raise
+			log("warning", f"Warning: download of '{file_url}' was interrupted ({err}), resuming it ...")
+
+	actual_size = os.path.getsize(part_file)
+	if expected_size is not None and actual_size != expected_size:
+		raise ValueError(f"Download of '{file_url}' is incomplete: {actual_size} of {expected_size} bytes (will be resumed next time).")
+	if validate is not None:
+		try:
+			validate(part_file)
+		except ValueError:
+			os.remove(part_file) # (re-downloading it from scratch next time might help)
+			raise
+	os.replace(part_file, destination_file) # (atomic)
+	metrics.observe("fetch_seconds", time.perf_counter() - start_time, kind=kind)
+	metrics.observe("fetch_bytes", actual_size, kind=kind)
+
+
+
+def validate_crx_file(crx_file): # raises a ValueError if the given file is not a complete CRX3 file
+	# A CRX3 file consists of: "Cr24" (magic number) | version (uint32, little endian, = 3) | header size (uint32, little endian) | header | ZIP archive
+	#   => cf. https://chromium.googlesource.com/chromium/src/+/HEAD/components/crx_file/crx3.proto
+	file_size = os.path.getsize(crx_file)
+	with open(crx_file, "rb") as f:
+		prefix = f.read(12)
+		if len(prefix) < 12 or prefix[:4] != b"Cr24":
+			raise ValueError(f"'{crx_file}' is not a .CRX file (magic number: {prefix[:4]}).")
+		version = int.from_bytes(prefix[4:8], "little")
+		header_size = int.from_bytes(prefix[8:12], "little")
+		if version != 3:
+			raise ValueError(f"'{crx_file}' is a CRX{version} file, expected CRX3.")
+		zip_offset = 12 + header_size
+		if file_size < zip_offset + 22: # (22 bytes = size of the smallest possible ZIP archive)
+			raise ValueError(f"'{crx_file}' is truncated ({file_size} bytes, but the CRX header alone is {zip_offset} bytes).")
+		f.seek(zip_offset)
+		if f.read(4) not in [b"PK\x03\x04", b"PK\x05\x06"]:
+			raise ValueError(f"'{crx_file}' does not contain a ZIP archive after its CRX header.")
+		# A complete ZIP archive ends with an "end of central directory record" (which is at most 22 + 65535 bytes long):
+		f.seek(max(zip_offset, file_size - (22 + 65535)))
+		if b"PK\x05\x06" not in f.read():
+			raise ValueError(f"'{crx_file}' is truncated (the ZIP archive has no end of central directory record).")
+
+
+
+class CRXManifest:
+	# The list of all .CRX files that have been downloaded completely (and validated) into a folder: "{folder}/crx_manifest.csv",
+	#   with one line per .CRX file: extension ID, size in bytes, SHA-256 (e.g. "abcdefghijklmnopqrstuvwxyzabcdef,123456,9f86d0...").
+	# Used by --no-re-download to tell complete downloads apart from truncated ones.
+
+	def __init__(self, folder):
+		self.path = Path(folder) / "crx_manifest.csv"
+		self._entries = {} # extension ID -> (size in bytes, SHA-256)
+		self._lock = threading.Lock()
+		if self.path.is_file():
+			with open(self.path, "r") as manifest_file:
+				for line in manifest_file:
+					if line.endswith("\n"): # (ignore a torn last line)
+						extension_id, size, sha256 = line.rstrip("\n").split(",")
+						self._entries[extension_id] = (int(size), sha256)
+
+	def contains(self, extension_id, crx_file): # True iff the .CRX file is listed in the manifest and still has the size it had when it was downloaded
+		with self._lock:
+			entry = self._entries.get(extension_id)
+		return entry is not None and os.path.isfile(crx_file) and os.path.getsize(crx_file) == entry[0]
+
+	def add(self, extension_id, crx_file):
+		sha256 = hashlib.sha256()
+		with open(crx_file, "rb") as f:
+			for chunk in iter(lambda: f.read(1024 * 1024), b""):
+				sha256.update(chunk)
+		size = os.path.getsize(crx_file)
+		with self._lock:
+			self._entries[extension_id] = (size, sha256.hexdigest())
+			with open(self.path, "a") as manifest_file:
+				manifest_file.write(f"{extension_id},{size},{sha256.hexdigest()}\n")
+
+
+
+def crx_manifest(folder): # returns the (cached) CRXManifest of the given folder
+	with _crx_manifests_lock:
+		if folder not in _crx_manifests:
+			_crx_manifests[folder] = CRXManifest(folder)
+		return _crx_manifests[folder]
+
+_crx_manifests = {} # folder -> CRXManifest
+_crx_manifests_lock = threading.Lock()
+
+
+
+def keep_temp_file(temp_dest_file, content): # only used when KEEP_TEMP_HTML_FILES or KEEP_TEMP_XML_FILES is set, for debugging
+	with open(temp_dest_file, "w" if isinstance(content, str) else "wb") as outfile:
+		outfile.write(content)
 
 
 
 def download_sitemap_xml_file(sitemap_xml_file, user_agent=""):
-	url = "https://chrome.google.com/webstore/sitemap"
+	url = CHROME_WEBSTORE_URL + "/sitemap"
 	print(f"Downloading sitemap.xml from '{url}' to '{sitemap_xml_file}' ...")
 	download_file(file_url=url, destination_file=sitemap_xml_file, user_agent=user_agent)
 
 
 
-def print_progress(done, total, of_what="", suffix="", width_in_chars=50, done_char='\u2588', undone_char='\u2591'):
-	no_done_chars   = round((done/total) * width_in_chars)
-	no_undone_chars = width_in_chars - no_done_chars
-	print(f"[{done_char * no_done_chars}{undone_char * no_undone_chars}] {done} / {total} {of_what} {suffix}")
+def refresh_sitemap_xml_file(sitemap_xml_file, user_agent=""): # downloads sitemap.xml again, but only if it has changed since the existing file was downloaded (If-Modified-Since)
+	url = CHROME_WEBSTORE_URL + "/sitemap"
+	if_modified_since = email.utils.formatdate(os.path.getmtime(sitemap_xml_file), usegmt=True) # e.g. "Wed, 21 Oct 2015 07:28:00 GMT"
+	validators = {"Last-Modified": if_modified_since}
+	try:
+		xml_content = download(file_url=url, user_agent=user_agent, validators=validators, kind="sitemap")
+	except (urllib.error.HTTPError, OSError, http.client.HTTPException) as err:
+		print(f"Warning: failed to check whether '{url}' has changed ({err}), using the existing '{sitemap_xml_file}' ...", file=sys.stderr)
+		return
+	if xml_content is None:
+		print(f"sitemap.xml hasn't changed since '{sitemap_xml_file}' was downloaded.")
+		return
+	temp_file = Path(str(sitemap_xml_file) + ".tmp")
+	temp_file.write_bytes(xml_content)
+	if validators["Last-Modified"] != if_modified_since: # (otherwise, the server didn't send a Last-Modified date and the file keeps the current time)
+		last_modified = email.utils.parsedate_to_datetime(validators["Last-Modified"]).timestamp()
+		os.utime(temp_file, (last_modified, last_modified)) # (s.t. the next If-Modified-Since is the server's own date)
+	os.replace(temp_file, sitemap_xml_file)
+	print(f"sitemap.xml has changed, downloaded it again to '{sitemap_xml_file}'.")
+
+
+
+def extension_id_from_url(extension_url): # e.g. turns "https://chrome.google.com/webstore/detail/extension-name-here/abcdefghijklmnopqrstuvwxyzabcdef" into "abcdefghijklmnopqrstuvwxyzabcdef"
+	return [url_el for url_el in extension_url.split("/") if url_el != ""][-1] # list comprehension just in case there should ever be a trailing slash "/"
+
+
+
+def download_shard(url, user_agent="", validators=None): # url = e.g. "https://chrome.google.com/webstore/sitemap?shard=573"; returns the raw XML (or None if not modified, cf. download())
+	log("debug", f"Downloading '{url}' ...")
+	xml_content = download(file_url=url, user_agent=user_agent, validators=validators, kind="shard")
+	if xml_content is None:
+		log("info", f"Not modified: '{url}'")
+		return None
+	log("info", f"Downloaded '{url}' ({len(xml_content)} bytes)")
+	if KEEP_TEMP_XML_FILES: # (for debugging only)
+		keep_temp_file("./." + url.split("=")[-1] + ".xml", xml_content) # e.g. "./.573.xml"
+	return xml_content
+
+
+
+def iterate_extensions_in_shard(xml_content, shuffle_buffer_size=SHUFFLE_BUFFER_SIZE): # yields (extension_url, languages) for each extension listed in the shard
+	# The shard is parsed as a stream (ET.iterparse), i.e., no element tree and no list of all extension URLs is ever built:
+	#   each extension is yielded as soon as its <url> element has been parsed (and the element is cleared right after).
+	# e.g. <url><loc>...</loc><xhtml:link href="https://chrome.google.com/webstore/detail/extension-name-here/abcdefghijklmnopqrstuvwxyzabcdef" hreflang="en-US" rel="alternate"/>...</url>
+	# To still crawl in random(!) order, the extensions are passed through a shuffle buffer of {shuffle_buffer_size} extensions.
+	seen_extension_urls = set() # to remove duplicates
+	shuffle_buffer = []
+	xml_root = None
+	for event, xml_el in ET.iterparse(io.BytesIO(xml_content), events=("start", "end")): # https://docs.python.org/3/library/xml.etree.elementtree.html#xml.etree.ElementTree.iterparse
+		if event == "start":
+			if xml_root is None:
+				xml_root = xml_el
+		elif xml_el.tag.endswith("}url") or xml_el.tag == "url":
+			extension_languages = defaultdict(list) # maps each extension URL to the list of supported languages
+			for link_el in xml_el:
+				if link_el.tag.endswith("link"):
+					extension_languages[link_el.attrib["href"]].append(link_el.attrib["hreflang"]) # keeps track of all languages supported by each extension
+			for extension_url, languages in extension_languages.items():
+				if extension_url not in seen_extension_urls:
+					seen_extension_urls.add(extension_url)
+					shuffle_buffer.append((extension_url, languages))
+			xml_root.clear() # (removes the <url> elements parsed so far, keeping the memory usage flat)
+			while len(shuffle_buffer) > shuffle_buffer_size:
+				i = random.randrange(len(shuffle_buffer))
+				shuffle_buffer[i], shuffle_buffer[-1] = shuffle_buffer[-1], shuffle_buffer[i]
+				yield shuffle_buffer.pop()
+	random.shuffle(shuffle_buffer)
+	yield from shuffle_buffer
+	log("debug", f"Collected {len(seen_extension_urls)} distinct extension URLs from shard.")
+
+
+
+# --parse-workers: The detail pages and shards are parsed by a pool of worker processes (a ProcessPoolExecutor), s.t. the parsing isn't limited
+#   to a single core by the GIL (which the worker threads doing the network I/O and the .CSV writes share).
+# The following functions are run in these processes, their arguments and return values are pickled:
+
+def init_parse_worker(level): # (initializer of each parse worker process)
+	global log_level
+	log_level = level
+	signal.signal(signal.SIGINT, signal.SIG_IGN) # (Ctrl+C is handled by the main process only, which then shuts the pool down)
+
+def parse_detail_page(chrome_extension, html): # returns (chrome_extension with all fields filled in, field extraction times, failed fields), cf. ChromeExtension.parse_info()
+	field_extraction_times, failed_fields = chrome_extension.parse_info(html)
+	return chrome_extension, field_extraction_times, failed_fields
+
+def list_extensions_in_shard(xml_content): # = list(iterate_extensions_in_shard(xml_content))
+	return list(iterate_extensions_in_shard(xml_content))
+
+
+
+def iterate_shards(urls, user_agent="", executor=None, crawl_state=None, lastmods=None): # yields (i, url, xml_content, validators) for each shard URL, in the given order
+	# (xml_content is None for shards that have already been downloaded in a previous run, according to the crawl_state,
+	#   and for shards that haven't changed since the previous crawl (--refresh), i.e., whose <lastmod> in sitemap.xml is still the same or that were "304 Not Modified")
+	# lastmods = {url: <lastmod> of the shard in sitemap.xml, or None}
+	def download_shard_if_necessary(url, user_agent):
+		if crawl_state is None:
+			return download_shard(url, user_agent=user_agent), {}
+		if crawl_state.shard_status(url) != "pending":
+			return None, {}
+		validators, previous_lastmod = crawl_state.shard_validators(url)
+		lastmod = (lastmods or {}).get(url)
+		if lastmod is not None and lastmod == previous_lastmod:
+			log("info", f"Shard '{url}' hasn't changed since the previous crawl (<lastmod>{lastmod}</lastmod>), not downloading it again.")
+			crawl_state.mark_shard_unchanged(url)
+			return None, validators
+		xml_content = download_shard(url, user_agent=user_agent, validators=validators)
+		if xml_content is None:
+			crawl_state.mark_shard_unchanged(url, validators, lastmod)
+		return xml_content, validators
+
+	if executor is None:
+		for i, url in enumerate(urls):
+			yield i, url, *download_shard_if_necessary(url, user_agent)
+	else:
+		# Prefetch the next NO_OF_SHARDS_TO_PREFETCH shards in the background while the current one is being crawled:
+		shard_futures = deque()
+		metrics.set("queue_depth", lambda: len(shard_futures), queue="shards")
+		for i, url in enumerate(urls):
+			shard_futures.append((i, url, executor.submit(download_shard_if_necessary, url, user_agent)))
+			if len(shard_futures) > NO_OF_SHARDS_TO_PREFETCH:
+				i_, url_, future = shard_futures.popleft()
+				yield i_, url_, *future.result()
+		while len(shard_futures) > 0:
+			i_, url_, future = shard_futures.popleft()
+			yield i_, url_, *future.result()
+
+
+
+def crawl_extension(chrome_extension, extension_url, extensions_csv, args, crawl_state=None, parse_pool=None): # (may be called from a worker thread); returns False iff the extension couldn't be crawled because of a (temporary) error
+	extension_id = chrome_extension.extension_id
+	try:
+		# With --refresh, the page of an extension that's already in the .CSV file is requested conditionally (using the validators of the previous crawl),
+		#   i.e., if it hasn't changed, the server responds with "304 Not Modified" (without a body) and there's nothing to parse and nothing to write:
+		known = args.refresh and crawl_state is not None and chrome_extension.already_listed_in_extensions_csv(extensions_csv)
+		validators, previous_row_hash = crawl_state.extension_validators(extension_id) if known else ({}, None)
+		if chrome_extension.download_info_from_url(extension_url=extension_url, user_agent=args.user_agent, validators=validators, parse_pool=parse_pool) is None:
+			crawl_state.mark_extension(extension_id, "done", 304, validators)
+			metrics.inc("extensions_total", result="not_modified")
+			metrics.throughput.add()
+			time.sleep(args.sleep / 1000)
+			return True
+		if args.crx_download != "":
+			if chrome_extension.no_of_users < args.crx_download_user_threshold_min:
+				log("debug", f"Not downloading .CRX of extension with ID {extension_id} as it has too few users ({chrome_extension.no_of_users} < {args.crx_download_user_threshold_min}).")
+			elif chrome_extension.no_of_users > args.crx_download_user_threshold_max:
+				log("debug", f"Not downloading .CRX of extension with ID {extension_id} as it has too many users ({chrome_extension.no_of_users} > {args.crx_download_user_threshold_max}).")
+			else:
+				try: # Graceful failure if .CRX download fails:
+					crx_file = chrome_extension.download_crx_to(crx_dest_folder=args.crx_download, user_agent=args.user_agent)
+					log("debug", f"Download Success: Downloaded extension with ID {chrome_extension.extension_id} to: {crx_file}")
+					metrics.inc("crx_downloads_total", result="successful")
+				except urllib.error.HTTPError as http_err:
+					log("error", f"Error: failed to download extension with ID {chrome_extension.extension_id} (HTTP error when visiting '{http_err.url}'): {http_err}")
+					metrics.inc("crx_downloads_total", result="failed")
+				except (AttributeError, ValueError) as err:
+					log("error", f"Error: failed to download extension with ID {chrome_extension.extension_id} (invalid download): {err}")
+					metrics.inc("crx_downloads_total", result="failed")
+				except (OSError, http.client.HTTPException) as err: # (after HTTPClient has given up retrying; the partial download is kept and will be resumed next time)
+					log("error", f"Error: failed to download extension with ID {chrome_extension.extension_id} (network error): {err}")
+					metrics.inc("crx_downloads_total", result="failed")
+		# (thread-safe, i.e., all .CSV writes are serialized; the extension is only marked as 'done' once its line has actually been written to the .CSV file)
+		row_hash = hashlib.sha1(chrome_extension.as_cvs_line().encode()).hexdigest() # (to recognize unchanged extensions on the next --refresh)
+		on_written = (lambda: crawl_state.mark_extension(extension_id, "done", 200, validators, row_hash)) if crawl_state is not None else None
+		if not known:
+			chrome_extension.add_to_extensions_csv(extensions_csv=extensions_csv, on_written=on_written)
+			metrics.inc("extensions_total", result="added")
+		elif row_hash == previous_row_hash:
+			log("debug", f"Extension with ID {extension_id} hasn't changed since the previous crawl.")
+			on_written()
+			metrics.inc("extensions_total", result="unchanged")
+		else:
+			log("debug", f"Extension with ID {extension_id} has changed since the previous crawl, updating it in the .CSV file ...")
+			extensions_csv.update(chrome_extension, on_written=on_written)
+			metrics.inc("extensions_total", result="updated")
+		metrics.throughput.add()
+	except urllib.error.HTTPError as http_err:
+		if http_err.code in [404, 301]:
+			# urllib.error.HTTPError: HTTP Error 404: Not Found
+			#   => e.g.: https://chrome.google.com/webstore/detail/shopping-saviour/jagmhbnfefommcdbkodbdbmklbagodcl
+			# urllib.error.HTTPError: HTTP Error 301: The HTTP server returned a redirect error that would lead to an infinite loop.
+			#   => e.g.: https://chrome.google.com/webstore/detail/%D9%83%D9%88%D8%AF-%D8%AE%D8%B5%D9%85-%D9%86%D8%B3%D9%8A%D9%85-%D9%84%D9%84%D9%88%D8%B1%D8%AF-%2510-%D9%84%D9%83/ngbejcbghammjgkmheipacdnkelaocco
+			log("warning", f"Error: Visiting extension URL '{extension_url}' resulted in a {http_err.code} HTTP error ({http_err}), skipping this extension (it will not be added to the .CSV file).")
+			if crawl_state is not None:
+				crawl_state.mark_extension(extension_id, "failed", http_err.code)
+			metrics.inc("extensions_total", result="failed")
+			metrics.throughput.add()
+		else: # any other HTTPError (after HTTPClient has given up retrying), e.g., a "urllib.error.HTTPError: HTTP Error 503: Service Unavailable"
+			log("error", f"Error: Visiting extension URL '{extension_url}' resulted in a {http_err.code} HTTP error ({http_err}), skipping this extension for now (it will be retried when the crawl is resumed).")
+			if crawl_state is not None:
+				crawl_state.mark_extension(extension_id, "pending", http_err.code) # (will be retried when the crawl is resumed)
+			metrics.inc("extensions_total", result="error")
+			time.sleep(args.sleep / 1000)
+			return False
+	except (OSError, http.client.HTTPException) as err: # (urllib.error.URLError, socket.timeout, ConnectionResetError, ... after HTTPClient has given up retrying)
+		log("error", f"Error: Visiting extension URL '{extension_url}' failed (network error: {err}), skipping this extension for now (it will be retried when the crawl is resumed).")
+		if crawl_state is not None:
+			crawl_state.mark_extension(extension_id, "pending") # (will be retried when the crawl is resumed)
+		metrics.inc("extensions_total", result="error")
+		time.sleep(args.sleep / 1000)
+		return False
+	# Sleep:
+	time.sleep(args.sleep / 1000)
+	return True
+
+
+
+class BoundedExecutor:
+	# Runs tasks on a pool of {max_workers} threads, but never has more than 2 tasks per worker queued up:
+	#   submit() blocks until a task has finished instead (so that iterating over 100,000s of extensions doesn't create 100,000s of futures).
+	# Exceptions raised by a task are re-raised in the calling thread (by submit() or join()), just like without any threads.
+	# on_result (optional) is called in the calling thread with the return value of each task.
+	# With max_workers=1, each task is simply run right away in the calling thread.
+
+	def __init__(self, max_workers, on_result=None):
+		self._executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+		self._max_pending = 2 * max_workers
+		self._pending_futures = set()
+		self._on_result = on_result
+
+	def submit(self, fn, *args):
+		if self._executor is None:
+			self._handle_result(fn(*args))
+			return
+		while len(self._pending_futures) >= self._max_pending:
+			self._wait(FIRST_COMPLETED)
+		self._pending_futures.add(self._executor.submit(fn, *args))
+
+	def join(self): # waits for all tasks to finish
+		self._wait(ALL_COMPLETED)
+
+	def pending(self): # = the no. of tasks submitted but not finished yet (as far as the calling thread knows)
+		return len(self._pending_futures)
+
+	def _wait(self, return_when):
+		done_futures, self._pending_futures = wait(self._pending_futures, return_when=return_when)
+		for future in done_futures:
+			self._handle_result(future.result())
+
+	def _handle_result(self, result):
+		if self._on_result is not None:
+			self._on_result(result)
+
+	def shutdown(self): # cancels all tasks that haven't started yet
+		if self._executor is not None:
+			self._executor.shutdown(wait=True, cancel_futures=True)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.shutdown()
+
+
+
+def download_crx(chrome_extension, args): # (may be called from a worker thread); returns "successful", "failed" or "skipped"
+	crx_file = os.path.join(args.crx_download, f"{chrome_extension.extension_id}.crx")
+	if args.no_re_download and (crx_manifest(args.crx_download).contains(chrome_extension.extension_id, crx_file) or already_downloaded_crx(crx_file)):
+		log("debug", f"Not downloading .CRX of extension with ID {chrome_extension.extension_id} as it appears to have already been downloaded.")
+		return "skipped" # DO NOT SLEEP WHEN NOT HAVING DOWNLOADED ANYTHING(!!!)
+	# Try download (graceful failure):
+	result = "failed"
+	try:
+		crx_file = chrome_extension.download_crx_to(crx_dest_folder=args.crx_download, user_agent=args.user_agent)
+		log("info", f"Success: Downloaded extension with ID {chrome_extension.extension_id} to: {crx_file}")
+		result = "successful"
+	except urllib.error.HTTPError as http_err:
+		log("error", f"Error: failed to download extension with ID {chrome_extension.extension_id} (HTTP error when visiting '{http_err.url}'): {http_err}")
+	except (AttributeError, ValueError) as err:
+		log("error", f"Error: failed to download extension with ID {chrome_extension.extension_id} (invalid download): {err}")
+	except (OSError, http.client.HTTPException) as err: # (after HTTPClient has given up retrying; the partial download is kept and will be resumed next time)
+		log("error", f"Error: failed to download extension with ID {chrome_extension.extension_id} (network error): {err}")
+	# Sleep:
+	time.sleep(args.sleep / 1000)
+	return result
+
+
+
+def already_downloaded_crx(crx_file): # for .CRX files downloaded before there was a crx_manifest.csv: True iff the file exists and is a complete CRX3 file
+	extension_id = os.path.basename(crx_file).removesuffix(".crx")
+	for path in [crx_file, crx_file.removesuffix(".crx") + ".CRX"]:
+		if os.path.isfile(path):
+			try:
+				validate_crx_file(path)
+			except ValueError as err:
+				print(f"Warning: '{path}' will be downloaded again: {err}", file=sys.stderr)
+				return False
+			crx_manifest(os.path.dirname(path)).add(extension_id, path)
+			return True
+	return False
+
+
+
+def read_csv_lines(csv_path, line_numbers): # returns the given lines (0 = first line, cf. ExtensionsColumnStore.line_numbers()) of a .CSV file in the given order, reading the file line by line
+	line_numbers = [int(line_number) for line_number in line_numbers]
+	wanted = set(line_numbers)
+	csv_lines = {} # line number -> line
+	with open(csv_path, "r") as csv_file:
+		for line_number, csv_line in enumerate(csv_file):
+			if line_number in wanted:
+				csv_lines[line_number] = csv_line
+	return [csv_lines[line_number] for line_number in line_numbers]
 
 
 
@@ -509,12 +2473,25 @@ def format_seconds_to_printable_time(no_of_seconds):
 		# a trick to convert seconds into HH:MM:SS format, see: https://stackoverflow.com/questions/1384406/convert-seconds-to-hhmmss-in-python
 		return time.strftime('%H:%M:%S', time.gmtime(no_of_seconds))
 	else:
-		return f"{no_of_seconds/(3600*24)} days"
+		return f"{no_of_seconds/(3600*24):.1f} days"
 
 
 
+@functools.lru_cache(maxsize=None) # (there are far fewer distinct combinations of languages than extensions)
+def split_languages(languages): # e.g. "en|de" -> ("en", "de")
+	return tuple(sys.intern(language) for language in languages.split("|"))
+
+
+
+@functools.lru_cache(maxsize=None) # (there are only ~40 distinct average ratings, e.g. "4.5")
+def parse_avg_rating(avg_rating): # e.g. "4.5" -> 4.5
+	return float(avg_rating)
+
+
+
+@functools.lru_cache(maxsize=None) # (there are only a few thousand distinct sizes)
 def parse_size(size_string): # turns strings like "7.59MiB", or "29.56KiB", or "149KiB" into the number of bytes that they represent/encode
-	m = re.search('([\\d\\.]+)([a-zA-Z]+)', size_string)
+	m = SIZE_PATTERN.search(size_string)
 	prefix, suffix = float(m.group(1)), m.group(2)
 	match suffix:
 		case "KiB":
@@ -526,6 +2503,16 @@ def parse_size(size_string): # turns strings like "7.59MiB", or "29.56KiB", or "
 		case _:
 			raise ValueError(f"'{suffix}' in '{size_string}' is not a valid unit.")
 
+SIZE_PATTERN = re.compile('([\\d\\.]+)([a-zA-Z]+)')
+
+
+
+@functools.lru_cache(maxsize=None) # (there are only a few thousand distinct dates)
+def parse_date(date_string): # turns strings like "August 9 2014" into the date's ordinal (cf. date.toordinal(), e.g. 735454), or None for ""
+	if date_string is None or date_string == "":
+		return None
+	return datetime.strptime(date_string, '%B %d %Y').toordinal() # cf. https://stackoverflow.com/questions/2265357/parse-date-string-and-change-format and https://docs.python.org/3/library/datetime.html#strftime-and-strptime-format-codes
+
 
 
 def main():
@@ -570,16 +2557,38 @@ def main():
 		but instead that the extensions will be chosen randomly from the *user base*, making more frequently used extensions much more likely to be chosen.
 		By default, the size of this random subset will be 100, use the --subset-size parameter to specify something else.
 		""")
+	group1.add_argument('--export-column-store', action='store_true',
+		help="""
+		In this mode, there won't be any crawling.
+		Instead, the .CSV file given will be converted into a column store (a folder of NumPy .npy files, one per column, cf. --column-store),
+		which can be loaded (memory-mapped) much faster than the .CSV file can be parsed.
+		""")
+	group1.add_argument('--import-column-store', action='store_true',
+		help="""
+		In this mode, there won't be any crawling.
+		Instead, the column store given by --column-store will be converted (back) into the .CSV file given by --csv-file (which must not exist yet or be empty).
+		""")
+	group1.add_argument('--merge-partitions', action='store_true',
+		help="""
+		In this mode, there won't be any crawling.
+		Instead, the partitions of a distributed crawl (cf. --node-count), e.g. ./extensions.node-0-of-4.csv to ./extensions.node-3-of-4.csv,
+		are merged into the .CSV file given by --csv-file (which must not exist yet or be empty), removing any duplicates.
+		Use the same --csv-file and --node-count as for the crawl.
+		""")
 	group1.add_argument('--query',
 		type=str,
 		help="""
-		Execute a Python syntax query on the .CSV file.
+		Execute a query on the .CSV file and print the result as .CSV lines.
+		Syntax: [select FIELD, ...] [where CONDITION] [order by FIELD [asc|desc]] [limit N]
+		where CONDITION compares fields (=, !=, <, <=, >, >=, contains) or checks for languages (langs has LANGUAGE), combined with and/or/not and parentheses.
+		Fields: extension_id, title, description, no_of_users, no_of_ratings, avg_rating, version_no, size, last_updated, no_of_languages, languages,
+		size_in_bytes, months_since_last_update.
 		Some example queries:
-		"set(lang for ext in extensions for lang in ext.langs())";
-		"[ext for ext in extensions if ext.no_of_languages == 2 and 'de' in ext.langs() and ('en' in ext.langs() or 'en-US' in ext.langs())]";
-		"[f'{ext.extension_id},{ext.title},{ext.no_of_users},{ext.languages}' for ext in extensions if ext.no_of_languages == 2 and 'de' in ext.langs() and ('en' in ext.langs() or 'en-US' in ext.langs())]";
-		"sorted([ext for ext in extensions if ext.no_of_languages == 2 and 'de' in ext.langs() and ('en' in ext.langs() or 'en-US' in ext.langs())], key=lambda ext: ext.no_of_users, reverse=True)";
-		"[f'{e.extension_id},{e.title},{e.no_of_users},{e.languages}' for e in sorted([ext for ext in extensions if ext.no_of_languages == 2 and 'de' in ext.langs() and ('en' in ext.langs() or 'en-US' in ext.langs())], key=lambda ext: ext.no_of_users, reverse=True)]"
+		"where no_of_languages = 2 and langs has de and (langs has en or langs has en-US)";
+		"select extension_id, title, no_of_users, languages where langs has de and langs has en and no_of_users > 10000 order by no_of_users desc";
+		"select extension_id, title, avg_rating where avg_rating >= 4.5 and no_of_ratings >= 100 order by no_of_ratings desc limit 20";
+		"select extension_id, title, last_updated where last_updated < 2015-01-01 and no_of_users > 100000";
+		"where title contains 'PDF' order by no_of_users desc limit 10"
 		""",
 		metavar='QUERY')
 
@@ -592,6 +2601,18 @@ def main():
 		""",
 		metavar='CSV_FILE')
 
+	parser.add_argument('--column-store',
+		type=str,
+		default='',
+		help="""
+		The path to the column store folder that is created from the .CSV file (--export-column-store) / converted into the .CSV file (--import-column-store).
+		Default: the path of the .CSV file with the suffix '.columns' instead of '.csv', e.g. ./extensions.columns
+		--stats, --query and --user-base-representative-subset use the column store at the default path if it's up to date (e.g. after --export-column-store),
+		otherwise they create a temporary one (deleted afterwards). Specify --column-store to have them create (and keep up to date) a column store there instead,
+		s.t. subsequent runs don't have to parse the .CSV file again.
+		""",
+		metavar='COLUMN_STORE_FOLDER')
+
 	parser.add_argument('--sitemap-xml',
 		type=str,
 		default='./sitemap.xml',
@@ -602,6 +2623,17 @@ def main():
 		""",
 		metavar='SITEMAP_XML')
 
+	parser.add_argument('--crawl-state',
+		type=str,
+		default='',
+		help="""
+		The path to the SQLite database in which the progress of --crawl is recorded (shard order, finished shards, pending/done/failed extensions),
+		so that an aborted crawl can be resumed exactly where it stopped by simply running the same command again.
+		Delete this file to start a fresh crawl in a new random order.
+		Default: the --csv-file path with ".csv" replaced by ".crawl_state.sqlite", e.g. ./extensions.crawl_state.sqlite
+		""",
+		metavar='CRAWL_STATE_FILE')
+
 	parser.add_argument('--crx-download',
 		type=str,
 		default='',
@@ -635,14 +2667,197 @@ def main():
 
 	parser.add_argument('--sleep',
 		type=int,
-		default=1000,
+		default=0,
 		help="""
-		The sleep time in milliseconds between processing/downloading each extension.
-		To avoid over-burdening the servers.
-		Default: 1000
+		An additional, fixed sleep time in milliseconds between processing/downloading each extension.
+		Usually not needed anymore, as the request rate to each server is limited by --rate-limit/--max-rate-limit instead.
+		Default: 0
 		""",
 		metavar='SLEEP_IN_MILLIS')
 
+	parser.add_argument('--rate-limit',
+		type=float,
+		default=DEFAULT_RATE_LIMIT,
+		help=f"""
+		The initial maximum no. of requests per second to each server (shared by all workers).
+		To avoid over-burdening the servers, the rate is halved whenever a server responds with HTTP 429 (Too Many Requests) or 5xx
+		(and all requests are paused for as long as a "Retry-After" header asks for), and only increased again slowly
+		(up to --max-rate-limit) while the server keeps responding normally.
+		Default: {DEFAULT_RATE_LIMIT}
+		""",
+		metavar='REQUESTS_PER_SECOND')
+
+	parser.add_argument('--max-rate-limit',
+		type=float,
+		default=DEFAULT_MAX_RATE_LIMIT,
+		help=f"""
+		The no. of requests per second to each server that the adaptive rate limit (cf. --rate-limit) will never exceed.
+		Default: {DEFAULT_MAX_RATE_LIMIT}
+		""",
+		metavar='REQUESTS_PER_SECOND')
+
+	parser.add_argument('--max-retries',
+		type=int,
+		default=DEFAULT_MAX_RETRIES,
+		help=f"""
+		How often a request failing with HTTP 429/5xx or a network error (e.g. a timeout) is retried (with exponential backoff) before giving up.
+		Default: {DEFAULT_MAX_RETRIES}
+		""",
+		metavar='MAX_RETRIES')
+
+	parser.add_argument('--max-consecutive-failures',
+		type=int,
+		default=20,
+		help="""
+		With --crawl, an extension that can't be crawled because of an error (HTTP 429/5xx or a network error, even after --max-retries retries)
+		is skipped and retried when the crawl is resumed. Only when this many extensions in a row fail, the crawl is aborted. 0 = never abort.
+		Default: 20
+		""",
+		metavar='MAX_FAILURES')
+
+	parser.add_argument('--workers',
+		type=int,
+		default=1,
+		help="""
+		The no. of extensions to crawl concurrently (only has an effect in combination with --crawl or --download-crxs).
+		With more than 1 worker, the extension pages, the .CRX files and the next shards of the sitemap are all downloaded concurrently.
+		Note that --sleep then applies to each worker individually.
+		Default: 1
+		""",
+		metavar='NO_OF_WORKERS')
+
+	parser.add_argument('--parse-workers',
+		type=int,
+		default=0,
+		help="""
+		Use in combination with --crawl to parse the downloaded extension pages and shards in this many worker processes
+		(e.g. the no. of CPU cores), instead of in the --workers threads that download them.
+		Only worthwhile with a high --rate-limit and many --workers, when parsing (which is CPU-bound and, in a single process, limited to a single core)
+		becomes the bottleneck. The no. of pages in memory at once is still bounded by --workers.
+		Default: 0 (= no worker processes)
+		""")
+
+	parser.add_argument('--node-count',
+		type=int,
+		default=1,
+		help="""
+		Use in combination with --crawl to split a crawl between several nodes (machines, each e.g. with its own IP address and rate limits),
+		running the same command with the same --csv-file and sitemap.xml but a different --node-index each.
+		The shards are assigned to the nodes by a hash of their URL, i.e., without any coordination between the nodes.
+		Each node writes its own partition of the --csv-file (e.g. ./extensions.node-2-of-4.csv) and its own --crawl-state (progress journal),
+		and can be stopped and resumed independently. Use --merge-partitions once all nodes are done.
+		Default: 1
+		""")
+
+	parser.add_argument('--node-index',
+		type=int,
+		default=0,
+		help="""
+		The index of this node, from 0 to --node-count - 1.
+		Default: 0
+		""")
+
+	parser.add_argument('--partition-by',
+		choices=['shards', 'extensions'],
+		default='shards',
+		help="""
+		'shards': each node downloads only its own shards and crawls all extensions listed in them
+		(an extension that's listed in the shards of more than one node is crawled by each of them, --merge-partitions removes these duplicates).
+		'extensions': each node downloads all shards but only crawls the extensions assigned to it (by a hash of their ID),
+		i.e., no extension page is ever downloaded by more than one node.
+		Default: shards
+		""")
+
+	parser.add_argument('--dead-nodes',
+		type=int,
+		nargs='+',
+		default=[],
+		help="""
+		Use in combination with --node-count to take over the unfinished work of nodes that died (and won't be resumed):
+		their shards (or extensions) are reassigned evenly to the remaining nodes, which all have to be given the same --dead-nodes.
+		What the dead nodes have already finished is not crawled again, provided their crawl state files are found next to this node's
+		(e.g. ./extensions.node-2-of-4.crawl_state.sqlite; copy them over from the dead nodes, or use a shared folder).
+		""",
+		metavar='NODE_INDEX')
+
+	parser.add_argument('--refresh',
+		action='store_true',
+		help="""
+		Use in combination with --crawl to re-crawl the extensions that are already listed in the --csv-file as well (e.g. weekly, to track the user counts),
+		instead of skipping them. The lines of changed extensions are updated in place, new extensions are added.
+		Only what has changed is downloaded again: sitemap.xml, the shards and the extension pages are all requested conditionally
+		(using the ETag/Last-Modified of the previous crawl, recorded in the --crawl-state), so unchanged pages are answered with "304 Not Modified" and no body,
+		and shards whose <lastmod> in sitemap.xml hasn't changed aren't requested at all.
+		An interrupted refresh is resumed by running the same command again; once it is complete, the next --refresh starts over.
+		""")
+
+	parser.add_argument('--fsync',
+		action='store_true',
+		help=f"""
+		With --crawl, the crawled extensions are written to the --csv-file in batches
+		(of at most {CSV_FLUSH_EVERY} extensions, at least every {CSV_FLUSH_INTERVAL_IN_SECONDS:g} seconds).
+		Set this flag to also fsync the --csv-file after each batch, s.t. a crawl can even be resumed safely after a power failure or an OS crash
+		(otherwise, only a crash or kill of the crawler itself is safe). Slightly slower.
+		""")
+
+	parser.add_argument('--log-level',
+		choices=list(LOG_LEVELS),
+		default='info',
+		help="""
+		Only print messages of this level or above: 'debug' also prints a line for every extension page downloaded,
+		'warning' only prints warnings and errors (e.g. fields that couldn't be extracted from a page, failed downloads, retries).
+		Default: info
+		""")
+
+	parser.add_argument('--metrics-file',
+		type=str,
+		default='',
+		help="""
+		Use in combination with --crawl (or --download-crxs) to periodically write metrics of the running crawl to this file
+		(or to stderr when set to "-"): requests and responses per status code, retries, network errors, fetch latencies and sizes
+		per kind of download (sitemap, shard, detail_page, crx), parse times, field extraction failures, queue depths,
+		throughput and ETA. See --metrics-format.
+		""",
+		metavar='METRICS_FILE')
+
+	parser.add_argument('--metrics-format',
+		choices=['json', 'prometheus'],
+		default='json',
+		help="""
+		'json' appends one JSON object per report to the --metrics-file (one per line),
+		'prometheus' (atomically) replaces the --metrics-file with the current metrics in the Prometheus text exposition format
+		(e.g. for the textfile collector of the Prometheus node_exporter).
+		Default: json
+		""")
+
+	parser.add_argument('--metrics-interval',
+		type=float,
+		default=10.0,
+		help="""
+		How often (in seconds) the metrics are written to the --metrics-file. They are always written once more at the end of the crawl.
+		Default: 10
+		""",
+		metavar='SECONDS')
+
+	parser.add_argument('--max-connections-per-host',
+		type=int,
+		default=MAX_CONNECTIONS_PER_HOST,
+		help=f"""
+		The maximum no. of concurrent requests to the same host (e.g. chrome.google.com).
+		Only relevant in combination with --workers.
+		Default: {MAX_CONNECTIONS_PER_HOST}
+		""",
+		metavar='MAX_CONNECTIONS')
+
+	parser.add_argument('--timeout',
+		type=float,
+		default=DEFAULT_TIMEOUT_IN_SECONDS,
+		help=f"""
+		The timeout in seconds for connecting to a server and for each read from a connection.
+		Default: {DEFAULT_TIMEOUT_IN_SECONDS}
+		""",
+		metavar='TIMEOUT_IN_SECONDS')
+
 	parser.add_argument('--user-agent',
 		type=str,
 		default='',
@@ -662,16 +2877,64 @@ def main():
 		""",
 		metavar='SUBSET_SIZE')
 
+	parser.add_argument('--no-of-subsets',
+		type=int,
+		default=1,
+		help="""
+		The no. of independent random subsets to be selected (each into its own .CSV file), all in a single pass over the .CSV file.
+		Only has an effect when used in the --random-subset mode.
+		Default: 1
+		""",
+		metavar='NO_OF_SUBSETS')
+
+	parser.add_argument('--stratify-by-users', action='store_true',
+		help="""
+		Only has an effect when used in the --random-subset mode.
+		Select --subset-size random extensions from each bin of no. of users (<10 users, <100 users, <1000 users, ...) instead of from all extensions,
+		s.t. rarely and frequently used extensions are equally represented in the subset.
+		""")
+
+	parser.add_argument('--seed',
+		type=int,
+		default=None,
+		help="""
+		The seed of the random number generator used to select the subset, s.t. the same subset can be selected again.
+		Only has an effect when used in the --random-subset mode or --user-base-representative-subset mode.
+		Default: a random seed (which is printed at the end)
+		""",
+		metavar='SEED')
+
 	parser.add_argument("--no-re-download", action='store_true',
 		help="""
 		Only has an effect in combination with --download-crxs.
-		No download will be attempted if a file named '{EXTENSION_ID}.crx' already exists in the destination folder
-		specified by --crx-download. Use this flag to continue aborted downloads.
+		No download will be attempted if '{EXTENSION_ID}.crx' has already been downloaded completely into the destination folder
+		specified by --crx-download (i.e., it is listed in 'crx_manifest.csv' there, or it's a valid CRX3 file).
+		Truncated .CRX files are downloaded again, interrupted downloads ('{EXTENSION_ID}.crx.part') are resumed.
+		Use this flag to continue aborted downloads.
 		""")
 
 	args = parser.parse_args()
 
-	if args.crawl:
+	http_client.max_connections_per_host = args.max_connections_per_host
+	http_client.timeout = args.timeout
+	http_client.rate_limit = args.rate_limit
+	http_client.max_rate_limit = args.max_rate_limit
+	http_client.max_retries = args.max_retries
+	global log_level
+	log_level = LOG_LEVELS[args.log_level]
+
+	if (args.crawl or args.merge_partitions) and not (args.node_count >= 1 and 0 <= args.node_index < args.node_count):
+		print(f"Argument Error: --node-index must be between 0 and --node-count - 1 ({args.node_count - 1})!", file=sys.stderr)
+
+	elif args.crawl and not all(0 <= dead_node < args.node_count and dead_node != args.node_index for dead_node in args.dead_nodes):
+		print(f"Argument Error: --dead-nodes must be between 0 and --node-count - 1 ({args.node_count - 1}) and must not include this node's --node-index ({args.node_index})!", file=sys.stderr)
+
+	elif args.crawl:
+		# With --node-count > 1, this node only writes its own partition of the .CSV file (and has its own crawl state, i.e., progress journal):
+		all_nodes_csv_file = args.csv_file # e.g. "./extensions.csv"
+		if args.node_count > 1:
+			args.csv_file = partition_csv_path(args.csv_file, args.node_index, args.node_count) # e.g. "./extensions.node-2-of-4.csv"
+
 		# ##### ##### ##### ##### Step 1: ##### ##### ##### ####
 		# Download https://chrome.google.com/webstore/sitemap
 		#   and save as './sitemap.xml' (or some other user-specified name, cf. --sitemap-xml argument) if that hasn't been done already.
@@ -682,33 +2945,63 @@ def main():
 			print(f"No sitemap.xml found under '{args.sitemap_xml}', downloading it...")
 			download_sitemap_xml_file(sitemap_xml_file, user_agent=args.user_agent)
 			print("sitemap.xml has been downloaded and saved.")
+		elif args.refresh:
+			log("info", "sitemap.xml file found, checking whether it has changed...")
+			refresh_sitemap_xml_file(sitemap_xml_file, user_agent=args.user_agent)
 		else:
-			print("sitemap.xml file found, reading it in...")
-		# Read in './sitemap.xml':
-		sitemap_xml_content = ""
-		with open(sitemap_xml_file, 'r') as f:
-			sitemap_xml_content = f.read()
-		print("sitemap.xml has been read in.")
-		print(f"Content of sitemap.xml reads: {sitemap_xml_content[:10]} ... {sitemap_xml_content[-10:]}")
-		# Parse './sitemap.xml':
-		xml_root = ET.parse(sitemap_xml_file).getroot() # https://stackoverflow.com/questions/1912434/how-to-parse-xml-and-get-instances-of-a-particular-node-attribute
-		print(f"Parsed content of sitemap.xml: {xml_root}")
-		print(f"Collecting URLs from sitemap.xml...")
-		urls = []
-		for xml_el in xml_root.iter(): # https://docs.python.org/3/library/xml.etree.elementtree.html#xml.etree.ElementTree.XML
-			# print(xml_el) # print(xml_el.tag) # print(xml_el.text)
-			if xml_el.tag.endswith("loc"):
-				# print(xml_el.text)
-				url = xml_el.text # e.g. "https://chrome.google.com/webstore/sitemap?shard=42"
-				if "&hl=" not in url: # Ignore all URLs with a "&hl=..." language specifier!
-					urls.append(url)
-		print(f"Collected {len(urls)} URLs from sitemap.xml.")
-		# Remove duplicates:
-		urls = list(set(urls))
-		print(f"  => {len(urls)} URLs left after removing duplicates.")
+			log("info", "sitemap.xml file found, reading it in...")
+		# Parse './sitemap.xml' (as a stream, without reading the entire file into memory first):
+		log("info", f"Collecting URLs from sitemap.xml...")
+		lastmods = {} # maps each URL to its <lastmod> (or None), e.g. <sitemap><loc>https://chrome.google.com/webstore/sitemap?shard=42</loc><lastmod>2023-08-01</lastmod></sitemap>
+		no_of_urls_collected = 0
+		for event, xml_el in ET.iterparse(sitemap_xml_file, events=("end",)): # https://docs.python.org/3/library/xml.etree.elementtree.html#xml.etree.ElementTree.iterparse
+			if xml_el.tag.endswith("}sitemap") or xml_el.tag == "sitemap":
+				url = next((child.text for child in xml_el if child.tag.endswith("loc")), None) # e.g. "https://chrome.google.com/webstore/sitemap?shard=42"
+				lastmod = next((child.text for child in xml_el if child.tag.endswith("lastmod")), None)
+				if url is not None and "&hl=" not in url: # Ignore all URLs with a "&hl=..." language specifier!
+					lastmods[url] = lastmod # (a dict instead of a list to remove duplicates right away)
+					no_of_urls_collected += 1
+				xml_el.clear()
+		log("info", f"Collected {no_of_urls_collected} URLs from sitemap.xml.")
+		urls = list(lastmods)
+		log("info", f"  => {len(urls)} URLs left after removing duplicates.")
 		# Shuffle URLs:
 		random.shuffle(urls)
-		print(f"Shuffled URLs, beginning with '{urls[0]}' ...")
+		log("info", f"Shuffled URLs, beginning with '{urls[0]}' ...")
+		# With --node-count > 1, only keep the shards assigned to this node (including those reassigned to it from the --dead-nodes):
+		dead_nodes = set(args.dead_nodes)
+		finished_shards_of_dead_nodes, finished_extension_ids_of_dead_nodes = set(), set() # (whatever a dead node has already finished doesn't have to be crawled again)
+		for dead_node in sorted(dead_nodes):
+			dead_node_crawl_state_path = partition_csv_path(all_nodes_csv_file, dead_node, args.node_count).removesuffix(".csv") + ".crawl_state.sqlite"
+			if Path(dead_node_crawl_state_path).is_file():
+				dead_node_crawl_state = CrawlState(dead_node_crawl_state_path)
+				finished_shards_of_dead_nodes |= dead_node_crawl_state.finished_shards()
+				finished_extension_ids_of_dead_nodes |= dead_node_crawl_state.finished_extension_ids()
+				dead_node_crawl_state.close()
+				log("info", f"Taking over the unfinished work of dead node {dead_node} (crawl state: '{dead_node_crawl_state_path}') ...")
+			else:
+				log("warning", f"Warning: the crawl state of dead node {dead_node} ('{dead_node_crawl_state_path}') doesn't exist, all of its work will be done again (the duplicates are removed by --merge-partitions).")
+		def assigned_to_this_node(key): # key = a shard URL or an extension ID
+			return partition_node(key, args.node_count, dead_nodes) == args.node_index
+		if args.node_count > 1:
+			if args.partition_by == "shards":
+				urls = [url for url in urls if assigned_to_this_node(url) and url not in finished_shards_of_dead_nodes]
+			log("info", f"  => {len(urls)} URLs to be crawled by node {args.node_index} (of {args.node_count}, partitioned by {args.partition_by}{f', taking over from dead nodes {sorted(dead_nodes)}' if len(dead_nodes) > 0 else ''}).")
+		# When resuming a previous crawl, keep the order of that crawl instead:
+		crawl_state = CrawlState(args.crawl_state if args.crawl_state != "" else args.csv_file.removesuffix(".csv") + ".crawl_state.sqlite")
+		if args.refresh:
+			crawl_state.mark_completed_shards()
+			if crawl_state.start_refresh():
+				log("info", "Refreshing all extensions crawled so far (using conditional requests) ...")
+			else:
+				log("info", f"The previous crawl hasn't been completed yet, resuming it (refreshing the extensions that are already in '{args.csv_file}') ...")
+		if args.node_count > 1 and args.partition_by == "extensions" and crawl_state.start_take_over(dead_nodes):
+			log("info", f"Downloading all shards again to find the extensions reassigned to node {args.node_index} ...")
+		urls = crawl_state.shard_order(urls)
+		crawl_state.mark_completed_shards()
+		print(f"Crawl state ('{crawl_state.path}'): {crawl_state.summary()}")
+		urls = [url for url in urls if crawl_state.shard_status(url) != "done"]
+		log("info", f"  => {len(urls)} shard URLs left to crawl, beginning with '{urls[0] if len(urls) > 0 else None}' ...")
 
 		# ##### ##### ##### ##### Step 2: ##### ##### ##### ####
 		# Visit each URL listed in './sitemap.xml'.
@@ -718,83 +3011,88 @@ def main():
 		#      => If the --crx-download flag is set, try to download each extension as a .CRX file as well. Should this fail, don't abort but simply skip (and display an error message!).
 		# (!!!) Note that each of the two "for each" above is done in random(!) order (!!!)
 		# ##### ##### ##### #### ##### ##### ##### ##### ####	
-		extensions_csv = ExtensionsCSV(args.csv_file) # default: "./extensions.csv"
-		start_time = time.time()
-		for i in range(len(urls)):
-			# Print progress info:
-			seconds_passed_so_far = int(time.time() - start_time)
-			formatted_time_passed_so_far = format_seconds_to_printable_time(seconds_passed_so_far)
-			formatted_estimated_time_remaining = ""
-			if i > 0: # (to avoid division by zero)
-				avg_no_of_seconds_spent_per_url = seconds_passed_so_far//i
-				estimated_no_of_seconds_remaining = (len(urls)-i) * avg_no_of_seconds_spent_per_url # estimated time remaining = #URLs left * avg(time/URL)
-				formatted_estimated_time_remaining = format_seconds_to_printable_time(estimated_no_of_seconds_remaining)
+		extensions_csv = ExtensionsCSV(args.csv_file, fsync=args.fsync) # default: "./extensions.csv"
+		# With --workers > 1, the extensions (and the .CRX files) are downloaded concurrently by a pool of worker threads,
+		#   while the next shards are already being downloaded in the background (the no. of concurrent requests per host is capped by --max-connections-per-host).
+		# With --workers 1 (the default), everything is done one after another, exactly as before.
+		# With --parse-workers > 0, the pages are parsed by a pool of worker processes instead, while the worker threads only do the I/O
+		#   (each worker thread waits for the page it has downloaded to be parsed, i.e., there are never more than --workers pages in memory):
+		#   download (--workers threads) => parse (--parse-workers processes) => write (ExtensionsCSV, batched by a single thread).
+		# An extension that can't be crawled because of an error (even after --max-retries) is skipped for now (and retried when the crawl is resumed),
+		#   but if that happens to --max-consecutive-failures extensions in a row, something is wrong (e.g. the network is down or we've been blocked), so give up:
+		consecutive_failures = 0
+		def count_consecutive_failures(succeeded): # (called in this thread, cf. BoundedExecutor)
+			nonlocal consecutive_failures
+			consecutive_failures = 0 if succeeded else consecutive_failures + 1
+			if args.max_consecutive_failures > 0 and consecutive_failures >= args.max_consecutive_failures:
+				sys.exit(f"Error: {consecutive_failures} extensions in a row couldn't be crawled, aborting the crawl (run the same command again to resume it).")
+		extension_executor = BoundedExecutor(args.workers, on_result=count_consecutive_failures)
+		shard_executor = ThreadPoolExecutor(max_workers=NO_OF_SHARDS_TO_PREFETCH) if args.workers > 1 else None
+		parse_pool = ProcessPoolExecutor(max_workers=args.parse_workers, initializer=init_parse_worker, initargs=(log_level,)) if args.parse_workers > 0 else None
+		submitted_extension_ids = set() # so that no extension is crawled twice when it's listed in more than one shard
+		def submit_extension(extension_url, languages): # e.g. "https://chrome.google.com/webstore/detail/extension-name-here/abcdefghijklmnopqrstuvwxyzabcdef", ["en-US", "de"]
+			extension_id = extension_id_from_url(extension_url)
+			chrome_extension = ChromeExtension(extension_id=extension_id, no_of_languages=len(languages), languages="|".join(languages))
+			if extension_id in submitted_extension_ids or (not args.refresh and chrome_extension.already_listed_in_extensions_csv(extensions_csv)):
+				log("debug", f"Extension with ID {extension_id} is already in '{args.csv_file}', skipping it...")
+				if extension_id not in submitted_extension_ids:
+					crawl_state.mark_extension(extension_id, "done")
 			else:
-				formatted_estimated_time_remaining = "???"
-			print_progress(i, len(urls), "URLs", f"({formatted_time_passed_so_far} passed so far; estimated time remaining: {formatted_estimated_time_remaining})")
-
-			url = urls[i]
-			print(f"(#{i+1}) Downloading '{url}' ...") # e.g. "https://chrome.google.com/webstore/sitemap?shard=573"
-			temp_dest_file = "./." + url.split("=")[-1] + ".xml" # e.g. "./.573.xml"
-			download_file(file_url=url, destination_file=temp_dest_file, user_agent=args.user_agent)
-			print(f"Downloaded '{url}' to: {temp_dest_file}")
-			# Parse XML:
-			xml_root = ET.parse(temp_dest_file).getroot() # https://stackoverflow.com/questions/1912434/how-to-parse-xml-and-get-instances-of-a-particular-node-attribute
-			print(f"Parsed content of .xml file: {xml_root}")
-			print(f"Collecting extension URLs from .xml ...")
-			extension_urls = []
-			extension_languages = defaultdict(list) # maps each extension URL to the list of supported languages
-			for xml_el in xml_root.iter(): # https://docs.python.org/3/library/xml.etree.elementtree.html#xml.etree.ElementTree.XML
-				#print(xml_el.tag) # print(xml_el) # print(xml_el.tag) # print(xml_el.text)
-				# e.g. <xhtml:link href="https://chrome.google.com/webstore/detail/extension-name-here/abcdefghijklmnopqrstuvwxyzabcdef" hreflang="en-US" rel="alternate"/>
-				if xml_el.tag.endswith("link"):
-					# print("href attribute = " + xml_el.attrib["href"])
-					extension_url = xml_el.attrib["href"] # e.g. "https://chrome.google.com/webstore/detail/extension-name-here/abcdefghijklmnopqrstuvwxyzabcdef"
-					extension_urls.append(extension_url)
-					extension_languages[extension_url].append(xml_el.attrib["hreflang"]) # keeps track of all languages supported by each extension
-			# Delete temporary .XML file again:
-			if not KEEP_TEMP_XML_FILES:
-				os.remove(temp_dest_file)
-			print(f"Collected {len(extension_urls)} extension URLs from '{url}'")
-			# Remove duplicates:
-			extension_urls = list(set(extension_urls))
-			print(f"  => {len(extension_urls)} extension URLs left after removing duplicates.")
-			# Shuffle extension URLs:
-			random.shuffle(extension_urls)
-			print(f"Shuffled extension URLs, beginning with '{extension_urls[0]}' ...")
-			for extension_url in extension_urls: # e.g. "https://chrome.google.com/webstore/detail/extension-name-here/abcdefghijklmnopqrstuvwxyzabcdef"
-				extension_id = [url_el for url_el in extension_url.split("/") if url_el != ""][-1] # list comprehension just in case there should ever be a trailing slash "/"
-				chrome_extension = ChromeExtension(extension_id=extension_id, no_of_languages=len(extension_languages[extension_url]), languages="|".join(extension_languages[extension_url]))
-				if chrome_extension.already_listed_in_extensions_csv(extensions_csv):
-					print(f"Extension with ID {extension_id} is already in '{args.csv_file}', skipping it...")
+				submitted_extension_ids.add(extension_id)
+				extension_executor.submit(crawl_extension, chrome_extension, extension_url, extensions_csv, args, crawl_state, parse_pool) # (re-raises any exception that occurred in a worker thread)
+		start_time = time.time()
+		# The ETA is based on the (exponentially smoothed) no. of extensions crawled per second and the estimated no. of extensions left:
+		estimated_remaining_extensions = crawl_state.estimated_remaining_extensions() # (updated once per shard, the database query is too expensive for every metrics report)
+		metrics.set("throughput_extensions_per_second", metrics.throughput.rate)
+		metrics.set("eta_seconds", lambda: metrics.throughput.eta(estimated_remaining_extensions) or 0)
+		metrics.set("remaining_extensions_estimate", lambda: estimated_remaining_extensions)
+		metrics.set("queue_depth", extension_executor.pending, queue="extensions")
+		metrics_reporter = MetricsReporter(metrics, args.metrics_file, args.metrics_format, args.metrics_interval).start() if args.metrics_file != "" else None
+		try:
+			for i, url, xml_content, validators in iterate_shards(urls, user_agent=args.user_agent, executor=shard_executor, crawl_state=crawl_state, lastmods=lastmods):
+				# Log progress info:
+				crawl_state.mark_completed_shards()
+				estimated_remaining_extensions = crawl_state.estimated_remaining_extensions()
+				rate, eta = metrics.throughput.rate(), metrics.throughput.eta(estimated_remaining_extensions)
+				log("info", f"[{i}/{len(urls)} shards] {format_seconds_to_printable_time(int(time.time() - start_time))} passed so far | "
+					+ (f"{rate:.2f} extensions/s | ~{estimated_remaining_extensions:,} extensions left | estimated time remaining: {format_seconds_to_printable_time(int(eta)) if eta is not None else '???'}" if rate is not None else "measuring throughput ...")
+					+ f" | rate limits: {http_client.rate_summary()}")
+				log("info", f"(#{i+1}) Crawling the extensions listed in '{url}' ...")
+
+				if xml_content is not None:
+					# Stream the extensions of this shard into the frontier and into the extension executor at the same time, FRONTIER_BATCH_SIZE extensions at a time,
+					#   i.e., the first extensions are already being crawled while the rest of the shard is still being parsed (the executor's backpressure pauses the parsing);
+					#   only once all of them are in the frontier is the shard marked as 'downloaded' (and never downloaded again).
+					# (With --parse-workers, the shard is parsed as a whole in a worker process, as the result has to be pickled back anyway.)
+					shard_extensions = iter(parse_pool.submit(list_extensions_in_shard, xml_content).result() if parse_pool is not None else iterate_extensions_in_shard(xml_content))
+					if args.node_count > 1: # (only the extensions assigned to this node, without those that a dead node has already finished)
+						shard_extensions = ((extension_url, languages) for extension_url, languages in shard_extensions
+							if (args.partition_by == "shards" or assigned_to_this_node(extension_id_from_url(extension_url))) and extension_id_from_url(extension_url) not in finished_extension_ids_of_dead_nodes)
+					while True:
+						batch = list(itertools.islice(shard_extensions, FRONTIER_BATCH_SIZE))
+						if len(batch) == 0:
+							break
+						for extension_url, languages in crawl_state.add_shard_extensions(url, batch):
+							submit_extension(extension_url, languages)
+					crawl_state.mark_shard_downloaded(url, validators, lastmods.get(url))
 				else:
-					try:
-						chrome_extension.download_info_from_url(extension_url=extension_url, user_agent=args.user_agent)
-						if args.crx_download != "":
-							if chrome_extension.no_of_users < args.crx_download_user_threshold_min:
-								print(f"Not downloading .CRX of extension with ID {extension_id} as it has too few users ({chrome_extension.no_of_users} < {args.crx_download_user_threshold_min}).")
-							elif chrome_extension.no_of_users > args.crx_download_user_threshold_max:
-								print(f"Not downloading .CRX of extension with ID {extension_id} as it has too many users ({chrome_extension.no_of_users} > {args.crx_download_user_threshold_max}).")
-							else:
-								try: # Graceful failure if .CRX download fails:
-									crx_file = chrome_extension.download_crx_to(crx_dest_folder=args.crx_download, user_agent=args.user_agent)
-									print(f"Download Success: Downloaded extension with ID {chrome_extension.extension_id} to: {crx_file}")
-								except urllib.error.HTTPError as http_err:
-									print(f"Error: failed to download extension with ID {chrome_extension.extension_id} (HTTP error when visiting '{http_err.url}'): {http_err}", file=sys.stderr)
-								except AttributeError as attr_err:
-									print(f"Error: failed to download extension with ID {chrome_extension.extension_id} (parse error): {attr_err}", file=sys.stderr)
-						chrome_extension.add_to_extensions_csv(extensions_csv=extensions_csv)
-					except urllib.error.HTTPError as http_err:
-						if http_err.code in [404, 301]:
-							# urllib.error.HTTPError: HTTP Error 404: Not Found
-							#   => e.g.: https://chrome.google.com/webstore/detail/shopping-saviour/jagmhbnfefommcdbkodbdbmklbagodcl
-							# urllib.error.HTTPError: HTTP Error 301: The HTTP server returned a redirect error that would lead to an infinite loop.
-							#   => e.g.: https://chrome.google.com/webstore/detail/%D9%83%D9%88%D8%AF-%D8%AE%D8%B5%D9%85-%D9%86%D8%B3%D9%8A%D9%85-%D9%84%D9%84%D9%88%D8%B1%D8%AF-%2510-%D9%84%D9%83/ngbejcbghammjgkmheipacdnkelaocco
-							print(f"Error: Visiting extension URL '{extension_url}' resulted in a {http_err.code} HTTP error ({http_err}), skipping this extension (it will not be added to the .CSV file).", file=sys.stderr)
-						else:
-							raise # re-throw any other HTTPError, e.g., a "urllib.error.HTTPError: HTTP Error 503: Service Unavailable"
-					# Sleep:
-					time.sleep(args.sleep / 1000)
+					log("info", f"Shard '{url}' has already been downloaded in a previous run (and hasn't changed since), resuming it...")
+					for extension_url, languages in crawl_state.pending_extensions(url):
+						submit_extension(extension_url, languages)
+			extension_executor.join()
+		finally:
+			extension_executor.shutdown()
+			if shard_executor is not None:
+				shard_executor.shutdown(wait=True, cancel_futures=True)
+			if parse_pool is not None:
+				parse_pool.shutdown(wait=True, cancel_futures=True)
+			extensions_csv.close() # (writes the last batch, only then are its extensions marked as 'done')
+			crawl_state.mark_completed_shards()
+			estimated_remaining_extensions = crawl_state.estimated_remaining_extensions() # (for the final metrics)
+			print(f"Crawl state ('{crawl_state.path}'): {crawl_state.summary()}")
+			crawl_state.close()
+			if metrics_reporter is not None:
+				metrics_reporter.stop() # (writes the final metrics)
 
 	elif args.stats:
 		# ##### ##### ##### ##### Step 3: ##### ##### ##### #####
@@ -812,7 +3110,7 @@ def main():
 		# (10.) Fun fact: Benford's Law (user counts)
 		# ##### ##### ##### ##### ##### ##### ##### ##### #####
 		extensions_csv = ExtensionsCSV(args.csv_file) # default: "./extensions.csv"
-		print(f"Generating statistics based on {len(extensions_csv.read())} crawled extensions...")
+		print(f"Generating statistics based on {len(extensions_csv.dataset(args.column_store))} crawled extensions...") # (the .CSV file is only parsed once, cf. ExtensionsCSV.dataset())
 		extensions_csv.plot_pdf_no_of_users() # (0.)
 		extensions_csv.plot_cum_distr_ext_size() # (1.)
 		extensions_csv.plot_cum_distr_time_since_last_update() # (2.)
@@ -835,77 +3133,87 @@ def main():
 			print(f"Argument Error: --download-crxs flag was specified but no destination folder with --crx-download!", file=sys.stderr)
 		else:
 			extensions_csv = ExtensionsCSV(args.csv_file) # default: "./extensions.csv"
-			extensions = extensions_csv.read()
-			count_download_successful = 0
-			count_download_failed = 0
-			count_download_skipped = 0
-			for chrome_extension in extensions:
-				if chrome_extension.no_of_users < args.crx_download_user_threshold_min:
-					print(f"Not downloading .CRX of extension with ID {chrome_extension.extension_id} as it has too few users ({chrome_extension.no_of_users} < {args.crx_download_user_threshold_min}).")
-					count_download_skipped += 1
-					# DO NOT SLEEP WHEN NOT HAVING DOWNLOADED ANYTHING(!!!)
-				elif chrome_extension.no_of_users > args.crx_download_user_threshold_max:
-					print(f"Not downloading .CRX of extension with ID {chrome_extension.extension_id} as it has too many users ({chrome_extension.no_of_users} > {args.crx_download_user_threshold_max}).")
-					count_download_skipped += 1
-					# DO NOT SLEEP WHEN NOT HAVING DOWNLOADED ANYTHING(!!!)
-				elif args.no_re_download and os.path.isfile(os.path.join(args.crx_download, f"{chrome_extension.extension_id}.crx")) or os.path.isfile(os.path.join(args.crx_download, f"{chrome_extension.extension_id}.CRX")):
-					print(f"Not downloading .CRX of extension with ID {chrome_extension.extension_id} as it appears to have already been downloaded.")
-					count_download_skipped += 1
-					# DO NOT SLEEP WHEN NOT HAVING DOWNLOADED ANYTHING(!!!)
-				else:
-					# Try download (graceful failure):
-					try:
-						crx_file = chrome_extension.download_crx_to(crx_dest_folder=args.crx_download, user_agent=args.user_agent)
-						print(f"Success: Downloaded extension with ID {chrome_extension.extension_id} to: {crx_file}")
-						count_download_successful += 1
-					except urllib.error.HTTPError as http_err:
-						print(f"Error: failed to download extension with ID {chrome_extension.extension_id} (HTTP error when visiting '{http_err.url}'): {http_err}", file=sys.stderr)
-						count_download_failed += 1
-					except AttributeError as attr_err:
-						print(f"Error: failed to download extension with ID {chrome_extension.extension_id} (parse error): {attr_err}", file=sys.stderr)
-						count_download_failed += 1
-					
-					# Sleep:
-					time.sleep(args.sleep / 1000)			
-			print(f"Finished. Total no. of extensions: {len(extensions)} | Downloaded successfully: {count_download_successful} | Download failed: {count_download_failed} | Ignored (too few/many users): {count_download_skipped}")
+			extensions = extensions_csv.iterate() # (streamed, s.t. only the extensions currently being downloaded are kept in memory)
+			counts = defaultdict(int) # "successful"/"failed"/"skipped" -> count
+			def count_result(result):
+				counts[result] += 1
+				metrics.inc("crx_downloads_total", result=result)
+			metrics_reporter = MetricsReporter(metrics, args.metrics_file, args.metrics_format, args.metrics_interval).start() if args.metrics_file != "" else None
+			# With --workers > 1, the .CRX files are downloaded concurrently (the no. of concurrent requests per host is capped by --max-connections-per-host):
+			with BoundedExecutor(args.workers, on_result=count_result) as executor:
+				metrics.set("queue_depth", executor.pending, queue="crx_downloads")
+				for chrome_extension in extensions:
+					if chrome_extension.no_of_users < args.crx_download_user_threshold_min:
+						log("debug", f"Not downloading .CRX of extension with ID {chrome_extension.extension_id} as it has too few users ({chrome_extension.no_of_users} < {args.crx_download_user_threshold_min}).")
+						counts["skipped"] += 1
+						# DO NOT SLEEP WHEN NOT HAVING DOWNLOADED ANYTHING(!!!)
+					elif chrome_extension.no_of_users > args.crx_download_user_threshold_max:
+						log("debug", f"Not downloading .CRX of extension with ID {chrome_extension.extension_id} as it has too many users ({chrome_extension.no_of_users} > {args.crx_download_user_threshold_max}).")
+						counts["skipped"] += 1
+						# DO NOT SLEEP WHEN NOT HAVING DOWNLOADED ANYTHING(!!!)
+					else:
+						executor.submit(download_crx, chrome_extension, args)
+				executor.join()
+			if metrics_reporter is not None:
+				metrics_reporter.stop() # (writes the final metrics)
+			print(f"Finished. Total no. of extensions: {sum(counts.values())} | Downloaded successfully: {counts['successful']} | Download failed: {counts['failed']} | Ignored (too few/many users or already downloaded): {counts['skipped']} | Rate limits: {http_client.rate_summary()}")
 
 	elif args.random_subset:
 		# Take the .CSV file, take a *random* subset of size --subset-size and put that into a *new* .CSV file:
 		
-		# Take a *random* subset of size --subset-size of the existing .CSV file:
-		extensions_csv = ExtensionsCSV(args.csv_file) # default: "./extensions.csv"
-		extensions = extensions_csv.read() # If this were [i+1 for i in range(100)] ...
-		extensions_sample = random.sample(extensions, args.subset_size) # ...then this would be: [67,  3, 47, 94, 30, 42, 23, 13, 72, 88] for args.subset_size=10 for example.
-		# => WARNING: np.random.choice() may generate duplicates !!!!! random.sample(), however, does not!
-		
-		# Choose a file name that does not exist yet: (otherwise, ExtensionsCSV(outfile) would be *appending* to an existing file! (as it's supposed to!))
-		outfile = args.csv_file.removesuffix(".csv") + f"_random_sample_{args.subset_size}.csv"
-		i = 2
-		while Path(outfile).is_file():
-			outfile = args.csv_file.removesuffix(".csv") + f"_random_sample_{args.subset_size}_no{i}.csv"
-			i += 1
-
-		# Create the *new* .CSV file:
-		out_extensions_csv = ExtensionsCSV(outfile)
-		for ext in extensions_sample:
-			out_extensions_csv.add(ext)
-		print(f"{outfile} now contains a random subset of {args.subset_size} extensions from {args.csv_file}")
+		# Take a *random* subset of size --subset-size of the existing .CSV file, in a single pass over the .CSV file (which is never loaded entirely),
+		#   using one ReservoirSampler per subset (--no-of-subsets) and, with --stratify-by-users, per user-count bin (<10 users, <100 users, ...):
+		seed = args.seed if args.seed is not None else random.randrange(2**32)
+		rng = random.Random(seed)
+		samplers = [{} for _ in range(args.no_of_subsets)] # = for each subset: stratum (e.g. 1000 for "<1,000 users", or None) -> ReservoirSampler
+		with open(args.csv_file, "r") as csv_file:
+			for csv_line in csv_file:
+				if not csv_line.endswith("\n"): # (torn last line)
+					break
+				extension = ChromeExtension.from_csv_line(csv_line) # (only to validate the line, the line itself is what ends up in the subset)
+				if extension is None:
+					print(f"Warning: ignoring malformed line in '{args.csv_file}': {csv_line[:50].rstrip()} ...", file=sys.stderr)
+					continue
+				stratum = user_count_stratum(extension.no_of_users) if args.stratify_by_users else None
+				for subset_samplers in samplers:
+					if stratum not in subset_samplers:
+						subset_samplers[stratum] = ReservoirSampler(args.subset_size, rng)
+					subset_samplers[stratum].add(csv_line)
+
+		for subset_samplers in samplers:
+			csv_lines = []
+			for stratum in sorted(subset_samplers, key=lambda stratum: stratum or 0):
+				sampler = subset_samplers[stratum]
+				if len(sampler.sample) < args.subset_size:
+					print(f"Warning: {args.csv_file} only contains {sampler.n} extensions{f' with <{stratum:,} users' if stratum is not None else ''}, all of which will be in the subset.", file=sys.stderr)
+				if stratum is not None:
+					print(f"\t=> {len(sampler.sample)} of the {sampler.n} extensions with <{stratum:,} users")
+				csv_lines += sampler.sample
+
+			# Choose a file name that does not exist yet:
+			outfile = args.csv_file.removesuffix(".csv") + f"_random_sample_{args.subset_size}.csv"
+			i = 2
+			while Path(outfile).is_file():
+				outfile = args.csv_file.removesuffix(".csv") + f"_random_sample_{args.subset_size}_no{i}.csv"
+				i += 1
+
+			# Create the *new* .CSV file (in one write):
+			with open(outfile, "w") as out_csv_file:
+				out_csv_file.writelines(csv_lines)
+			print(f"{outfile} now contains a random subset of {len(csv_lines)} extensions from {args.csv_file}{' (stratified by no. of users)' if args.stratify_by_users else ''} (seed: {seed})")
 
 	elif args.user_base_representative_subset:
 		# Take the .CSV file, take a *representative* subset of size --subset-size and put that into a *new* .CSV file:
 
-		# Take a *representative* subset of size --subset-size of the existing .CSV file:
+		# Take a *representative* subset of size --subset-size of the existing .CSV file,
+		#   i.e., sample extensions with probabilities proportional to their no. of users (without replacement, cf. weighted_sample_without_replacement()):
 		extensions_csv = ExtensionsCSV(args.csv_file) # default: "./extensions.csv"
-		extensions = extensions_csv.read()
-		# ...now make this set representative by repeating each extension N times where N is the no. of users of that extension:
-		extensions = [[ext] * ext.no_of_users for ext in extensions]
-		extensions = [x for xs in extensions for x in xs] # flattens the above list of lists, cf. https://stackoverflow.com/questions/952914/how-do-i-make-a-flat-list-out-of-a-list-of-lists
-		# ...now sample --subset-size extensions from this enlarged set of extensions; making sure no extension is selected twice:
-		extensions_sample = []
-		while len(extensions_sample) < args.subset_size:
-			ext = random.choice(extensions)
-			if ext.extension_id not in [e.extension_id for e in extensions_sample]:
-				extensions_sample.append(ext)
+		dataset = extensions_csv.dataset(args.column_store)
+		seed = args.seed if args.seed is not None else random.randrange(2**32)
+		sample_rows = weighted_sample_without_replacement(dataset.no_of_users, args.subset_size, np.random.default_rng(seed))
+		if len(sample_rows) < args.subset_size:
+			print(f"Warning: only {len(sample_rows)} extensions in {args.csv_file} have any users, the subset will only contain those.", file=sys.stderr)
+		csv_lines = read_csv_lines(args.csv_file, dataset.column_store.line_numbers()[sample_rows]) # (in the order in which they were sampled; the row numbers of the column store aren't line numbers, cf. ExtensionsColumnStore.from_csv())
 
 		# Choose a file name that does not exist yet: (otherwise, ExtensionsCSV(outfile) would be *appending* to an existing file! (as it's supposed to!))
 		outfile = args.csv_file.removesuffix(".csv") + f"_representative_sample_{args.subset_size}.csv"
@@ -914,23 +3222,68 @@ def main():
 			outfile = args.csv_file.removesuffix(".csv") + f"_representative_sample_{args.subset_size}_no{i}.csv"
 			i += 1
 
-		# Create the *new* .CSV file:
-		out_extensions_csv = ExtensionsCSV(outfile)
-		for ext in extensions_sample:
-			out_extensions_csv.add(ext)
-		print(f"{outfile} now contains a user-base-representative subset of {args.subset_size} extensions from {args.csv_file}")
+		# Create the *new* .CSV file (in one write):
+		with open(outfile, "w") as out_csv_file:
+			out_csv_file.writelines(csv_lines)
+		print(f"{outfile} now contains a user-base-representative subset of {len(csv_lines)} extensions from {args.csv_file} (seed: {seed})")
 
-	elif args.query != "":
-		extensions_csv = ExtensionsCSV(args.csv_file) # default: "./extensions.csv"
-		extensions = extensions_csv.read()
-		print(f"Executing query '{args.query}' on {len(extensions)} extensions from '{args.csv_file}' ...", file=sys.stderr) # print to stderr so user can pipe stdout into a .CSV output file
+	elif args.export_column_store:
+		column_store_path = args.column_store if args.column_store != "" else args.csv_file.removesuffix(".csv") + ".columns" # default: "./extensions.columns"
+		start_time = time.time()
+		column_store = ExtensionsColumnStore.from_csv(args.csv_file, column_store_path)
+		print(f"{column_store_path} now contains the {len(column_store)} extensions from {args.csv_file} (took {time.time()-start_time:.2f} seconds)")
 
-		query_result = eval(args.query) # e.g. "[ext for ext in extensions if ext.no_of_languages == 2 and 'de' in ext.langs() and ('en' in ext.langs() or 'en-US' in ext.langs())]"
-		print(f"Query returned {len(query_result)} results:", file=sys.stderr) # print to stderr so user can pipe stdout into a .CSV output file
-		print("\n".join(str(item) for item in query_result))
+	elif args.import_column_store:
+		column_store_path = args.column_store if args.column_store != "" else args.csv_file.removesuffix(".csv") + ".columns" # default: "./extensions.columns"
+		if Path(args.csv_file).is_file() and os.path.getsize(args.csv_file) > 0:
+			print(f"Argument Error: '{args.csv_file}' already exists and is not empty, please specify another --csv-file to import '{column_store_path}' into!", file=sys.stderr)
+		else:
+			column_store = ExtensionsColumnStore(column_store_path)
+			column_store.to_csv(args.csv_file)
+			print(f"{args.csv_file} now contains the {len(column_store)} extensions from {column_store_path}")
+
+	elif args.merge_partitions:
+		# Merge the partitions of a distributed crawl (--node-count) into a single .CSV file, keeping only the first line of each extension:
+		if args.node_count < 2:
+			print("Argument Error: --merge-partitions requires the --node-count of the crawl (at least 2)!", file=sys.stderr)
+		elif Path(args.csv_file).is_file() and os.path.getsize(args.csv_file) > 0:
+			print(f"Argument Error: '{args.csv_file}' already exists and is not empty, please specify another --csv-file to merge the partitions into!", file=sys.stderr)
+		else:
+			seen_extension_ids = set()
+			no_of_duplicates = 0
+			with open(args.csv_file, "wb") as outfile:
+				for node_index in range(args.node_count):
+					partition_path = partition_csv_path(args.csv_file, node_index, args.node_count) # e.g. "./extensions.node-2-of-4.csv"
+					if not Path(partition_path).is_file():
+						print(f"Warning: the partition of node {node_index} ('{partition_path}') doesn't exist, skipping it.", file=sys.stderr)
+						continue
+					with open(partition_path, "rb") as infile:
+						for csv_line in infile:
+							if not csv_line.endswith(b"\n"): # (a torn last line, cf. remove_torn_last_line())
+								continue
+							extension_id = csv_line.split(b",", 1)[0]
+							if extension_id in seen_extension_ids: # (an extension listed in the shards of several nodes, or crawled again after taking over from a dead node)
+								no_of_duplicates += 1
+							else:
+								seen_extension_ids.add(extension_id)
+								outfile.write(csv_line)
+			print(f"{args.csv_file} now contains the {len(seen_extension_ids)} extensions from the {args.node_count} partitions ({no_of_duplicates} duplicates removed)")
+
+	elif args.query != "":
+		try:
+			query = Query(args.query) # e.g. "select extension_id, title where langs has de and no_of_users > 10000 order by no_of_users desc"
+		except ValueError as err:
+			print(f"Query Error: {err}", file=sys.stderr)
+		else:
+			extensions_csv = ExtensionsCSV(args.csv_file) # default: "./extensions.csv"
+			dataset = extensions_csv.dataset(args.column_store)
+			print(f"Executing query '{args.query}' on {len(dataset)} extensions from '{args.csv_file}' ...", file=sys.stderr) # print to stderr so user can pipe stdout into a .CSV output file
+			rows = query.execute(dataset)
+			print(f"Query returned {len(rows)} results:", file=sys.stderr) # print to stderr so user can pipe stdout into a .CSV output file
+			sys.stdout.writelines(query.csv_lines(dataset, rows))
 
 	else:
-		print(f"Argument Error: Neither --crawl nor --stats nor --download-crxs nor --random-subset nor --user-base-representative-subset flag nor --query argument was specified!", file=sys.stderr)
+		print("Argument Error: Neither --crawl nor --stats nor --download-crxs nor --random-subset nor --user-base-representative-subset nor --merge-partitions flag nor --query argument was specified!", file=sys.stderr)
 
 
 
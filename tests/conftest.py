@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# (chrome_webstore_crawler.py is a single script, not an installed package)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
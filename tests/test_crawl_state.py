@@ -0,0 +1,26 @@
+from chrome_webstore_crawler import CrawlState
+
+SHARD_1 = "https://chrome.google.com/webstore/sitemap?shard=1"
+SHARD_2 = "https://chrome.google.com/webstore/sitemap?shard=2"
+
+
+def extension(extension_id, languages=("en",)):
+	return (f"https://chrome.google.com/webstore/detail/name/{extension_id}", list(languages))
+
+def test_shard_is_only_downloaded_after_all_of_its_extensions_have_been_added(tmp_path):
+	crawl_state = CrawlState(tmp_path / "crawl_state.sqlite")
+	crawl_state.shard_order([SHARD_1, SHARD_2])
+	assert crawl_state.add_shard_extensions(SHARD_1, [extension("a"), extension("b")]) == [extension("a"), extension("b")]
+	assert crawl_state.shard_status(SHARD_1) == "pending" # (a crawl that dies now downloads the shard again)
+	crawl_state.mark_extension("a", "done")
+
+	# The shard is downloaded again (e.g. after a restart): only the extensions that still need to be crawled are returned
+	assert crawl_state.add_shard_extensions(SHARD_1, [extension("b", ["de"]), extension("a"), extension("c")]) == [extension("b", ["de"]), extension("c")]
+	crawl_state.mark_shard_downloaded(SHARD_1, {"ETag": "\"123\""}, "2024-05-14")
+	assert crawl_state.shard_status(SHARD_1) == "downloaded"
+	assert crawl_state.shard_validators(SHARD_1) == ({"ETag": "\"123\""}, "2024-05-14")
+	assert crawl_state.pending_extensions(SHARD_1) == [extension("b", ["de"]), extension("c")]
+
+	# An extension listed in an earlier shard is crawled as part of that shard only:
+	assert crawl_state.add_shard_extensions(SHARD_2, [extension("c"), extension("d")]) == [extension("d")]
+	crawl_state.close()
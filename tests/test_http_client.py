@@ -0,0 +1,39 @@
+import http.client
+import socket
+import threading
+
+import pytest
+
+from chrome_webstore_crawler import HTTPClient
+
+
+@pytest.fixture
+def silent_server():
+	# A server that accepts connections and reads the requests, but never responds:
+	server = socket.create_server(("127.0.0.1", 0))
+	connections = []
+	def accept():
+		while True:
+			try:
+				connection, _ = server.accept()
+			except OSError: # (server closed)
+				return
+			connections.append(connection)
+	threading.Thread(target=accept, daemon=True).start()
+	yield server.getsockname()[1]
+	server.close()
+	for connection in connections:
+		connection.close()
+
+def test_connection_is_closed_and_discarded_after_a_timeout(silent_server):
+	client = HTTPClient(timeout=0.2, rate_limit=1000, max_rate_limit=1000, max_retries=0)
+	key = ("http", f"127.0.0.1:{silent_server}")
+	connection = http.client.HTTPConnection(key[1], timeout=0.2)
+	connection.connect()
+	client._idle_connections[key].append(connection) # (as if it had been used for a previous request)
+	with pytest.raises(TimeoutError):
+		client.get(f"http://127.0.0.1:{silent_server}/")
+	assert connection.sock is None # (closed)
+	assert client._idle_connections[key] == []
+	for _ in range(client.max_connections_per_host): # (the semaphore has been released)
+		assert client._semaphore(key).acquire(blocking=False)
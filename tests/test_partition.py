@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from chrome_webstore_crawler import partition_node, partition_csv_path
+
+SCRIPT = str(Path(__file__).resolve().parent.parent / "chrome_webstore_crawler.py")
+KEYS = [f"{i:032x}" for i in range(4000)] + [f"https://chrome.google.com/webstore/sitemap?shard={i}" for i in range(400)]
+
+
+def test_partition_node_is_stable():
+	# Every node has to compute the same assignment, in every process and with every Python version (i.e., no hash()):
+	assert [partition_node(key, 4) for key in ["a", "b", "c", "aapbdbdomjkkjkaonfhkkikfgjllcleb"]] == [0, 1, 3, 2]
+	assert all(partition_node(key, 4) == partition_node(key, 4, dead_nodes=()) for key in KEYS)
+
+def test_partition_node_is_in_range_and_spread_evenly():
+	counts = Counter(partition_node(key, 4) for key in KEYS)
+	assert set(counts) == {0, 1, 2, 3}
+	assert all(abs(count - len(KEYS) / 4) < len(KEYS) / 20 for count in counts.values())
+	assert all(partition_node(key, 1) == 0 for key in KEYS)
+
+def test_only_the_keys_of_dead_nodes_are_reassigned():
+	for dead_nodes in [{1}, {0, 2}, {0, 1, 3}]:
+		for key in KEYS:
+			node_index = partition_node(key, 4)
+			node_index_after = partition_node(key, 4, dead_nodes=dead_nodes)
+			if node_index in dead_nodes:
+				assert node_index_after not in dead_nodes
+			else:
+				assert node_index_after == node_index
+
+def test_keys_of_a_dead_node_are_spread_over_the_remaining_nodes():
+	keys_of_node_2 = [key for key in KEYS if partition_node(key, 4) == 2]
+	counts = Counter(partition_node(key, 4, dead_nodes={2}) for key in keys_of_node_2)
+	assert set(counts) == {0, 1, 3}
+	assert all(abs(count - len(keys_of_node_2) / 3) < len(keys_of_node_2) / 10 for count in counts.values())
+
+def test_partition_csv_path():
+	assert partition_csv_path("./extensions.csv", 2, 4) == "./extensions.node-2-of-4.csv"
+	assert partition_csv_path("/data/crawl", 0, 2) == "/data/crawl.node-0-of-2.csv"
+
+def test_merge_partitions(tmp_path):
+	csv_path = str(tmp_path / "extensions.csv")
+	Path(partition_csv_path(csv_path, 0, 3)).write_bytes(b"aaa,first\nbbb,first\n")
+	Path(partition_csv_path(csv_path, 1, 3)).write_bytes(b"ccc,first\naaa,duplicate\nddd,torn") # (no partition of node 2)
+	result = subprocess.run([sys.executable, SCRIPT, "--merge-partitions", "--node-count", "3", "--csv-file", csv_path], capture_output=True, text=True)
+	assert result.returncode == 0
+	assert "the partition of node 2" in result.stderr
+	assert "now contains the 3 extensions from the 3 partitions (1 duplicates removed)" in result.stdout
+	assert Path(csv_path).read_bytes() == b"aaa,first\nbbb,first\nccc,first\n"
+
+def test_merge_partitions_doesnt_overwrite_a_csv_file(tmp_path):
+	csv_path = tmp_path / "extensions.csv"
+	csv_path.write_bytes(b"zzz,existing\n")
+	result = subprocess.run([sys.executable, SCRIPT, "--merge-partitions", "--node-count", "2", "--csv-file", str(csv_path)], capture_output=True, text=True)
+	assert "already exists and is not empty" in result.stderr
+	assert csv_path.read_bytes() == b"zzz,existing\n"
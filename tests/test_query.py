@@ -0,0 +1,179 @@
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from chrome_webstore_crawler import Query, ExtensionsColumnStore, ExtensionsCSV
+
+SCRIPT = str(Path(__file__).resolve().parent.parent / "chrome_webstore_crawler.py")
+CSV_LINES = [ # extension_id, title, description, no_of_users, no_of_ratings, avg_rating, version_no, size, last_updated, no_of_languages, languages
+	"aaaa,Dark Mode,Dark mode for every website,5000,120,4.5,1.10,149KiB,August 9 2014,2,en|de\n",
+	"bbbb,Dark Reader,Another dark mode,123456,3400,4.7,1.1,7.59MiB,May 14 2024,3,de|fr|en\n",
+	"cccc,Translator,Translates pages,50,2,3.0,2.0,29.56KiB,March 1 2020,1,fr\n",
+	"007,Agent,A secret extension,0,0,0.0,1.0,,,0,\n",
+	"7,Seven,Lucky number,7,1,5.0,0.7,1KiB,January 31 2023,1,de\n",
+	"dddd,Tabs,Tab manager,5000,80,4.0,3.1,2MiB,May 14 2024,1,en\n",
+]
+
+
+def test_tokenize():
+	query = Query("select title where title = 'Dark Mode' and avg_rating >= 4.5 and no_of_users != -1")
+	assert query._tokens == [
+		("word", "select"), ("word", "title"), ("word", "where"),
+		("word", "title"), ("symbol", "="), ("string", "Dark Mode"), ("word", "and"),
+		("word", "avg_rating"), ("symbol", ">="), ("number", "4.5"), ("word", "and"),
+		("word", "no_of_users"), ("symbol", "!="), ("number", "-1"),
+	]
+
+def test_tokenize_words_with_dashes_and_double_quotes():
+	query = Query("where langs has en-US or title == \"a 'quoted' title\"")
+	assert ("word", "en-US") in query._tokens
+	assert ("symbol", "=") in query._tokens # (== is the same as =)
+	assert ("string", "a 'quoted' title") in query._tokens
+
+def test_empty_query_selects_everything():
+	query = Query("")
+	assert query.fields == list(ExtensionsColumnStore.COLUMNS)
+	assert query.condition is None
+	assert query.order_by is None
+	assert query.limit is None
+
+def test_select_star():
+	assert Query("select *").fields == list(ExtensionsColumnStore.COLUMNS)
+
+def test_full_query():
+	query = Query("select extension_id, title, no_of_users where langs has de and langs has en and no_of_users > 10000 order by no_of_users desc limit 10")
+	assert query.fields == ["extension_id", "title", "no_of_users"]
+	assert query.condition == ("and", ("and", ("has", "de"), ("has", "en")), ("compare", "no_of_users", ">", 10000))
+	assert query.order_by == "no_of_users"
+	assert query.descending
+	assert query.limit == 10
+
+def test_keywords_are_case_insensitive():
+	query = Query("SELECT title ORDER BY avg_rating ASC LIMIT 3")
+	assert query.fields == ["title"]
+	assert query.order_by == "avg_rating"
+	assert not query.descending
+	assert query.limit == 3
+
+def test_operator_precedence_and_parentheses():
+	assert Query("where langs has de or langs has en and not langs has fr").condition == \
+		("or", ("has", "de"), ("and", ("has", "en"), ("not", ("has", "fr"))))
+	assert Query("where (langs has de or langs has en) and langs has fr").condition == \
+		("and", ("or", ("has", "de"), ("has", "en")), ("has", "fr"))
+
+def test_contains_and_string_comparison():
+	assert Query("where title contains dark").condition == ("contains", "title", "dark")
+	assert Query("where extension_id = 42").condition == ("compare", "extension_id", "=", "42") # (non-numeric fields are compared as strings)
+
+def test_numbers_keep_their_text_for_string_fields():
+	assert Query("where version_no = 1.10").condition == ("compare", "version_no", "=", "1.10")
+	assert Query("where extension_id != 007").condition == ("compare", "extension_id", "!=", "007")
+	assert Query("where avg_rating = 4.50 or no_of_users = 007").condition == \
+		("or", ("compare", "avg_rating", "=", 4.5), ("compare", "no_of_users", "=", 7))
+	assert Query("where langs has 419").condition == ("has", "419")
+
+def test_dates():
+	ordinal = date(2014, 8, 9).toordinal()
+	assert Query("where last_updated >= 2014-08-09").condition == ("compare", "last_updated", ">=", ordinal)
+	assert Query("where last_updated < 'August 9 2014'").condition == ("compare", "last_updated", "<", ordinal)
+
+@pytest.mark.parametrize("query_string, error_message", [
+	("select title where title = 'unterminated", "unexpected character at: ''unterminated'"),
+	("where no_of_users > 10 ;", "unexpected character at: ';'"),
+	("select nonexistent", "unknown field 'nonexistent', expected one of: "),
+	("select title,", "unexpected end of query"),
+	("order no_of_users", "expected 'by', got: no_of_users"),
+	("order by", "unexpected end of query"),
+	("limit ten", "expected a no. of rows after 'limit', got 'ten'"),
+	("limit 2.5", "expected a no. of rows after 'limit', got '2.5'"),
+	("limit -1", "expected a no. of rows after 'limit', got '-1'"),
+	("limit 10 select title", "unexpected 'select'"),
+	("where (langs has de", "expected ')', got: end of query"),
+	("where langs de", "expected 'has', got: de"),
+	("where no_of_users 10", "expected a comparison (=, !=, <, <=, >, >=) or 'contains' after 'no_of_users', got '10'"),
+	("where no_of_users > )", "expected a value, got ')'"),
+	("where no_of_users > many", "'no_of_users' can only be compared to numbers, not to 'many'"),
+	("where title > a", "'title' can only be compared with = and != (or contains)"),
+	("where no_of_users contains 5", "'no_of_users' is a number, it can only be compared with =, !=, <, <=, > and >= (not with contains)"),
+	("where size_in_bytes contains 5", "'size_in_bytes' is a number, it can only be compared with =, !=, <, <=, > and >= (not with contains)"),
+	("where no_of_users > '5'", "'no_of_users' can only be compared to numbers, not to '5'"),
+])
+def test_malformed_queries(query_string, error_message):
+	with pytest.raises(ValueError) as exc_info:
+		Query(query_string)
+	assert str(exc_info.value).startswith(error_message)
+
+
+# ##### Execution: #####
+
+@pytest.fixture
+def dataset(tmp_path):
+	pytest.importorskip("numpy")
+	csv_path = tmp_path / "extensions.csv"
+	csv_path.write_text("".join(CSV_LINES))
+	return ExtensionsCSV(csv_path).dataset(tmp_path / "extensions.columns")
+
+def run_query(query_string, dataset):
+	query = Query(query_string)
+	return list(query.csv_lines(dataset, query.execute(dataset)))
+
+def test_select_star_returns_the_lines_of_the_csv_file(dataset):
+	assert run_query("", dataset) == CSV_LINES
+	assert run_query("select *", dataset) == CSV_LINES
+
+def test_select_fields(dataset):
+	assert run_query("select title, no_of_users, size_in_bytes where extension_id = cccc", dataset) == ["Translator,50,30269\n"]
+	assert run_query("select extension_id, size_in_bytes where size_in_bytes < 1025", dataset) == ["7,1024\n"] # (the unknown size of 007 is never < 1025)
+
+@pytest.mark.parametrize("query_string, extension_ids", [
+	("where no_of_users = 5000", ["aaaa", "dddd"]),
+	("where no_of_users > 5000", ["bbbb"]),
+	("where no_of_users >= 5000", ["aaaa", "bbbb", "dddd"]),
+	("where no_of_users < 50", ["007", "7"]),
+	("where no_of_users <= 50", ["cccc", "007", "7"]),
+	("where no_of_users != 5000", ["bbbb", "cccc", "007", "7"]),
+	("where avg_rating >= 4.5 and avg_rating < 5", ["aaaa", "bbbb"]),
+	("where no_of_ratings > 100", ["aaaa", "bbbb"]),
+	("where last_updated = 'May 14 2024'", ["bbbb", "dddd"]),
+	("where last_updated < 2020-03-02", ["aaaa", "cccc"]), # (not 007, which has no date)
+	("where last_updated != 2024-05-14", ["aaaa", "cccc", "7"]),
+])
+def test_range_queries(query_string, extension_ids, dataset):
+	assert run_query("select extension_id " + query_string, dataset) == [extension_id + "\n" for extension_id in extension_ids]
+
+def test_order_by(dataset):
+	assert run_query("select extension_id order by no_of_users desc", dataset) == ["bbbb\n", "dddd\n", "aaaa\n", "cccc\n", "7\n", "007\n"]
+	assert run_query("select extension_id order by no_of_users limit 2", dataset) == ["007\n", "7\n"]
+	assert run_query("select extension_id order by avg_rating desc limit 3", dataset) == ["7\n", "bbbb\n", "aaaa\n"]
+	assert run_query("select extension_id, size_in_bytes order by size_in_bytes desc limit 1", dataset) == ["007,\n"] # (unknown sizes last, i.e., first when descending)
+	assert run_query("select title order by title", dataset) == [title + "\n" for title in sorted(line.split(",")[1] for line in CSV_LINES)]
+	assert run_query("select extension_id where langs has en order by last_updated", dataset) == ["aaaa\n", "bbbb\n", "dddd\n"]
+
+def test_langs_has(dataset):
+	assert run_query("select extension_id where langs has de", dataset) == ["aaaa\n", "bbbb\n", "7\n"]
+	assert run_query("select extension_id where langs has de and not langs has en", dataset) == ["7\n"]
+	assert run_query("select extension_id where langs has fr or (langs has en and no_of_users < 10000)", dataset) == ["aaaa\n", "bbbb\n", "cccc\n", "dddd\n"]
+	assert run_query("select extension_id where langs has xx", dataset) == []
+
+def test_contains(dataset):
+	assert run_query("select extension_id where title contains Dark", dataset) == ["aaaa\n", "bbbb\n"]
+	assert run_query("select extension_id where description contains 'dark mode'", dataset) == ["bbbb\n"]
+	assert run_query("select extension_id where last_updated contains 2024", dataset) == ["bbbb\n", "dddd\n"]
+
+def test_numbers_are_compared_as_text_for_string_fields(dataset):
+	assert run_query("select extension_id where version_no = 1.10", dataset) == ["aaaa\n"]
+	assert run_query("select extension_id where version_no = 1.1", dataset) == ["bbbb\n"]
+	assert run_query("select title where extension_id = 007", dataset) == ["Agent\n"]
+	assert run_query("select title where extension_id = 7", dataset) == ["Seven\n"]
+
+def test_contains_on_a_number_is_a_query_error(tmp_path):
+	csv_path = tmp_path / "extensions.csv"
+	csv_path.write_text("".join(CSV_LINES))
+	for field in ["no_of_users", "size_in_bytes"]:
+		result = subprocess.run([sys.executable, SCRIPT, "--query", f"where {field} contains 5", "--csv-file", str(csv_path)], capture_output=True, text=True)
+		assert result.stderr.startswith(f"Query Error: '{field}' is a number")
+		assert "Traceback" not in result.stderr
+		assert result.stdout == ""
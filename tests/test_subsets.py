@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = str(Path(__file__).resolve().parent.parent / "chrome_webstore_crawler.py")
+
+
+def csv_line(i, no_of_users):
+	return f"{i:032x},Extension {i},Description,{no_of_users},12,4.5,1.0,149KiB,August 9 2014,1,en\n"
+
+def run(*args):
+	return subprocess.run([sys.executable, SCRIPT, *args], capture_output=True, text=True)
+
+
+def test_user_base_representative_subset_skips_malformed_lines(tmp_path):
+	pytest.importorskip("numpy")
+	# Only every other extension has any users, i.e., all of them (and only them) have to be in a subset of that size:
+	csv_lines = [csv_line(i, no_of_users=1000 * (i % 2)) for i in range(60)]
+	csv_lines.insert(4, "garbage,line\n") # (the row numbers of the column store are off by one from here on)
+	csv_path = tmp_path / "extensions.csv"
+	csv_path.write_text("".join(csv_lines))
+	result = run("--user-base-representative-subset", "--subset-size", "30", "--seed", "1", "--csv-file", str(csv_path))
+	assert result.returncode == 0, result.stderr
+	assert "ignoring malformed line" in result.stderr
+	subset = (tmp_path / "extensions_representative_sample_30.csv").read_text().splitlines(keepends=True)
+	assert sorted(subset) == sorted(csv_line(i, 1000) for i in range(1, 60, 2))
+
+@pytest.mark.parametrize("stratify", [False, True])
+def test_random_subset_skips_malformed_lines(tmp_path, stratify):
+	csv_lines = [csv_line(i, no_of_users=10 ** (i % 4)) for i in range(40)]
+	csv_lines[3:3] = ["garbage,line\n", csv_line(99, "many")] # (too few values, and a no. of users that isn't a number)
+	csv_path = tmp_path / "extensions.csv"
+	csv_path.write_text("".join(csv_lines))
+	result = run("--random-subset", "--subset-size", "100", "--seed", "1", "--csv-file", str(csv_path), *(["--stratify-by-users"] if stratify else []))
+	assert result.returncode == 0, result.stderr
+	assert result.stderr.count("ignoring malformed line") == 2
+	subset = (tmp_path / "extensions_random_sample_100.csv").read_text().splitlines(keepends=True)
+	assert sorted(subset) == sorted(csv_line(i, 10 ** (i % 4)) for i in range(40))